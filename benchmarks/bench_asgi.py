@@ -0,0 +1,200 @@
+"""Throughput and tail latency of the read endpoints: WSGI vs ASGI.
+
+``--concurrency`` clients each send their share of ``--requests`` GET
+requests per endpoint, one after another, straight into the application
+objects (no HTTP server):
+
+* ``wsgi``: the WSGI application called from one thread per client, like
+  a threaded WSGI server;
+* ``asgi-sync``: Django's stock ASGI handler;
+* ``asgi``: ``yatube_api.asgi``, serving these reads from the database
+  thread pool.
+
+The database is a SQLite file filled by ``seed_data``:
+
+    python -m benchmarks.bench_asgi --concurrency 64 --requests 2000
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from benchmarks import common
+
+MODES = ('wsgi', 'asgi-sync', 'asgi')
+
+
+def environ_for(path, headers):
+    url = urlsplit(path)
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': url.path,
+        'QUERY_STRING': url.query,
+        'SCRIPT_NAME': '',
+        'SERVER_NAME': 'testserver',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'wsgi.input': BytesIO(),
+        'wsgi.url_scheme': 'http',
+    }
+    for name, value in headers.items():
+        environ[f'HTTP_{name.upper().replace("-", "_")}'] = value
+    return environ
+
+
+def scope_for(path, headers):
+    url = urlsplit(path)
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': url.path,
+        'raw_path': url.path.encode(),
+        'query_string': url.query.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'testserver')] + [
+            (name.lower().encode(), value.encode())
+            for name, value in headers.items()
+        ],
+        'client': ('127.0.0.1', 0),
+        'server': ('testserver', 80),
+    }
+
+
+def run_wsgi(app, path, headers, concurrency, requests):
+    """Return ``(latencies_ms, errors, seconds)``."""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def start_response(status, response_headers):
+        if not status.startswith('200'):
+            errors.append(status)
+
+    def client(count):
+        from django.db import connection
+
+        timings = []
+        for _ in range(count):
+            started = time.perf_counter()
+            body = app(environ_for(path, headers), start_response)
+            b''.join(body)
+            body.close()
+            timings.append((time.perf_counter() - started) * 1000)
+        connection.close()
+        with lock:
+            latencies.extend(timings)
+
+    threads = [
+        threading.Thread(target=client, args=(requests // concurrency,))
+        for _ in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - started
+
+
+def run_asgi(app, path, headers, concurrency, requests):
+    """Return ``(latencies_ms, errors, seconds)``."""
+    latencies = []
+    errors = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if (message['type'] == 'http.response.start'
+                and message['status'] != 200):
+            errors.append(message['status'])
+
+    async def client(count):
+        for _ in range(count):
+            started = time.perf_counter()
+            await app(scope_for(path, headers), receive, send)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    async def run_all():
+        await asyncio.gather(*(
+            client(requests // concurrency) for _ in range(concurrency)
+        ))
+
+    started = time.perf_counter()
+    asyncio.run(run_all())
+    return latencies, errors, time.perf_counter() - started
+
+
+def seed():
+    from django.core.management import call_command
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from posts.models import Post
+    from posts.seeding import seed_data
+
+    seed_data(users=200, groups=20, posts=5000, comments=20000,
+              follows=0, batch_size=5000)
+    call_command('rebuild_counters', stdout=sys.stderr)
+    post = Post.objects.order_by('-comments_count').first()
+    token = AccessToken.for_user(common.make_user('reader'))
+    return {
+        'posts.list': '/api/v1/posts/?limit=20',
+        'posts.retrieve': f'/api/v1/posts/{post.pk}/',
+        'comments.list': f'/api/v1/posts/{post.pk}/comments/?limit=20',
+        'groups.list': '/api/v1/groups/',
+    }, {'Authorization': f'Bearer {token}'}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        common.setup(Path(directory) / 'bench.sqlite3')
+        from django.core.handlers.asgi import ASGIHandler
+        from django.core.handlers.wsgi import WSGIHandler
+        from django.test import override_settings
+
+        from yatube_api.asgi import application
+
+        apps = {
+            'wsgi': (run_wsgi, WSGIHandler()),
+            'asgi-sync': (run_asgi, ASGIHandler()),
+            'asgi': (run_asgi, application),
+        }
+        endpoints, headers = seed()
+        with override_settings(DEBUG=False, SERVER_TIMING_SAMPLE_RATE=0):
+            for name, path in endpoints.items():
+                for mode in MODES:
+                    run, app = apps[mode]
+                    # Warm up connections, caches and the thread pools.
+                    run(app, path, headers, args.concurrency,
+                        args.concurrency)
+                    latencies, errors, seconds = run(
+                        app, path, headers, args.concurrency, args.requests
+                    )
+                    quantiles = statistics.quantiles(
+                        latencies, n=100, method='inclusive'
+                    )
+                    print(
+                        f'{name:15} {mode:9} '
+                        f'{len(latencies) / seconds:8.1f} req/s  '
+                        f'p50 {statistics.median(latencies):7.1f}ms  '
+                        f'p99 {quantiles[98]:7.1f}ms  '
+                        f'{len(errors)} errors'
+                    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""Per-request cost of JWT authentication, stock vs cached user lookup."""
+import time
+
+from benchmarks import common
+
+REQUESTS = 5000
+
+
+def main():
+    common.setup()
+    from django.db import connection
+    from django.test import RequestFactory
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from api.authentication import CachedJWTAuthentication
+
+    user = common.make_user()
+    token = AccessToken.for_user(user)
+    request = RequestFactory().get(
+        '/api/v1/posts/', HTTP_AUTHORIZATION=f'Bearer {token}'
+    )
+    for label, auth_class in (('stock', JWTAuthentication),
+                              ('cached', CachedJWTAuthentication)):
+        backend = auth_class()
+        backend.authenticate(request)
+        with CaptureQueriesContext(connection) as context:
+            backend.authenticate(request)
+        started = time.perf_counter()
+        for _ in range(REQUESTS):
+            backend.authenticate(request)
+        elapsed = time.perf_counter() - started
+        print(
+            f'{label:8} {elapsed / REQUESTS * 1e6:8.1f} us/request  '
+            f'{len(context.captured_queries)} queries/request'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""Compare creating 1,000 comments one request at a time and in bulk."""
+import time
+
+from benchmarks import common
+
+COMMENTS = 1000
+
+
+def main():
+    common.setup()
+    from rest_framework.test import APIClient
+
+    from posts.models import Post
+
+    author = common.make_user()
+    post = Post.objects.create(text='post', author=author)
+    client = APIClient()
+    client.force_authenticate(author)
+    url = f'/api/v1/posts/{post.id}/comments/'
+
+    started = time.perf_counter()
+    for i in range(COMMENTS):
+        client.post(url, {'text': f'comment {i}'}, format='json')
+    single = time.perf_counter() - started
+
+    data = [{'text': f'comment {i}'} for i in range(COMMENTS)]
+    started = time.perf_counter()
+    response = client.post(f'{url}bulk/', data, format='json')
+    bulk = time.perf_counter() - started
+    assert response.status_code == 201, response.content
+
+    print(f'single requests  {COMMENTS / single:10.0f} comments/s')
+    print(f'bulk request     {COMMENTS / bulk:10.0f} comments/s')
+    print(f'speedup          {single / bulk:10.1f}x')
+
+
+if __name__ == '__main__':
+    main()
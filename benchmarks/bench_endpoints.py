@@ -0,0 +1,349 @@
+"""Latency, query count and allocations of every API endpoint.
+
+Each case is requested through the Django test client ``--repeat`` times
+per dataset size. The results are written as JSON; when a baseline file
+exists, the run fails if any case got worse than the baseline:
+
+    python -m benchmarks.bench_endpoints --save-baseline    # on main
+    python -m benchmarks.bench_endpoints                    # on a branch
+
+Latencies and allocations may grow by ``--threshold`` (a fraction)
+before they count as a regression, latencies also by at least
+``--min-delta-ms`` to ride out timer noise; query counts may not grow at
+all. Baseline latencies are first scaled by the ratio of a fixed
+pure-Python workload timed in both runs, so a slower or busier machine
+alone does not read as a regression.
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks import common
+
+SIZES = (100, 1000)
+REPEAT = 200
+WARMUP = 10
+THRESHOLD = 0.5
+MIN_DELTA_MS = 0.5
+RESULTS_PATH = common.BASE_DIR / 'bench_endpoints.json'
+BASELINE_PATH = common.BASE_DIR / 'bench_endpoints_baseline.json'
+# Relative checks; query counts are compared exactly.
+RELATIVE_METRICS = ('p50_ms', 'p95_ms', 'alloc_kib')
+LATENCY_METRICS = ('p50_ms', 'p95_ms')
+# Groups are read-only and follows cannot be updated or deleted through
+# the API, so those cases do not exist.
+CASES = (
+    'posts.list', 'posts.retrieve', 'posts.create', 'posts.update',
+    'posts.delete',
+    'comments.list', 'comments.retrieve', 'comments.create',
+    'comments.update', 'comments.delete',
+    'groups.list', 'groups.retrieve',
+    'follow.list', 'follow.create',
+)
+
+
+def bulk_create(model, objs):
+    """``bulk_create`` that returns the rows with their ids on SQLite."""
+    last = model.objects.order_by('-pk').values_list('pk', flat=True).first()
+    model.objects.bulk_create(objs)
+    return list(model.objects.filter(pk__gt=last or 0).order_by('pk'))
+
+
+def seed(size, iterations):
+    """Fill the database for one dataset size.
+
+    ``size`` posts and comments, half of the comments on one post, a
+    reader following every author, and ``iterations`` spare rows for the
+    create and delete cases.
+    """
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+
+    from posts.models import Comment, Follow, Group, Post
+
+    User = get_user_model()
+    users = bulk_create(User, (
+        User(username=f'user{i}', password='!')
+        for i in range(max(10, size // 10))
+    ))
+    reader = users[0]
+    groups = bulk_create(Group, (
+        Group(title=f'group {i}', slug=f'group-{i}', description='text')
+        for i in range(max(5, size // 50))
+    ))
+    posts = bulk_create(Post, (
+        Post(text=f'post {i} ' * 10, author=users[i % len(users)],
+             group=groups[i % len(groups)])
+        for i in range(size)
+    ))
+    hot_post = posts[0]
+    bulk_create(Comment, (
+        Comment(text=f'comment {i}', author=users[i % len(users)],
+                post=hot_post if i % 2 else posts[i % len(posts)])
+        for i in range(size)
+    ))
+    bulk_create(Follow, (
+        Follow(user=reader, following=author) for author in users[1:]
+    ))
+    call_command('rebuild_counters', stdout=sys.stderr)
+    return {
+        'reader': reader,
+        'post': hot_post,
+        'group': groups[0],
+        'comment': Comment.objects.filter(post=hot_post).first(),
+        'spare_posts': iter(bulk_create(Post, (
+            Post(text='spare', author=reader) for _ in range(iterations)
+        ))),
+        'spare_comments': iter(bulk_create(Comment, (
+            Comment(text='spare', author=reader, post=hot_post)
+            for _ in range(iterations)
+        ))),
+        'spare_users': iter(bulk_create(User, (
+            User(username=f'spare{i}', password='!')
+            for i in range(iterations)
+        ))),
+    }
+
+
+def make_requests(client, data):
+    """Return ``{case: callable}``; each call sends one request."""
+    post, comment, group = data['post'], data['comment'], data['group']
+    comments_url = f'/api/v1/posts/{post.pk}/comments/'
+
+    def send(method, url, expected, payload=None):
+        if payload is None:
+            response = getattr(client, method)(url)
+        else:
+            response = getattr(client, method)(
+                url, json.dumps(payload), content_type='application/json'
+            )
+        if response.status_code != expected:
+            raise RuntimeError(
+                f'{method.upper()} {url} returned {response.status_code}'
+            )
+        if getattr(response, 'streaming', False):
+            b''.join(response.streaming_content)
+
+    def delete_next(spare, url):
+        return lambda: send('delete', url.format(next(spare).pk), 204)
+
+    return {
+        'posts.list': lambda: send('get', '/api/v1/posts/?limit=20', 200),
+        'posts.retrieve': lambda: send('get', f'/api/v1/posts/{post.pk}/',
+                                       200),
+        'posts.create': lambda: send('post', '/api/v1/posts/', 201,
+                                     {'text': 'new post'}),
+        'posts.update': lambda: send('patch', f'/api/v1/posts/{post.pk}/',
+                                     200, {'text': 'updated post'}),
+        'posts.delete': delete_next(data['spare_posts'],
+                                    '/api/v1/posts/{}/'),
+        'comments.list': lambda: send('get', f'{comments_url}?limit=20', 200),
+        'comments.retrieve': lambda: send(
+            'get', f'{comments_url}{comment.pk}/', 200
+        ),
+        'comments.create': lambda: send('post', comments_url, 201,
+                                        {'text': 'new comment'}),
+        'comments.update': lambda: send(
+            'patch', f'{comments_url}{comment.pk}/', 200,
+            {'text': 'updated comment'}
+        ),
+        'comments.delete': delete_next(data['spare_comments'],
+                                       comments_url + '{}/'),
+        'groups.list': lambda: send('get', '/api/v1/groups/', 200),
+        'groups.retrieve': lambda: send('get', f'/api/v1/groups/{group.pk}/',
+                                        200),
+        'follow.list': lambda: send('get', '/api/v1/follow/', 200),
+        'follow.create': lambda: send(
+            'post', '/api/v1/follow/', 201,
+            {'following': next(data['spare_users']).username}
+        ),
+    }
+
+
+def calibrate(repeat=REPEAT):
+    """Median time of a fixed CPU workload, the machine's speed unit."""
+    payload = [{'id': i, 'text': f'post {i}' * 5} for i in range(200)]
+
+    def workload():
+        json.loads(json.dumps(payload))
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        workload()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def run_case(request, repeat):
+    """Time ``request`` and return its metrics."""
+    from django.db import connection, reset_queries
+    from django.test.utils import CaptureQueriesContext
+
+    for _ in range(WARMUP):
+        request()
+    # The query log is a bounded deque; a full one would capture nothing.
+    reset_queries()
+    with CaptureQueriesContext(connection) as context:
+        request()
+    tracemalloc.start()
+    request()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    timings = []
+    # Collections triggered by earlier cases would land on random requests.
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            request()
+            timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        gc.enable()
+    percentiles = statistics.quantiles(timings, n=100, method='inclusive')
+    return {
+        'p50_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(percentiles[94], 3),
+        'p99_ms': round(percentiles[98], 3),
+        'queries': len(context.captured_queries),
+        'alloc_kib': round(peak / 1024, 1),
+    }
+
+
+def run(sizes, repeat, cases):
+    from django.core.cache import cache
+    from django.core.management import call_command
+    from django.test import Client, override_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from api.authentication import token_user_cache
+
+    results = {}
+    iterations = WARMUP + 2 + repeat
+    # Responses to authenticated requests are never cached, but make sure
+    # every request does the full work.
+    with override_settings(RESPONSE_CACHE_TIMEOUT=0):
+        for size in sizes:
+            call_command('flush', interactive=False, verbosity=0)
+            cache.clear()
+            token_user_cache.clear()
+            data = seed(size, iterations)
+            client = Client(HTTP_AUTHORIZATION=(
+                f'Bearer {AccessToken.for_user(data["reader"])}'
+            ))
+            requests = make_requests(client, data)
+            for case in cases:
+                key = f'{case}@{size}'
+                results[key] = run_case(requests[case], repeat)
+                print(format_result(key, results[key]), file=sys.stderr)
+    return results
+
+
+def format_result(key, result):
+    return (
+        f'{key:24} p50 {result["p50_ms"]:7.2f}ms  '
+        f'p95 {result["p95_ms"]:7.2f}ms  p99 {result["p99_ms"]:7.2f}ms  '
+        f'{result["queries"]:3} queries  {result["alloc_kib"]:8.1f} KiB'
+    )
+
+
+def compare(results, baseline, threshold, min_delta_ms=MIN_DELTA_MS,
+            speed=1.0):
+    """Return a message for every metric that regressed past the baseline.
+
+    ``speed`` multiplies the baseline latencies. Cases missing from either
+    side are ignored.
+    """
+    regressions = []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        if result['queries'] > previous['queries']:
+            regressions.append(
+                f'{key}: queries {previous["queries"]} -> {result["queries"]}'
+            )
+        for metric in RELATIVE_METRICS:
+            expected = previous[metric]
+            limit = expected * (1 + threshold)
+            if metric in LATENCY_METRICS:
+                expected *= speed
+                limit = max(expected * (1 + threshold),
+                            expected + min_delta_ms)
+            if result[metric] > limit:
+                regressions.append(
+                    f'{key}: {metric} {expected:.3f} -> '
+                    f'{result[metric]} (limit {limit:.2f})'
+                )
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument(
+        '--case', dest='cases', action='append', choices=CASES,
+        help='Run only this case; may be repeated.'
+    )
+    parser.add_argument('--output', type=Path, default=RESULTS_PATH)
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH)
+    parser.add_argument(
+        '--threshold', type=float, default=THRESHOLD,
+        help='Allowed relative slowdown, 0.5 means 50%%.'
+    )
+    parser.add_argument(
+        '--min-delta-ms', type=float, default=MIN_DELTA_MS,
+        help='Latency growth below this is never a regression.'
+    )
+    parser.add_argument(
+        '--save-baseline', action='store_true',
+        help='Store the results as the new baseline instead of comparing.'
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    common.setup()
+    calibration = calibrate()
+    results = run(args.sizes, args.repeat, args.cases or CASES)
+    # Timed again after the cases, in case the machine got busier.
+    calibration = round(min(calibration, calibrate()), 4)
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'calibration_ms': calibration,
+        'results': results,
+    }
+    args.output.write_text(json.dumps(report, indent=2) + '\n')
+    print(f'Results written to {args.output}', file=sys.stderr)
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + '\n')
+        print(f'Baseline saved to {args.baseline}', file=sys.stderr)
+        return 0
+    if not args.baseline.exists():
+        print(f'No baseline at {args.baseline}', file=sys.stderr)
+        return 0
+    baseline = json.loads(args.baseline.read_text())
+    speed = calibration / baseline['calibration_ms']
+    print(f'Machine speed vs baseline: {1 / speed:.2f}x', file=sys.stderr)
+    regressions = compare(
+        results, baseline['results'], args.threshold, args.min_delta_ms,
+        speed
+    )
+    for message in regressions:
+        print(f'REGRESSION {message}', file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
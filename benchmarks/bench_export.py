@@ -0,0 +1,70 @@
+"""Peak memory and throughput of the NDJSON export at growing sizes.
+
+The peak should stay flat as the number of exported posts grows, and
+as the number of comments of one post grows with ``comments=true``.
+"""
+import time
+import tracemalloc
+
+from benchmarks import common
+
+SIZES = (10_000, 50_000, 200_000)
+COMMENT_SIZES = (10_000, 100_000)
+
+
+def export(client, params=None):
+    """Return the lines, posts/s and peak traced memory of one export."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    response = client.get('/api/v1/export/posts/', params or {})
+    lines = sum(
+        chunk.count(b'\n') for chunk in response.streaming_content
+    )
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return lines, lines / elapsed, peak / 2 ** 20
+
+
+def main():
+    common.setup()
+    from django.test import Client
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from posts.models import Comment, Post
+
+    author = common.make_user()
+    client = Client(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(author)}'
+    )
+    created = 0
+    for size in SIZES:
+        Post.objects.bulk_create(
+            (Post(text=f'post {i} ' * 10, author=author)
+             for i in range(created, size)),
+            batch_size=5000
+        )
+        created = size
+        lines, rate, peak = export(client)
+        assert lines == size, lines
+        print(f'{size:>8} posts  {rate:10.0f} posts/s  peak {peak:6.1f} MiB')
+
+    post = Post.objects.order_by('pk').first()
+    created = 0
+    for size in COMMENT_SIZES:
+        Comment.objects.bulk_create(
+            (Comment(text=f'comment {i}', author=author, post=post)
+             for i in range(created, size)),
+            batch_size=5000
+        )
+        created = size
+        Post.objects.filter(pk=post.pk).update(comments_count=size)
+        lines, rate, peak = export(client, {'comments': 'true'})
+        print(
+            f'{size:>8} comments of one post, with comments  '
+            f'{rate:10.0f} posts/s  peak {peak:6.1f} MiB'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Follow search of a user with 100k follows: prefix index vs substring.
+
+``GET /api/v1/follow/?search=...`` finds followed users whose name starts
+with the query through ``follow_user_name_idx``; ``&match=contains`` is
+the substring search that scans and joins every follow of the user.
+"""
+import argparse
+
+from benchmarks import common
+
+QUERIES = ('user0_12345', 'User0_1234', 'USER0_123', 'user0_12')
+
+
+def seed(follows, batch_size=10000):
+    from django.db import transaction
+
+    from posts.importer import insert_rows
+    from posts.models import Follow, search_name
+    from posts.seeding import Seeder
+
+    seeder = Seeder(batch_size=batch_size)
+    seeder.seed_users(follows)
+    reader = common.make_user('reader')
+    rows = [
+        (reader.pk, seeder.first_user + i, search_name(seeder.username(i)))
+        for i in range(follows)
+    ]
+    with transaction.atomic():
+        insert_rows(
+            Follow, ('user_id', 'following_id', 'following_name'), rows
+        )
+    return reader
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--follows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    common.setup()
+    from django.db import connection
+    from django.test import Client, override_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    reader = seed(args.follows)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    client = Client(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(reader)}'
+    )
+
+    def search(query, match):
+        response = client.get(
+            '/api/v1/follow/', {'search': query, 'match': match}
+        )
+        assert response.status_code == 200, response.status_code
+        return len(response.json())
+
+    print(f'{"search":12} {"found":>6} {"contains":>10} {"prefix":>10} '
+          f'{"speedup":>8}')
+    with override_settings(SERVER_TIMING_SAMPLE_RATE=0):
+        for query in QUERIES:
+            found = search(query, 'prefix')
+            assert found == search(query, 'contains'), query
+            contains = common.measure(
+                lambda: search(query, 'contains'), args.repeat
+            )
+            prefix = common.measure(
+                lambda: search(query, 'prefix'), args.repeat
+            )
+            print(f'{query:12} {found:6} {contains:8.2f}ms {prefix:8.2f}ms '
+                  f'{contains / prefix:7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
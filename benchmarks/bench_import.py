@@ -0,0 +1,69 @@
+"""Throughput of the import_data command on SQLite."""
+import io
+import os
+import random
+import tempfile
+import time
+
+import orjson
+
+from benchmarks import common
+
+USERS = 1000
+ROWS = 200_000
+
+
+def write_jsonl(directory, name, records):
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as target:
+        for record in records:
+            target.write(orjson.dumps(record) + b'\n')
+    return path
+
+
+def main():
+    common.setup()
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+
+    from posts.models import Post
+
+    User = get_user_model()
+    User.objects.bulk_create(
+        User(username=f'user{i}', password='!') for i in range(USERS)
+    )
+    random.seed(1)
+    first_post = (Post.objects.order_by('-pk').values_list('pk', flat=True)
+                  .first() or 0) + 1
+    with tempfile.TemporaryDirectory() as directory:
+        files = [
+            ('posts', write_jsonl(directory, 'posts.jsonl', (
+                {'text': f'Пост {i} ' * 5,
+                 'author': f'user{random.randrange(USERS)}',
+                 'pub_date': '2020-01-01T00:00:00Z'}
+                for i in range(ROWS)
+            ))),
+            ('comments', write_jsonl(directory, 'comments.jsonl', (
+                {'text': f'Комментарий {i}',
+                 'author': f'user{random.randrange(USERS)}',
+                 'post': first_post + random.randrange(ROWS)}
+                for i in range(ROWS)
+            ))),
+            ('follows', write_jsonl(directory, 'follows.jsonl', (
+                {'user': f'user{random.randrange(USERS)}',
+                 'following': f'user{random.randrange(USERS)}'}
+                for i in range(ROWS)
+            ))),
+        ]
+        for kind, path in files:
+            started = time.perf_counter()
+            call_command(
+                'import_data', kind, path, batch_size=5000, no_rebuild=True,
+                stdout=io.StringIO(), stderr=io.StringIO()
+            )
+            elapsed = time.perf_counter() - started
+            print(f'{kind:<10} {ROWS / elapsed:10.0f} rows/s')
+
+
+if __name__ == '__main__':
+    main()
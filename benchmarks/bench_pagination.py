@@ -0,0 +1,55 @@
+"""Compare shallow and deep pages for limit/offset and cursor pagination.
+
+Keyset pages should take about the same time at page 1 and page 10,000,
+while limit/offset pages get slower the deeper they are.
+"""
+from benchmarks import common
+
+PAGE_SIZE = 10
+PAGES = 10_000
+
+
+def main():
+    common.setup()
+    from django.test import Client, override_settings
+
+    from api.pagination import PostCursorPagination
+    from posts.models import Post
+
+    author = common.make_user()
+    Post.objects.bulk_create(
+        Post(text=f'post {i}', author=author)
+        for i in range(PAGE_SIZE * PAGES + PAGE_SIZE)
+    )
+    client = Client()
+    url = '/api/v1/posts/'
+
+    deep = Post.objects.order_by('pub_date', 'id')[
+        PAGE_SIZE * (PAGES - 1) - 1
+    ]
+    paginator = PostCursorPagination()
+    paginator.base_url = 'http://testserver' + url
+    deep_cursor = paginator.encode_cursor(
+        paginator.get_position(deep)
+    ).split('cursor=')[1]
+
+    cases = [
+        ('limit/offset page 1',
+         f'{url}?limit={PAGE_SIZE}&offset=0'),
+        (f'limit/offset page {PAGES}',
+         f'{url}?limit={PAGE_SIZE}&offset={PAGE_SIZE * (PAGES - 1)}'),
+        ('cursor page 1',
+         f'{url}?page_size={PAGE_SIZE}'),
+        (f'cursor page {PAGES}',
+         f'{url}?page_size={PAGE_SIZE}&cursor={deep_cursor}'),
+    ]
+    # Anonymous responses would be served from the response cache after
+    # the first request; measure the pagination queries instead.
+    with override_settings(RESPONSE_CACHE_TIMEOUT=0):
+        for name, case_url in cases:
+            elapsed = common.measure(lambda: client.get(case_url))
+            print(f'{name:<28} {elapsed:8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""Who-to-follow batch job on a seeded follow graph.
+
+Seeds ``--users`` users and about ``--follows`` follows into a SQLite file
+(popular users get most followers), then reports:
+
+* the full ``rebuild_recommendations`` run: users and follows per second
+  and how much the peak resident memory (including SQLite's page cache)
+  grew during it;
+* the peak Python memory of recomputing one batch, the largest of
+  ``--samples`` batches spread over the users;
+* an incremental run after ``--added`` new follows;
+* the latency of ``GET /api/v1/recommendations/``.
+
+Memory does not grow with the number of users, so the time of a larger
+graph can be estimated from the rate: 1M users with 50M follows take
+about 1M divided by users/s measured on a graph of the same density.
+
+    python -m benchmarks.bench_recommendations --users 100000 \\
+        --follows 2500000
+"""
+import argparse
+import random
+import resource
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks import common
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def batch_peak_mb(batch_size, samples):
+    from django.conf import settings
+
+    from posts.models import User
+    from posts.recommendations import all_users, recommend
+
+    batch_size = batch_size or settings.RECOMMENDATIONS_BATCH_SIZE
+    step = max(1, User.objects.count() // batch_size // samples)
+    peak = 0
+    for index, batch in enumerate(all_users(batch_size)):
+        if index % step:
+            continue
+        tracemalloc.start()
+        recommend(batch)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return peak / 2 ** 20
+
+
+def seed(users, follows):
+    from posts.seeding import Seeder
+
+    seeder = Seeder(batch_size=50000)
+    started = time.perf_counter()
+    seeder.seed_users(users)
+    stored = seeder.seed_follows(follows)
+    print(f'seeded {users} users, {stored} follows in '
+          f'{time.perf_counter() - started:.1f}s')
+    return seeder
+
+
+def add_follows(seeder, count):
+    from django.db import transaction
+
+    from posts.importer import insert_rows
+    from posts.models import Follow, search_name
+
+    rng = random.Random('added')
+    rows = set()
+    while len(rows) < count:
+        user, target = rng.sample(range(seeder.users), 2)
+        rows.add((
+            seeder.first_user + user, seeder.first_user + target,
+            search_name(seeder.username(target))
+        ))
+    with transaction.atomic():
+        insert_rows(
+            Follow, ('user_id', 'following_id', 'following_name'),
+            list(rows), ignore_conflicts=True
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--users', type=int, default=100_000)
+    parser.add_argument('--follows', type=int, default=2_500_000)
+    parser.add_argument('--added', type=int, default=100)
+    parser.add_argument('--batch-size', type=int, default=None)
+    parser.add_argument('--samples', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        common.setup(Path(directory) / 'bench.sqlite3')
+        from django.test import Client, override_settings
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from posts.models import Follow, Recommendation, User
+        from posts.recommendations import refresh_recommendations
+
+        seeder = seed(args.users, args.follows)
+        follows = Follow.objects.count()
+
+        before = peak_rss_mb()
+        started = time.perf_counter()
+        count = refresh_recommendations(
+            full=True, batch_size=args.batch_size
+        )
+        elapsed = time.perf_counter() - started
+        print(
+            f'full run     {count} users in {elapsed:.1f}s  '
+            f'{count / elapsed:.0f} users/s  '
+            f'{follows / elapsed:.0f} follows/s  '
+            f'peak RSS {before:.0f} -> {peak_rss_mb():.0f} MB  '
+            f'{Recommendation.objects.count()} rows'
+        )
+
+        print(
+            f'one batch    peak Python memory '
+            f'{batch_peak_mb(args.batch_size, args.samples):.1f} MB'
+        )
+
+        add_follows(seeder, args.added)
+        started = time.perf_counter()
+        count = refresh_recommendations(batch_size=args.batch_size)
+        elapsed = time.perf_counter() - started
+        print(
+            f'incremental  {count} users in {elapsed:.1f}s after '
+            f'{args.added} new follows'
+        )
+
+        reader = User.objects.get(pk=Recommendation.objects.values_list(
+            'user_id', flat=True
+        ).first())
+        client = Client(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(reader)}'
+        )
+        with override_settings(SERVER_TIMING_SAMPLE_RATE=0):
+            latency = common.measure(
+                lambda: client.get('/api/v1/recommendations/'), 200
+            )
+        print(f'read         {latency:.2f}ms per request')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""Render time and payload size of a large post page per renderer."""
+from benchmarks import common
+
+POSTS = 1000
+
+
+def main():
+    common.setup()
+    from rest_framework.renderers import JSONRenderer
+
+    from api.fast_serializers import PostValuesSerializer
+    from api.renderers import MessagePackRenderer, ORJSONRenderer
+    from posts.models import Group, Post
+
+    author = common.make_user()
+    group = Group.objects.create(title='group', slug='group')
+    Post.objects.bulk_create(
+        Post(text=f'Текст поста номер {i} ' * 5, author=author, group=group,
+             image=f'posts/{i}.jpg', image_variants={
+                 'thumb': {'webp': f'posts/variants/{i}/thumb.webp'}
+             })
+        for i in range(POSTS)
+    )
+    queryset = Post.objects.all()
+    # Datetimes stay native, as with DATETIME_FORMAT = None.
+    serializer = PostValuesSerializer()
+    native = serializer.serialize(serializer.get_rows(queryset))
+    cases = [
+        ('JSONRenderer (stdlib)', JSONRenderer(), native),
+        ('ORJSONRenderer', ORJSONRenderer(), native),
+        ('MessagePackRenderer', MessagePackRenderer(), native),
+    ]
+    print(f'{POSTS} posts per page')
+    for name, renderer, data in cases:
+        elapsed = common.measure(lambda: renderer.render(data))
+        size = len(renderer.render(data))
+        print(f'{name:<24} {elapsed:8.2f} ms {size / 1024:8.1f} KiB')
+
+
+if __name__ == '__main__':
+    main()
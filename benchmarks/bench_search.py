@@ -0,0 +1,45 @@
+"""Compare FTS5 search with a LIKE '%term%' scan over many posts."""
+import random
+
+from benchmarks import common
+
+POSTS = 200_000
+WORDS = (
+    'город река лес море небо поле дом окно сад мост '
+    'утро вечер зима лето осень весна снег дождь ветер солнце'
+).split()
+
+
+def main():
+    common.setup()
+    from django.test import Client
+
+    from posts.models import Post
+    from posts.search import rebuild_index
+
+    random.seed(1)
+    author = common.make_user()
+    Post.objects.bulk_create(
+        (
+            Post(text=' '.join(random.choices(WORDS, k=30)) + f' пост{i}',
+                 author=author)
+            for i in range(POSTS)
+        ),
+        batch_size=5000
+    )
+    rebuild_index(batch_size=5000)
+    client = Client()
+    term = f'пост{POSTS // 2}'
+
+    def like():
+        list(Post.objects.filter(text__icontains=term)[:10])
+
+    def fts():
+        client.get('/api/v1/posts/', {'search': term})
+
+    print(f'LIKE scan        {common.measure(like, repeat=5):8.2f} ms')
+    print(f'FTS5 via API     {common.measure(fts, repeat=5):8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""CPU time of 100-item list pages, model serializers vs values() rows."""
+import statistics
+import time
+
+from benchmarks import common
+
+PAGE_SIZE = 100
+REPEAT = 50
+
+
+def cpu_ms(func):
+    func()
+    timings = []
+    for _ in range(REPEAT):
+        started = time.process_time()
+        func()
+        timings.append((time.process_time() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    common.setup()
+    from django.test import Client, override_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from posts.models import Comment, Follow, Group, Post
+
+    authors = [common.make_user(f'author{i}') for i in range(PAGE_SIZE)]
+    reader = authors[0]
+    group = Group.objects.create(title='group', slug='group')
+    Group.objects.bulk_create(
+        Group(title=f'group {i}', slug=f'group-{i}', description='text')
+        for i in range(PAGE_SIZE)
+    )
+    Post.objects.bulk_create(
+        Post(text=f'post {i}', author=author, group=group,
+             image=f'posts/{i}.jpg')
+        for i, author in enumerate(authors)
+    )
+    post = Post.objects.first()
+    Comment.objects.bulk_create(
+        Comment(text=f'comment {i}', author=author, post=post)
+        for i, author in enumerate(authors)
+    )
+    Follow.objects.bulk_create(
+        Follow(user=reader, following=author) for author in authors[1:]
+    )
+
+    client = Client(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(reader)}'
+    )
+    cases = [
+        ('posts', f'/api/v1/posts/?limit={PAGE_SIZE}'),
+        ('comments', f'/api/v1/posts/{post.id}/comments/?limit={PAGE_SIZE}'),
+        ('groups', '/api/v1/groups/'),
+        ('follow', '/api/v1/follow/'),
+    ]
+    print(f'{"page":10} {"model":>10} {"values":>10} {"saved":>8}')
+    with override_settings(RESPONSE_CACHE_TIMEOUT=0):
+        for name, url in cases:
+            timings = []
+            for fast in (False, True):
+                with override_settings(FAST_LIST_SERIALIZATION=fast):
+                    timings.append(cpu_ms(lambda: client.get(url)))
+            model, values = timings
+            print(
+                f'{name:10} {model:8.2f}ms {values:8.2f}ms '
+                f'{(model - values) / model:7.0%}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""Concurrent comment creation against a SQLite file.
+
+``--threads`` threads each create ``--requests`` comments through the API
+with the Django test client, first with Django's stock SQLite settings,
+then with the production profile of settings.py (WAL, pragmas, immediate
+transactions, lock retries, persistent connections). Each profile runs
+in its own process on a fresh database file:
+
+    python -m benchmarks.bench_sqlite_writes --threads 8 --requests 200
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks import common
+
+PROFILES = ('stock', 'production')
+STOCK = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'CONN_MAX_AGE': 0,
+    'OPTIONS': {},
+}
+
+
+def configure(profile):
+    """Apply the database settings of ``profile``; run before ``setup``."""
+    from django.conf import settings
+
+    if profile == 'stock':
+        settings.DATABASES['default'].update(STOCK)
+
+
+def stress(threads, requests):
+    from django.db import OperationalError, connection
+    from django.test import Client
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from posts.models import Comment, Post
+
+    users = [common.make_user(f'writer{i}') for i in range(threads)]
+    posts = [Post.objects.create(text='post', author=user) for user in users]
+    connection.close()
+    errors = []
+    latencies = []
+    lock = threading.Lock()
+
+    def write(index):
+        from django.db import connection
+
+        client = Client(HTTP_AUTHORIZATION=(
+            f'Bearer {AccessToken.for_user(users[index])}'
+        ))
+        timings = []
+        failed = []
+        for number in range(requests):
+            # Every thread comments on every post, so writes collide.
+            post = posts[(index + number) % len(posts)]
+            started = time.perf_counter()
+            try:
+                response = client.post(
+                    f'/api/v1/posts/{post.pk}/comments/',
+                    json.dumps({'text': f'comment {number}'}),
+                    content_type='application/json'
+                )
+                if response.status_code != 201:
+                    failed.append(f'status {response.status_code}')
+            except OperationalError as error:
+                failed.append(str(error))
+            timings.append((time.perf_counter() - started) * 1000)
+        connection.close()
+        with lock:
+            latencies.extend(timings)
+            errors.extend(failed)
+
+    workers = [
+        threading.Thread(target=write, args=(index,))
+        for index in range(threads)
+    ]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    created = Comment.objects.count()
+    return {
+        'requests': threads * requests,
+        'created': created,
+        'errors': len(errors),
+        'locked': sum('database is locked' in error for error in errors),
+        'per_second': round(created / elapsed, 1),
+        'p50_ms': round(statistics.median(latencies), 2),
+        'p95_ms': round(
+            statistics.quantiles(latencies, n=20, method='inclusive')[18], 2
+        ),
+    }
+
+
+def run_profile(profile, threads, requests):
+    with tempfile.TemporaryDirectory() as directory:
+        configure(profile)
+        common.setup(Path(directory) / 'bench.sqlite3')
+        return stress(threads, requests)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument(
+        '--profile', choices=PROFILES,
+        help='Run one profile in this process and print its JSON result.'
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.profile:
+        result = run_profile(args.profile, args.threads, args.requests)
+        print(json.dumps(result))
+        return
+    for profile in PROFILES:
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_sqlite_writes',
+             '--profile', profile, '--threads', str(args.threads),
+             '--requests', str(args.requests)],
+            cwd=common.BASE_DIR, check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f'{profile:10}  {result["per_second"]:8.1f} comments/s  '
+            f'{result["created"]}/{result["requests"]} created  '
+            f'{result["locked"]} locked  {result["errors"]} errors  '
+            f'p50 {result["p50_ms"]:.2f}ms  p95 {result["p95_ms"]:.2f}ms'
+        )
+
+
+if __name__ == '__main__':
+    main()
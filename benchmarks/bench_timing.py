@@ -0,0 +1,53 @@
+"""Overhead of api.timing on a post list request, sampled vs not.
+
+The log line goes to a stream handler on stderr; its cost depends on the
+handler, so it is measured separately. The variants are interleaved
+request by request, so drift of the machine affects them alike.
+"""
+import logging
+import statistics
+import time
+
+from benchmarks import common
+
+POSTS = 100
+ROUNDS = 2000
+
+
+def main():
+    common.setup()
+    from django.conf import settings
+    from django.test import Client
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from posts.models import Post
+
+    user = common.make_user()
+    Post.objects.bulk_create(
+        Post(text=f'post {i}', author=user) for i in range(POSTS)
+    )
+    client = Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    url = '/api/v1/posts/?limit=20'
+    timing_logger = logging.getLogger('api.timing')
+    variants = (('off', 0, False), ('sampled', 1.0, False),
+                ('logged', 1.0, True))
+    timings = {label: [] for label, _, _ in variants}
+    for round_ in range(ROUNDS):
+        for label, rate, log in variants:
+            settings.SERVER_TIMING_SAMPLE_RATE = rate
+            timing_logger.disabled = not log
+            started = time.perf_counter()
+            client.get(url)
+            if round_:
+                timings[label].append((time.perf_counter() - started) * 1000)
+    timing_logger.disabled = True
+    medians = {label: statistics.median(t) for label, t in timings.items()}
+    for label, elapsed in medians.items():
+        overhead = (elapsed - medians['off']) * 1000
+        print(f'{label:8} {elapsed:7.3f} ms/request  {overhead:+7.1f} us')
+    settings.SERVER_TIMING_SAMPLE_RATE = 1.0
+    print(client.get(url)['Server-Timing'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Peak memory of concurrent image uploads, stock vs streaming handler.
+
+Every upload is parsed and validated the way ``PostViewSet`` does it;
+``tracemalloc`` records the peak of Python allocations made while the
+uploads run in parallel threads.
+"""
+import io
+import os
+import struct
+import time
+import tracemalloc
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import common
+
+CONCURRENCY = 16
+
+
+def noise_image(size, fmt):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    pixels = os.urandom(size[0] * size[1] * 3)
+    Image.frombytes('RGB', size, pixels).save(buffer, fmt, quality=95)
+    return buffer.getvalue()
+
+
+def png_bomb(width, height):
+    """A few hundred KB of PNG that decodes to ``width * height`` pixels."""
+    def chunk(kind, data):
+        body = kind + data
+        return (
+            struct.pack('>I', len(data)) + body
+            + struct.pack('>I', zlib.crc32(body))
+        )
+
+    compressor = zlib.compressobj(9)
+    row = b'\x00' * (width * 3 + 1)
+    data = b''.join(compressor.compress(row) for _ in range(height))
+    data += compressor.flush()
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (
+        b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header)
+        + chunk(b'IDAT', data) + chunk(b'IEND', b'')
+    )
+
+
+def make_request(body):
+    from django.core.handlers.wsgi import WSGIRequest
+    from django.test.client import MULTIPART_CONTENT, RequestFactory
+
+    environ = RequestFactory()._base_environ(**{
+        'REQUEST_METHOD': 'POST',
+        'PATH_INFO': '/api/v1/posts/',
+        'CONTENT_TYPE': MULTIPART_CONTENT,
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': io.BytesIO(body),
+    })
+    return WSGIRequest(environ)
+
+
+def upload(body, streaming):
+    from rest_framework.exceptions import APIException
+
+    from api.serializers import PostSerializer
+    from api.uploads import ImageUploadHandler
+
+    request = make_request(body)
+    if streaming:
+        request.upload_handlers = [ImageUploadHandler(request)]
+    try:
+        image = request.FILES['image']
+    except APIException:
+        return False
+    serializer = PostSerializer(data={'text': 'bench', 'image': image})
+    return serializer.is_valid()
+
+
+def run(bodies, streaming):
+    tracemalloc.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(CONCURRENCY) as executor:
+        accepted = sum(executor.map(lambda b: upload(b, streaming), bodies))
+    elapsed = (time.perf_counter() - started) * 1000
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return accepted, elapsed, peak
+
+
+def main():
+    common.setup()
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from django.test.client import BOUNDARY, encode_multipart
+
+    cases = {
+        # Below FILE_UPLOAD_MAX_MEMORY_SIZE the stock handlers keep the
+        # whole file in memory.
+        'JPEG': ('photo.jpg', noise_image((1500, 1200), 'JPEG')),
+        'PNG': ('photo.png', noise_image((1700, 1600), 'PNG')),
+        # Accepted by the stock path, then fully decoded (432 MB) when the
+        # image variants are rendered.
+        '144 MP PNG bomb': ('bomb.png', png_bomb(12000, 12000)),
+    }
+    print(f'{CONCURRENCY} concurrent uploads of each file')
+    for label, (name, content) in cases.items():
+        body = encode_multipart(BOUNDARY, {
+            'text': 'bench', 'image': SimpleUploadedFile(name, content)
+        })
+        bodies = [body] * CONCURRENCY
+        print(f'{label} ({len(content) / 2 ** 20:.1f} MiB on the wire)')
+        for mode, streaming in (('stock', False), ('streaming', True)):
+            accepted, elapsed, peak = run(bodies, streaming)
+            print(
+                f'  {mode:10} peak {peak / 2 ** 20:8.1f} MiB  '
+                f'{elapsed:8.1f} ms  accepted {accepted}/{CONCURRENCY}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Shared bootstrap for the benchmark scripts.
+
+Benchmarks run against a throwaway test database, in memory unless a
+file is given to ``setup``:
+
+    python -m benchmarks.bench_pagination
+"""
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+PROJECT_DIR = BASE_DIR / 'yatube_api'
+
+if str(PROJECT_DIR) not in sys.path:
+    sys.path.insert(0, str(PROJECT_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube_api.settings')
+
+
+def setup(database=None):
+    """Configure Django and create an empty test database.
+
+    ``database`` is a path for a test database file, which must not exist;
+    concurrent connections need one.
+    """
+    import django
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    if database is not None:
+        settings.DATABASES['default']['TEST'] = {'NAME': str(database)}
+    django.setup()
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+
+
+def make_user(username='bench'):
+    from django.contrib.auth import get_user_model
+
+    return get_user_model().objects.create_user(
+        username=username, password='bench-password'
+    )
+
+
+def measure(func, repeat=20):
+    """Return the median wall time of ``func`` in milliseconds."""
+    func()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
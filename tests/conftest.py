@@ -30,6 +30,8 @@ if FILENAME not in project_dir_content:
 pytest_plugins = [
     'tests.fixtures.fixture_user',
     'tests.fixtures.fixture_data',
+    'tests.fixtures.fixture_queries',
+    'tests.fixtures.fixture_cache',
 ]
 
 # test .md
@@ -0,0 +1,14 @@
+import pytest
+from django.core.cache import cache
+
+from api.authentication import token_user_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with an empty cache."""
+    cache.clear()
+    token_user_cache.clear()
+    yield
+    cache.clear()
+    token_user_cache.clear()
@@ -1,6 +1,9 @@
+from functools import partial
+
 import pytest
 
 from posts.models import Comment, Follow, Group, Post
+from posts.seeding import seed_data
 
 
 @pytest.fixture
@@ -76,3 +79,11 @@ def follow_4(another_user, user):
 @pytest.fixture
 def follow_5(user_2, user):
     return Follow.objects.create(user=user, following=user_2)
+
+
+@pytest.fixture
+def synthetic_data():
+    """Return ``seed_data`` with small defaults; call it to fill the DB."""
+    return partial(
+        seed_data, users=50, groups=5, posts=500, comments=2000, follows=300
+    )
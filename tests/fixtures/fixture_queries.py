@@ -0,0 +1,24 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.authentication import token_user_cache
+
+
+@pytest.fixture
+def count_queries():
+    """Return the number of SQL queries a GET request runs.
+
+    The JWT user cache is emptied first, so every request is counted with
+    its user lookup.
+    """
+    def count(client, url):
+        token_user_cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        return len(context.captured_queries)
+    return count
@@ -0,0 +1,187 @@
+import asyncio
+import json
+import threading
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from api import asgi
+from api.asgi import PooledASGIHandler
+from posts.models import Post
+
+
+async def call(application, method, path, body=b'', headers=()):
+    """Send a request to an ASGI application; return its status, headers
+    and body.
+    """
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [
+            (b'host', b'testserver'),
+            (b'content-length', str(len(body)).encode()),
+        ] + [
+            (name.encode(), value.encode()) for name, value in headers
+        ],
+        'client': ('127.0.0.1', 0),
+        'server': ('testserver', 80),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await application(scope, receive, send)
+    start = messages[0]
+    content = b''.join(message.get('body', b'') for message in messages[1:])
+    headers = {
+        name.decode().lower(): value.decode()
+        for name, value in start['headers']
+    }
+    return start['status'], headers, content
+
+
+def request(method, path, body=b'', headers=()):
+    return async_to_sync(call)(
+        PooledASGIHandler(), method, path, body, headers
+    )
+
+
+def pooled_urls(post):
+    return [
+        '/api/v1/posts/',
+        '/api/v1/posts/?limit=1&offset=1',
+        '/api/v1/posts/?page_size=1',
+        f'/api/v1/posts/{post.id}/',
+        f'/api/v1/posts/{post.id}/comments/',
+        '/api/v1/groups/',
+    ]
+
+
+@pytest.fixture
+def pool_calls(monkeypatch):
+    """Names of the threads that ran requests through the pool."""
+    threads = []
+    original = asgi.call_in_db_thread
+
+    def call_in_db_thread(func, *args, **kwargs):
+        threads.append(threading.current_thread().name)
+        return original(func, *args, **kwargs)
+
+    monkeypatch.setattr(asgi, 'call_in_db_thread', call_in_db_thread)
+    return threads
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPooledASGIHandler:
+
+    @pytest.fixture(autouse=True)
+    def no_response_cache(self, settings):
+        settings.RESPONSE_CACHE_TIMEOUT = 0
+
+    def test_same_json_as_wsgi(self, client, token, post, post_2,
+                               comment_1_post, comment_2_post, group_1):
+        authorization = f'Bearer {token["access"]}'
+        for path in pooled_urls(post) + [f'/api/v1/groups/{group_1.id}/']:
+            for headers in ((), (('authorization', authorization),)):
+                expected = client.get(
+                    path, **{f'HTTP_{name.upper()}': value
+                             for name, value in headers}
+                )
+                status, _, content = request('GET', path, headers=headers)
+                assert status == expected.status_code == HTTPStatus.OK
+                assert json.loads(content) == expected.json(), (
+                    f'Проверьте, что `{path}` под ASGI отдаёт тот же JSON, '
+                    'что и под WSGI.'
+                )
+
+    def test_reads_run_in_pool(self, pool_calls, post):
+        for path in pooled_urls(post):
+            request('GET', path)
+        assert len(pool_calls) == len(pooled_urls(post)), (
+            'Проверьте, что чтение постов, комментариев и групп '
+            'выполняется в пуле потоков базы.'
+        )
+        assert all(name.startswith('db') for name in pool_calls)
+
+    def test_other_requests_not_pooled(self, pool_calls, token, user,
+                                       group_1):
+        status, _, _ = request(
+            'POST', '/api/v1/posts/',
+            json.dumps({'text': 'Через ASGI'}).encode(),
+            headers=(
+                ('authorization', f'Bearer {token["access"]}'),
+                ('content-type', 'application/json'),
+            )
+        )
+        assert status == HTTPStatus.CREATED, (
+            'Проверьте, что запись под ASGI работает как прежде.'
+        )
+        assert Post.objects.filter(text='Через ASGI', author=user).exists()
+        request('GET', '/api/v1/follow/')
+        request('GET', f'/api/v1/groups/{group_1.id}/')
+        request('GET', '/api/v1/no-such-page/')
+        assert pool_calls == []
+
+    def test_permissions_kept(self, post):
+        status, _, _ = request(
+            'GET', '/api/v1/posts/', headers=(
+                ('authorization', 'Bearer broken'),
+            )
+        )
+        assert status == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что под ASGI токен по-прежнему проверяется.'
+        )
+        status, _, _ = request('GET', '/api/v1/posts/0/comments/')
+        assert status == HTTPStatus.NOT_FOUND
+
+    def test_concurrent_requests_timed(self, settings, pool_calls, post):
+        settings.SERVER_TIMING_SAMPLE_RATE = 1.0
+        handler = PooledASGIHandler()
+
+        async def get_many():
+            return await asyncio.gather(*(
+                call(handler, 'GET', f'/api/v1/posts/{post.id}/')
+                for _ in range(8)
+            ))
+
+        responses = async_to_sync(get_many)()
+        assert {status for status, _, _ in responses} == {HTTPStatus.OK}
+        assert len(pool_calls) == 8
+        for _, headers, _ in responses:
+            assert '"0 queries"' not in headers['server-timing'], (
+                'Проверьте, что SQL-запросы из пула учтены в '
+                '`Server-Timing`.'
+            )
+
+    def test_streaming_export(self, pool_calls, token, post, post_2,
+                              comment_1_post):
+        status, headers, content = request(
+            'GET', '/api/v1/export/posts/?comments=true', headers=(
+                ('authorization', f'Bearer {token["access"]}'),
+            )
+        )
+        assert status == HTTPStatus.OK, (
+            'Проверьте, что экспорт постов работает под ASGI.'
+        )
+        assert headers['content-type'] == 'application/x-ndjson'
+        items = [json.loads(line) for line in content.splitlines()]
+        assert [item['id'] for item in items] == [post.id, post_2.id]
+        assert [
+            comment['id'] for comment in items[0]['comments']
+        ] == [comment_1_post.id]
+        assert pool_calls and all(
+            name.startswith('db') for name in pool_calls
+        ), 'Проверьте, что содержимое экспорта читается в пуле потоков.'
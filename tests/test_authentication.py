@@ -0,0 +1,125 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.authentication import (
+    TokenUserCache, bump_user_version, get_user_version, token_user_cache
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCachedJWTAuthentication:
+
+    url = '/api/v1/follow/'
+
+    def user_queries(self, client):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.url)
+        return response, [
+            query['sql'] for query in context.captured_queries
+            if 'FROM "auth_user"' in query['sql']
+            and '"auth_user"."password"' in query['sql']
+        ]
+
+    def test_user_is_cached(self, user_client):
+        response, queries = self.user_queries(user_client)
+        assert response.status_code == HTTPStatus.OK and len(queries) == 1
+        response, queries = self.user_queries(user_client)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что повторный запрос с тем же токеном '
+            'аутентифицируется.'
+        )
+        assert not queries, (
+            'Проверьте, что пользователь повторного запроса с тем же '
+            'JWT-токеном берётся из кэша, без запроса к базе.'
+        )
+
+    def test_deactivation_invalidates(self, user_client, user):
+        user_client.get(self.url)
+        user.is_active = False
+        user.save()
+        response = user_client.get(self.url)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что после деактивации пользователя его токен '
+            'перестаёт приниматься.'
+        )
+
+    def test_password_change_invalidates(self, user_client, user):
+        user_client.get(self.url)
+        assert len(token_user_cache) == 1
+        user.set_password('new-password-123')
+        user.save()
+        assert len(token_user_cache) == 0, (
+            'Проверьте, что смена пароля сбрасывает кэш пользователя.'
+        )
+
+    def test_change_in_other_worker_invalidates(self, user_client, user,
+                                                django_user_model):
+        user_client.get(self.url)
+        # Another worker deactivates the user: the shared version is
+        # bumped, this process keeps its entry.
+        django_user_model.objects.filter(pk=user.pk).update(is_active=False)
+        bump_user_version(user.pk)
+        assert len(token_user_cache) == 1
+        response = user_client.get(self.url)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что изменение пользователя в другом процессе '
+            'сбрасывает его кэш JWT по общей версии.'
+        )
+
+    def test_version_bumped_after_commit(self, user):
+        with transaction.atomic():
+            user.is_active = False
+            user.save()
+            # A request reading the user before the commit caches it with
+            # this version.
+            during = get_user_version(user.pk)
+        assert get_user_version(user.pk) != during, (
+            'Проверьте, что версия пользователя меняется и после фиксации '
+            'транзакции, в которой он сохранён.'
+        )
+
+    def test_invalid_token_is_rejected(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Bearer invalid')
+        response = client.get(self.url)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        assert len(token_user_cache) == 0, (
+            'Проверьте, что некорректный токен не попадает в кэш.'
+        )
+
+    def test_disabled_by_timeout(self, user_client, settings):
+        settings.JWT_USER_CACHE_TIMEOUT = 0
+        user_client.get(self.url)
+        assert len(token_user_cache) == 0
+
+
+class TestTokenUserCache:
+
+    class FakeUser:
+        def __init__(self, pk):
+            self.pk = pk
+
+    def test_bounded_lru(self):
+        cache = TokenUserCache(max_size=2)
+        users = [self.FakeUser(pk) for pk in range(3)]
+        cache.set(b'a', users[0], None, 60)
+        cache.set(b'b', users[1], None, 60)
+        cache.get(b'a')
+        cache.set(b'c', users[2], None, 60)
+        assert cache.get(b'b') is None, (
+            'Проверьте, что при переполнении из кэша вытесняется давно не '
+            'использованная запись.'
+        )
+        assert cache.get(b'a') and cache.get(b'c')
+        assert set(cache.user_keys) == {0, 2}
+
+    def test_expiry(self):
+        cache = TokenUserCache(max_size=2)
+        cache.set(b'a', self.FakeUser(1), None, -1)
+        assert cache.get(b'a') is None and len(cache) == 0, (
+            'Проверьте, что просроченные записи не возвращаются из кэша.'
+        )
@@ -0,0 +1,87 @@
+from http import HTTPStatus
+
+import pytest
+
+from posts.models import Comment, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBulkCreateAPI:
+
+    posts_bulk_url = '/api/v1/posts/bulk/'
+    comments_bulk_url = '/api/v1/posts/{post_id}/comments/bulk/'
+
+    def test_bulk_posts(self, user_client, user, group_1):
+        data = [
+            {'text': 'Пост 1', 'group': group_1.id},
+            {'text': 'Пост 2'},
+        ]
+        response = user_client.post(self.posts_bulk_url, data, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос со списком постов к '
+            f'`{self.posts_bulk_url}` возвращает ответ со статусом 201.'
+        )
+        created = response.json()
+        assert [item['text'] for item in created] == ['Пост 1', 'Пост 2'], (
+            'Проверьте, что ответ содержит созданные посты в порядке запроса.'
+        )
+        for item in created:
+            db_post = Post.objects.get(pk=item['id'])
+            assert db_post.author == user and item['author'] == user.username
+
+    def test_bulk_posts_invalid_item(self, user_client):
+        data = [{'text': 'Пост'}, {}, {'text': 'Ещё пост'}]
+        response = user_client.post(self.posts_bulk_url, data, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что список с некорректным объектом возвращает ответ '
+            'со статусом 400.'
+        )
+        errors = response.json()
+        assert len(errors) == 3 and 'text' in errors[1] and not errors[0], (
+            'Проверьте, что ответ содержит ошибки каждого объекта списка.'
+        )
+        assert not Post.objects.exists(), (
+            'Проверьте, что при ошибке не создаётся ни один пост.'
+        )
+
+    def test_bulk_limits(self, user_client, settings):
+        settings.BULK_CREATE_MAX_ITEMS = 2
+        for data in ({'text': 'Пост'}, [{'text': 'Пост'}] * 3):
+            response = user_client.post(
+                self.posts_bulk_url, data, format='json'
+            )
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Проверьте, что запрос без списка или со слишком длинным '
+                'списком возвращает ответ со статусом 400.'
+            )
+
+    def test_bulk_not_auth(self, client):
+        response = client.post(
+            self.posts_bulk_url, [{'text': 'Пост'}],
+            content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что неавторизованный пользователь не может создавать '
+            'посты пачкой.'
+        )
+
+    def test_bulk_comments(self, user_client, post):
+        url = self.comments_bulk_url.format(post_id=post.id)
+        data = [{'text': f'Коммент {i}'} for i in range(5)]
+        response = user_client.post(url, data, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос со списком комментариев к `{url}` '
+            'возвращает ответ со статусом 201.'
+        )
+        assert {item['post'] for item in response.json()} == {post.id}
+        assert Comment.objects.filter(post=post).count() == 5
+        post.refresh_from_db()
+        assert post.comments_count == 5, (
+            'Проверьте, что создание комментариев пачкой обновляет '
+            '`comments_count`.'
+        )
+
+    def test_bulk_comments_missing_post(self, user_client):
+        url = self.comments_bulk_url.format(post_id=12345)
+        response = user_client.post(url, [{'text': 'К'}], format='json')
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,132 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import transaction
+from rest_framework.test import APIClient
+
+from posts.models import Comment, Group, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestResponseCache:
+
+    post_list_url = '/api/v1/posts/'
+    group_url = '/api/v1/groups/'
+    comments_url = '/api/v1/posts/{post_id}/comments/'
+    stats_url = '/api/v1/cache-stats/'
+
+    def get(self, client, url):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        return response
+
+    def test_anonymous_get_is_cached(self, client, post):
+        first = self.get(client, self.post_list_url)
+        second = self.get(client, self.post_list_url)
+        assert first['X-Cache'] == 'MISS' and second['X-Cache'] == 'HIT', (
+            'Проверьте, что повторный анонимный GET-запрос к '
+            f'`{self.post_list_url}` отдаётся из кэша.'
+        )
+        assert first.json() == second.json(), (
+            'Проверьте, что ответ из кэша совпадает с исходным.'
+        )
+
+    def test_authenticated_get_is_not_cached(self, user_client, post):
+        self.get(user_client, self.post_list_url)
+        response = self.get(user_client, self.post_list_url)
+        assert 'X-Cache' not in response, (
+            'Проверьте, что ответы авторизованным пользователям не '
+            'кэшируются.'
+        )
+
+    def test_write_invalidates_namespace(self, client, user, post):
+        self.get(client, self.post_list_url)
+        Post.objects.create(text='Новый пост', author=user)
+        response = self.get(client, self.post_list_url)
+        assert len(response.json()) == 2, (
+            'Проверьте, что создание поста сбрасывает кэш списка постов.'
+        )
+
+    def test_read_during_transaction_not_kept(self, client, user, post):
+        with transaction.atomic():
+            Post.objects.create(text='Новый пост', author=user)
+            # Stands for a read of another connection, which still sees
+            # the rows of before the write.
+            during = self.get(client, self.post_list_url)
+        after = self.get(client, self.post_list_url)
+        assert after['X-Cache'] == 'MISS', (
+            'Проверьте, что ответ, закэшированный до фиксации транзакции '
+            'записи, не отдаётся после неё.'
+        )
+        assert after['ETag'] != during['ETag']
+
+    def test_rename_invalidates_posts_and_comments(self, client, user,
+                                                   post, comment_1_post):
+        comments_url = self.comments_url.format(post_id=post.id)
+        self.get(client, self.post_list_url)
+        self.get(client, comments_url)
+        user.username = 'Переименованный'
+        user.save()
+        posts = self.get(client, self.post_list_url)
+        comments = self.get(client, comments_url)
+        assert posts.json()[0]['author'] == 'Переименованный', (
+            'Проверьте, что смена имени пользователя сбрасывает кэш постов.'
+        )
+        assert comments.json()[0]['author'] == 'Переименованный', (
+            'Проверьте, что смена имени пользователя сбрасывает кэш '
+            'комментариев к постам, которые он комментировал.'
+        )
+
+    def test_comment_invalidates_only_its_post(self, client, user, post,
+                                               another_post):
+        post_comments = self.comments_url.format(post_id=post.id)
+        other_comments = self.comments_url.format(post_id=another_post.id)
+        for url in (post_comments, other_comments, self.post_list_url,
+                    self.group_url):
+            self.get(client, url)
+
+        Comment.objects.create(author=user, post=post, text='Коммент')
+
+        for url in (post_comments, self.post_list_url):
+            assert self.get(client, url)['X-Cache'] == 'MISS', (
+                'Проверьте, что новый комментарий сбрасывает кэш '
+                f'`{url}`.'
+            )
+        for url in (other_comments, self.group_url):
+            assert self.get(client, url)['X-Cache'] == 'HIT', (
+                'Проверьте, что новый комментарий не сбрасывает кэш '
+                f'`{url}`.'
+            )
+
+    def test_group_delete_invalidates_posts(self, client, post, group_1):
+        self.get(client, self.post_list_url)
+        Group.objects.filter(pk=group_1.pk).get().delete()
+        response = self.get(client, self.post_list_url)
+        assert response.json()[0]['group'] is None, (
+            'Проверьте, что удаление группы сбрасывает кэш постов.'
+        )
+
+    def test_cache_stats(self, client, user_client, admin_user, post):
+        self.get(client, self.post_list_url)
+        self.get(client, self.post_list_url)
+
+        response = user_client.get(self.stats_url)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что `{self.stats_url}` доступен только '
+            'администраторам.'
+        )
+
+        admin_client = APIClient()
+        admin_client.force_authenticate(admin_user)
+        stats = self.get(admin_client, self.stats_url).json()
+        assert stats['post-list']['hits'] >= 1, (
+            f'Проверьте, что `{self.stats_url}` возвращает число попаданий '
+            'в кэш для каждого эндпоинта.'
+        )
+        assert 0 < stats['post-list']['hit_ratio'] < 1, (
+            f'Проверьте, что `{self.stats_url}` возвращает долю попаданий '
+            'в кэш.'
+        )
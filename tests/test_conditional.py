@@ -0,0 +1,151 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.views import CommentViewSet, PostViewSet
+from posts.models import Comment, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConditionalRequests:
+
+    post_list_url = '/api/v1/posts/'
+    post_detail_url = '/api/v1/posts/{post_id}/'
+    comments_url = '/api/v1/posts/{post_id}/comments/'
+
+    def forbid_serializer(self, monkeypatch):
+        def fail(*args, **kwargs):
+            raise AssertionError(
+                'Ответ 304 не должен создавать сериализатор.'
+            )
+        for view in (PostViewSet, CommentViewSet):
+            monkeypatch.setattr(view, 'get_serializer', fail)
+
+    def test_list_validators(self, client, post):
+        response = client.get(self.post_list_url)
+        assert response.has_header('ETag'), (
+            f'Проверьте, что ответ на GET-запрос к `{self.post_list_url}` '
+            'содержит заголовок `ETag`.'
+        )
+        assert response.has_header('Last-Modified'), (
+            f'Проверьте, что ответ на GET-запрос к `{self.post_list_url}` '
+            'содержит заголовок `Last-Modified`.'
+        )
+
+    def test_if_none_match_not_modified(self, client, user_client, post,
+                                        comment_1_post, monkeypatch):
+        urls = (
+            self.post_list_url,
+            self.post_detail_url.format(post_id=post.id),
+            self.comments_url.format(post_id=post.id),
+        )
+        etags = {url: client.get(url)['ETag'] for url in urls}
+        self.forbid_serializer(monkeypatch)
+        for url, etag in etags.items():
+            for http_client in (client, user_client):
+                response = http_client.get(url, HTTP_IF_NONE_MATCH=etag)
+                assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                    f'Проверьте, что GET-запрос к `{url}` с актуальным '
+                    '`If-None-Match` возвращает ответ со статусом 304.'
+                )
+                assert not response.content, (
+                    'Проверьте, что ответ 304 не содержит тела.'
+                )
+
+    def test_if_modified_since(self, client, post):
+        last_modified = client.get(self.post_list_url)['Last-Modified']
+        response = client.get(
+            self.post_list_url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{self.post_list_url}` с '
+            'актуальным `If-Modified-Since` возвращает ответ со статусом 304.'
+        )
+
+    def test_etag_changes_after_write(self, client, user, post):
+        url = self.comments_url.format(post_id=post.id)
+        post_etag = client.get(self.post_list_url)['ETag']
+        comments_etag = client.get(url)['ETag']
+
+        Post.objects.filter(pk=post.pk).get().save()
+        Comment.objects.create(author=user, post=post, text='Коммент')
+
+        response = client.get(self.post_list_url, HTTP_IF_NONE_MATCH=post_etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение поста меняет `ETag` списка постов.'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=comments_etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый комментарий меняет `ETag` списка '
+            'комментариев.'
+        )
+
+    def test_if_match_on_update(self, user_client, post):
+        url = self.post_detail_url.format(post_id=post.id)
+        etag = user_client.get(url)['ETag']
+
+        response = user_client.patch(
+            url, data={'text': 'Первая правка'}, HTTP_IF_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что PATCH-запрос к `{url}` с актуальным '
+            '`If-Match` возвращает ответ со статусом 200.'
+        )
+        assert response['ETag'] != etag, (
+            'Проверьте, что ответ на изменение поста содержит новый `ETag`.'
+        )
+
+        response = user_client.put(
+            url, data={'text': 'Вторая правка'}, HTTP_IF_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.PRECONDITION_FAILED, (
+            f'Проверьте, что PUT-запрос к `{url}` с устаревшим `If-Match` '
+            'возвращает ответ со статусом 412.'
+        )
+        post.refresh_from_db()
+        assert post.text == 'Первая правка', (
+            'Проверьте, что запрос с устаревшим `If-Match` не изменяет пост.'
+        )
+
+    def test_list_not_modified_without_sql(self, client, post):
+        etag = client.get(self.post_list_url)['ETag']
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(
+                self.post_list_url, HTTP_IF_NONE_MATCH=etag
+            )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert not context.captured_queries, (
+            'Проверьте, что ответ 304 на список не выполняет SQL-запросов: '
+            f'{context.captured_queries}'
+        )
+
+    def test_detail_etag_depends_on_format(self, client, post):
+        url = self.post_detail_url.format(post_id=post.id)
+        etag = client.get(url)['ETag']
+        response = client.get(
+            url, HTTP_ACCEPT='application/msgpack', HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что `ETag` JSON-ответа не подходит к ответу в '
+            'формате MessagePack.'
+        )
+        assert response['ETag'] != etag
+
+    def test_if_match_survives_other_writes(self, user_client, user, post,
+                                            another_post):
+        url = self.post_detail_url.format(post_id=post.id)
+        etag = user_client.get(url)['ETag']
+        Comment.objects.create(
+            author=user, post=another_post, text='Коммент'
+        )
+        another_post.text = 'Другой пост изменён'
+        another_post.save()
+        response = user_client.patch(
+            url, data={'text': 'Правка'}, HTTP_IF_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменения других постов и комментариев к ним '
+            'не делают `If-Match` поста устаревшим.'
+        )
@@ -0,0 +1,97 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from posts.models import Comment, Post, UserStats
+
+
+@pytest.mark.django_db(transaction=True)
+class TestActivityCounters:
+
+    post_list_url = '/api/v1/posts/'
+    post_detail_url = '/api/v1/posts/{post_id}/'
+    comments_url = '/api/v1/posts/{post_id}/comments/'
+    comment_detail_url = '/api/v1/posts/{post_id}/comments/{comment_id}/'
+    follow_url = '/api/v1/follow/'
+    profile_url = '/api/v1/profiles/{username}/'
+
+    def get_profile(self, client, username):
+        response = client.get(self.profile_url.format(username=username))
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.profile_url}` возвращает '
+            'ответ со статусом 200.'
+        )
+        return response.json()
+
+    def test_comments_count(self, user_client, post):
+        url = self.comments_url.format(post_id=post.id)
+        comment_id = user_client.post(url, data={'text': '1'}).json()['id']
+        user_client.post(url, data={'text': '2'})
+        post_url = self.post_detail_url.format(post_id=post.id)
+        assert user_client.get(post_url).json()['comments_count'] == 2, (
+            'Проверьте, что ответ с постом содержит поле `comments_count` с '
+            'числом комментариев.'
+        )
+        user_client.delete(self.comment_detail_url.format(
+            post_id=post.id, comment_id=comment_id
+        ))
+        post.refresh_from_db()
+        assert post.comments_count == 1, (
+            'Проверьте, что удаление комментария уменьшает `comments_count`.'
+        )
+
+    def test_comments_count_read_only(self, user_client, post):
+        response = user_client.patch(
+            self.post_detail_url.format(post_id=post.id),
+            data={'comments_count': 100}
+        )
+        assert response.json()['comments_count'] == 0, (
+            'Проверьте, что поле `comments_count` доступно только для чтения.'
+        )
+
+    def test_profile_counters(self, client, user_client, user, another_user):
+        user_client.post(self.post_list_url, data={'text': 'Пост'})
+        user_client.post(
+            self.follow_url, data={'following': another_user.username}
+        )
+        profile = self.get_profile(client, user.username)
+        assert (
+            profile['posts_count'],
+            profile['followers_count'],
+            profile['following_count'],
+        ) == (1, 0, 1), (
+            'Проверьте, что профиль содержит число постов, подписчиков и '
+            'подписок пользователя.'
+        )
+        profile = self.get_profile(client, another_user.username)
+        assert profile['followers_count'] == 1, (
+            'Проверьте, что подписка увеличивает число подписчиков автора.'
+        )
+
+    def test_post_delete_decrements(self, user_client, user, post):
+        UserStats.objects.create(user=user, posts_count=1)
+        user_client.delete(self.post_detail_url.format(post_id=post.id))
+        assert UserStats.objects.get(user=user).posts_count == 0, (
+            'Проверьте, что удаление поста уменьшает число постов автора.'
+        )
+
+    def test_rebuild_counters(self, user, another_user, post, follow_1,
+                              comment_1_post, comment_2_post):
+        Post.objects.filter(pk=post.pk).update(comments_count=42)
+        UserStats.objects.create(user=user, posts_count=7)
+        call_command('rebuild_counters', batch_size=1, stdout=None)
+
+        post.refresh_from_db()
+        assert post.comments_count == Comment.objects.filter(
+            post=post
+        ).count(), (
+            'Проверьте, что команда `rebuild_counters` пересчитывает '
+            '`comments_count`.'
+        )
+        stats = UserStats.objects.get(user=user)
+        assert (stats.posts_count, stats.following_count) == (1, 1), (
+            'Проверьте, что команда `rebuild_counters` пересчитывает '
+            'счётчики пользователей.'
+        )
+        assert UserStats.objects.get(user=another_user).followers_count == 1
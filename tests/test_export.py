@@ -0,0 +1,147 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from posts.models import Comment, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPostExport:
+
+    url = '/api/v1/export/posts/'
+
+    @pytest.fixture
+    def posts(self, user, another_user, group_1):
+        posts = [
+            Post.objects.create(text=f'Пост {i}', author=user, group=group_1)
+            for i in range(3)
+        ] + [
+            Post.objects.create(text=f'Чужой пост {i}', author=another_user)
+            for i in range(2)
+        ]
+        Comment.objects.create(author=user, post=posts[0], text='Коммент 1')
+        Comment.objects.create(
+            author=another_user, post=posts[0], text='Коммент 2'
+        )
+        return posts
+
+    def export(self, client, params=None):
+        response = client.get(self.url, params or {})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        assert response.streaming and (
+            response['Content-Type'] == 'application/x-ndjson'
+        ), (
+            f'Проверьте, что `{self.url}` отдаёт потоковый NDJSON.'
+        )
+        content = b''.join(response.streaming_content).decode()
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_requires_authentication(self, client):
+        response = client.get(self.url)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            f'Проверьте, что `{self.url}` недоступен анонимным '
+            'пользователям.'
+        )
+
+    def test_exports_all_posts_in_batches(self, user_client, posts,
+                                          settings):
+        settings.EXPORT_BATCH_SIZE = 2
+        with CaptureQueriesContext(connection) as context:
+            items = self.export(user_client)
+        assert [item['id'] for item in items] == [post.id for post in posts], (
+            'Проверьте, что экспорт содержит все посты в порядке '
+            'публикации.'
+        )
+        post_queries = [
+            query for query in context.captured_queries
+            if 'FROM "posts_post"' in query['sql']
+        ]
+        assert len(post_queries) == 4, (
+            'Проверьте, что посты читаются пачками по `EXPORT_BATCH_SIZE`.'
+        )
+        list_item = user_client.get(f'/api/v1/posts/{posts[0].id}/').json()
+        assert items[0] == list_item, (
+            'Проверьте, что строки экспорта совпадают с представлением '
+            'поста в API.'
+        )
+
+    def test_filters(self, user_client, user, group_1, posts):
+        items = self.export(user_client, {'author': user.username})
+        assert {item['author'] for item in items} == {user.username}
+        items = self.export(user_client, {'group': group_1.id})
+        assert len(items) == 3
+        since = posts[1].pub_date
+        until = posts[4].pub_date
+        items = self.export(user_client, {
+            'since': since.isoformat(), 'until': until.isoformat()
+        })
+        assert [item['id'] for item in items] == [
+            post.id for post in posts[1:4]
+        ], (
+            'Проверьте фильтрацию экспорта по диапазону `pub_date`.'
+        )
+
+    def test_with_comments(self, user_client, posts):
+        items = self.export(user_client, {'comments': 'true'})
+        assert [c['text'] for c in items[0]['comments']] == [
+            'Коммент 1', 'Коммент 2'
+        ], (
+            'Проверьте, что с `comments=true` в каждую строку добавляются '
+            'комментарии поста.'
+        )
+        assert all(item['comments'] == [] for item in items[1:])
+        assert 'comments' not in self.export(user_client)[0]
+
+    def test_comments_in_bounded_chunks(self, user_client, posts, user,
+                                        settings):
+        for post in posts[1:3]:
+            Comment.objects.create(author=user, post=post, text='Ещё')
+        Post.objects.filter(pk=posts[0].pk).update(comments_count=2)
+        for post in posts[1:3]:
+            Post.objects.filter(pk=post.pk).update(comments_count=1)
+        expected = self.export(user_client, {'comments': 'true'})
+        settings.EXPORT_COMMENT_BATCH_SIZE = 1
+        with CaptureQueriesContext(connection) as context:
+            items = self.export(user_client, {'comments': 'true'})
+        assert items == expected, (
+            'Проверьте, что комментарии, прочитанные частями по '
+            '`EXPORT_COMMENT_BATCH_SIZE`, выгружаются так же.'
+        )
+        comment_queries = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].split(' FROM ')[1].startswith('"posts_comment"')
+        ]
+        # Post 0: two chunks of one comment and an empty one; post 1 is a
+        # run, posts 2 to 4 without comments of their own are another.
+        assert len(comment_queries) == 5, comment_queries
+        assert all('LIMIT' in sql for sql in comment_queries), (
+            'Проверьте, что комментарии экспорта читаются ограниченными '
+            'частями.'
+        )
+
+    def test_stale_comments_count(self, user_client, posts, settings):
+        expected = self.export(user_client, {'comments': 'true'})
+        Post.objects.update(comments_count=0)
+        settings.EXPORT_COMMENT_BATCH_SIZE = 1
+        assert self.export(user_client, {'comments': 'true'}) == expected, (
+            'Проверьте, что экспорт не полагается на точность '
+            '`comments_count`.'
+        )
+
+    def test_invalid_filter(self, user_client):
+        response = user_client.get(self.url, {'since': 'вчера'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что некорректный фильтр возвращает ответ со '
+            'статусом 400.'
+        )
+
+    def test_future_range_is_empty(self, user_client, posts):
+        since = timezone.now() + timezone.timedelta(days=1)
+        assert self.export(user_client, {'since': since.isoformat()}) == []
@@ -0,0 +1,57 @@
+import pytest
+
+from posts.models import Follow, Post
+from posts.search import rebuild_index
+
+
+@pytest.mark.django_db(transaction=True)
+class TestValuesSerializerParity:
+    """List responses must not change when the fast path is switched on."""
+
+    @pytest.fixture
+    def data(self, user, another_user, user_2, post, another_post,
+             comment_1_post, comment_2_post):
+        Post.objects.filter(pk=post.pk).update(
+            image='posts/cat.jpg',
+            image_variants={'thumb': {'webp': 'posts/variants/1/thumb.webp'}}
+        )
+        Post.objects.create(text='Пост без группы', author=another_user)
+        Follow.objects.create(user=user, following=another_user)
+        Follow.objects.create(user=user, following=user_2)
+        # Test flushes leave rows of earlier tests in the FTS table.
+        rebuild_index()
+        return post
+
+    def get_both(self, client, url, settings):
+        responses = []
+        for fast in (False, True):
+            settings.FAST_LIST_SERIALIZATION = fast
+            response = client.get(url)
+            assert response.status_code == 200, (
+                f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+                'статусом 200.'
+            )
+            responses.append(response.content)
+        return responses
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/posts/',
+        '/api/v1/posts/?limit=2&offset=1',
+        '/api/v1/posts/?page_size=2',
+        '/api/v1/posts/?search=пост',
+        '/api/v1/posts/{post_id}/comments/',
+        '/api/v1/posts/{post_id}/comments/?page_size=1',
+        '/api/v1/groups/',
+        '/api/v1/follow/',
+        '/api/v1/follow/?search=TestUser2',
+    ])
+    def test_same_json(self, user_client, data, settings, url):
+        url = url.format(post_id=data.id)
+        model_content, values_content = self.get_both(
+            user_client, url, settings
+        )
+        assert b'"id"' in model_content
+        assert values_content == model_content, (
+            f'Проверьте, что быстрая сериализация списка `{url}` отдаёт '
+            'тот же JSON, что и сериализатор модели.'
+        )
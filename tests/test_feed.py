@@ -0,0 +1,110 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+
+from posts.models import Post, TimelineEntry
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFeedAPI:
+
+    feed_url = '/api/v1/feed/'
+    follow_url = '/api/v1/follow/'
+    post_list_url = '/api/v1/posts/'
+
+    @pytest.fixture
+    def another_client(self, another_user):
+        client = APIClient()
+        client.force_authenticate(another_user)
+        return client
+
+    def feed_ids(self, client, url=None):
+        response = client.get(url or self.feed_url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос авторизованного пользователя к '
+            f'`{self.feed_url}` возвращает ответ со статусом 200.'
+        )
+        return [item['id'] for item in response.json()['results']]
+
+    def test_feed_not_auth(self, client):
+        response = client.get(self.feed_url)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что GET-запрос неавторизованного пользователя к '
+            f'`{self.feed_url}` возвращает ответ со статусом 401.'
+        )
+
+    def test_follow_backfills_feed(self, user_client, another_user,
+                                   another_post, post):
+        user_client.post(
+            self.follow_url, data={'following': another_user.username}
+        )
+        assert self.feed_ids(user_client) == [another_post.id], (
+            'Проверьте, что после подписки в ленте появляются посты автора '
+            'и только они.'
+        )
+
+    def test_new_post_is_fanned_out(self, user_client, another_client,
+                                    another_user, another_post):
+        user_client.post(
+            self.follow_url, data={'following': another_user.username}
+        )
+        response = another_client.post(
+            self.post_list_url, data={'text': 'Свежий пост'}
+        )
+        new_id = response.json()['id']
+        assert self.feed_ids(user_client) == [new_id, another_post.id], (
+            'Проверьте, что новый пост автора попадает в ленту подписчика '
+            'первым.'
+        )
+
+    def test_feed_cursor_pages(self, user_client, another_user, user):
+        posts = [
+            Post.objects.create(text=f'Пост {i}', author=another_user)
+            for i in range(5)
+        ]
+        user_client.post(
+            self.follow_url, data={'following': another_user.username}
+        )
+        url = f'{self.feed_url}?page_size=2'
+        ids = []
+        while url:
+            data = user_client.get(url).json()
+            ids.extend(item['id'] for item in data['results'])
+            url = data['next']
+        assert ids == [post.id for post in reversed(posts)], (
+            'Проверьте, что лента листается курсором от новых постов к '
+            'старым без пропусков и повторов.'
+        )
+
+    def test_timeline_is_trimmed(self, settings, user_client, user,
+                                 another_client, another_user):
+        settings.FEED_TIMELINE_LENGTH = 2
+        settings.FEED_TRIM_INTERVAL = 1
+        user_client.post(
+            self.follow_url, data={'following': another_user.username}
+        )
+        for i in range(4):
+            another_client.post(self.post_list_url, data={'text': f'{i}'})
+        assert TimelineEntry.objects.filter(user=user).count() == 2, (
+            'Проверьте, что лента обрезается до `FEED_TIMELINE_LENGTH` '
+            'записей.'
+        )
+
+    def test_popular_author_merged_on_read(self, settings, user_client, user,
+                                           another_client, another_user):
+        settings.FEED_FANOUT_MAX_FOLLOWERS = 0
+        user_client.post(
+            self.follow_url, data={'following': another_user.username}
+        )
+        response = another_client.post(
+            self.post_list_url, data={'text': 'Пост популярного автора'}
+        )
+        assert not TimelineEntry.objects.filter(user=user).exists(), (
+            'Проверьте, что посты популярных авторов не копируются в ленты '
+            'подписчиков.'
+        )
+        assert self.feed_ids(user_client) == [response.json()['id']], (
+            'Проверьте, что посты популярных авторов добавляются в ленту '
+            'при чтении.'
+        )
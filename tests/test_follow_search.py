@@ -0,0 +1,94 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.db.models import F
+
+from api.filters import prefix_lookup
+from posts.models import Follow
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFollowPrefixSearch:
+
+    url = '/api/v1/follow/'
+
+    @pytest.fixture
+    def authors(self, user, django_user_model):
+        authors = [
+            django_user_model.objects.create_user(username=name)
+            for name in ('Alice', 'alina', 'Bob', 'malice')
+        ]
+        for author in authors:
+            Follow.objects.create(user=user, following=author)
+        return authors
+
+    def found(self, client, **params):
+        response = client.get(self.url, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.url}` с параметром `search` '
+            'возвращает ответ со статусом 200.'
+        )
+        return {item['following'] for item in response.json()}
+
+    def test_prefix_ignores_case(self, user_client, authors):
+        assert self.found(user_client, search='AL') == {'Alice', 'alina'}, (
+            'Проверьте, что параметр `search` находит подписки на авторов, '
+            'имя которых начинается с запроса, без учёта регистра.'
+        )
+        assert self.found(user_client, search='lic') == set(), (
+            'Проверьте, что по умолчанию `search` не ищет запрос в середине '
+            'имени автора.'
+        )
+
+    def test_contains_opt_in(self, user_client, authors):
+        found = self.found(user_client, search='LIC', match='contains')
+        assert found == {'Alice', 'malice'}, (
+            'Проверьте, что с `match=contains` параметр `search` ищет '
+            'запрос в любом месте имени автора.'
+        )
+
+    def test_unknown_match(self, user_client, authors):
+        response = user_client.get(self.url, {'search': 'a', 'match': 'x'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что неизвестное значение `match` возвращает ответ '
+            'со статусом 400.'
+        )
+
+    def test_rename_updates_search(self, user_client, authors):
+        bob = authors[2]
+        bob.username = 'Zed'
+        bob.save()
+        assert self.found(user_client, search='z') == {'Zed'}, (
+            'Проверьте, что после смены имени автора подписка находится по '
+            'новому имени.'
+        )
+        assert self.found(user_client, search='bob') == set(), (
+            'Проверьте, что после смены имени автора подписка не находится '
+            'по старому имени.'
+        )
+
+    def test_prefix_uses_index(self, user, authors):
+        queryset = Follow.objects.filter(
+            user=user, **prefix_lookup('following_name', 'al')
+        )
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        assert 'follow_user_name_idx' in plan, (
+            'Проверьте, что поиск по началу имени использует индекс '
+            f'`follow_user_name_idx`: {plan}'
+        )
+
+    def test_seeded_follows_have_names(self, synthetic_data):
+        synthetic_data()
+        follows = Follow.objects.values_list(
+            'following_name', F('following__username')
+        )
+        assert follows and all(
+            name == username.casefold() for name, username in follows
+        ), (
+            'Проверьте, что `seed_data` заполняет `following_name` '
+            'подписок.'
+        )
@@ -0,0 +1,255 @@
+import io
+import os
+from concurrent.futures import Future
+from http import HTTPStatus
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from posts import images
+from posts.models import Post
+
+
+class DeferredExecutor:
+    """Executor stub that runs submitted jobs only when asked to."""
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.jobs.append((future, fn, args))
+        return future
+
+    def run_all(self):
+        for future, fn, args in self.jobs:
+            future.set_result(fn(*args))
+        self.jobs = []
+
+
+def make_upload(size=(2000, 1000), mode='RGB', fmt='PNG', name='big.png'):
+    buffer = io.BytesIO()
+    Image.new(mode, size, 'red').save(buffer, fmt)
+    return SimpleUploadedFile(name, buffer.getvalue(), f'image/{fmt.lower()}')
+
+
+def variant_names(variants):
+    return {name for names in variants.values() for name in names.values()}
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.IMAGE_VARIANT_WORKERS = 0
+    return tmp_path
+
+
+@pytest.mark.django_db(transaction=True)
+class TestImageVariants:
+
+    post_list_url = '/api/v1/posts/'
+
+    def create_post(self, client, upload):
+        response = client.post(
+            self.post_list_url, {'text': 'Пост с картинкой', 'image': upload},
+            format='multipart'
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос с изображением к '
+            f'`{self.post_list_url}` возвращает ответ со статусом 201.'
+        )
+        return response.json()
+
+    def test_variants_are_rendered(self, user_client, media_root, settings):
+        created = self.create_post(user_client, make_upload())
+        post = Post.objects.get(pk=created['id'])
+        assert set(post.image_variants) == set(settings.IMAGE_VARIANT_SIZES), (
+            'Проверьте, что для изображения поста создаются все варианты '
+            'размеров.'
+        )
+        for variant, names in post.image_variants.items():
+            assert set(names) == {'webp', 'jpeg'}
+            bound = settings.IMAGE_VARIANT_SIZES[variant]
+            for name in names.values():
+                with Image.open(os.path.join(media_root, name)) as image:
+                    assert image.width <= bound[0], (
+                        f'Проверьте, что вариант `{variant}` вписан в '
+                        f'размер {bound}.'
+                    )
+                    assert image.height <= bound[1]
+
+        response = user_client.get(f'{self.post_list_url}{post.id}/')
+        urls = response.json()['image_variants']
+        assert urls['thumb']['webp'].startswith('http://testserver/media/'), (
+            'Проверьте, что сериализатор поста возвращает абсолютные ссылки '
+            'на варианты изображения.'
+        )
+
+    def test_alpha_image_saved_as_jpeg(self, user_client, media_root):
+        upload = make_upload(size=(300, 300), mode='RGBA', name='alpha.png')
+        created = self.create_post(user_client, upload)
+        post = Post.objects.get(pk=created['id'])
+        jpeg = os.path.join(media_root, post.image_variants['thumb']['jpeg'])
+        with Image.open(jpeg) as image:
+            assert image.mode == 'RGB', (
+                'Проверьте, что изображения с прозрачностью сохраняются в '
+                'JPEG без альфа-канала.'
+            )
+
+    def test_create_does_not_wait(self, user_client, media_root, monkeypatch):
+        executor = DeferredExecutor()
+        monkeypatch.setattr(images, 'get_executor', lambda: executor)
+
+        created = self.create_post(user_client, make_upload())
+        assert created['image_variants'] is None, (
+            'Проверьте, что создание поста не ждёт обработки изображения.'
+        )
+        assert len(executor.jobs) == 1, (
+            'Проверьте, что обработка изображения передаётся в пул '
+            'процессов.'
+        )
+
+        executor.run_all()
+        response = user_client.get(f'{self.post_list_url}{created["id"]}/')
+        assert response.json()['image_variants'] is not None, (
+            'Проверьте, что после обработки пост возвращает ссылки на '
+            'варианты изображения.'
+        )
+
+    def test_stale_result_is_dropped(self, user_client, media_root,
+                                     monkeypatch):
+        executor = DeferredExecutor()
+        monkeypatch.setattr(images, 'get_executor', lambda: executor)
+        created = self.create_post(user_client, make_upload())
+        url = f'{self.post_list_url}{created["id"]}/'
+        user_client.patch(url, {'image': make_upload(name='new.png')},
+                          format='multipart')
+
+        first, _, args = executor.jobs[0]
+        first.set_result(images.render_variants(*args))
+        assert Post.objects.get(pk=created['id']).image_variants == {}, (
+            'Проверьте, что варианты заменённого изображения не '
+            'сохраняются в посте.'
+        )
+
+    def test_stale_job_does_not_overwrite(self, user_client, media_root,
+                                          monkeypatch):
+        executor = DeferredExecutor()
+        monkeypatch.setattr(images, 'get_executor', lambda: executor)
+        created = self.create_post(user_client, make_upload())
+        url = f'{self.post_list_url}{created["id"]}/'
+        user_client.patch(url, {'image': make_upload(name='new.png')},
+                          format='multipart')
+        (stale, _, stale_args), (current, _, args) = executor.jobs
+        current.set_result(images.render_variants(*args))
+        stale_variants = images.render_variants(*stale_args)
+        stale.set_result(stale_variants)
+
+        names = variant_names(
+            Post.objects.get(pk=created['id']).image_variants
+        )
+        stale_names = variant_names(stale_variants)
+        assert names.isdisjoint(stale_names), (
+            'Проверьте, что варианты каждого изображения пишутся в '
+            'отдельный каталог.'
+        )
+        assert all(os.path.exists(media_root / name) for name in names)
+        assert not any(
+            os.path.exists(media_root / name) for name in stale_names
+        ), 'Проверьте, что файлы отброшенных вариантов удаляются.'
+
+    def test_superseded_variants_removed(self, user_client, media_root):
+        created = self.create_post(user_client, make_upload())
+        url = f'{self.post_list_url}{created["id"]}/'
+        old = variant_names(Post.objects.get(pk=created['id']).image_variants)
+        user_client.patch(url, {'image': make_upload(name='new.png')},
+                          format='multipart')
+        new = variant_names(Post.objects.get(pk=created['id']).image_variants)
+        assert new and all(os.path.exists(media_root / name) for name in new)
+        assert not any(
+            os.path.exists(media_root / name) for name in old
+        ), 'Проверьте, что при замене изображения старые варианты удаляются.'
+
+        user_client.delete(url)
+        assert not any(
+            os.path.exists(media_root / name) for name in new
+        ), 'Проверьте, что при удалении поста его варианты удаляются.'
+
+    def test_post_without_image(self, user_client, media_root):
+        response = user_client.post(self.post_list_url, {'text': 'Текст'})
+        assert response.json()['image_variants'] is None
+
+
+@pytest.mark.django_db(transaction=True)
+class TestImageUploadLimits:
+
+    post_list_url = '/api/v1/posts/'
+
+    def upload(self, client, upload):
+        return client.post(
+            self.post_list_url, {'text': 'Пост', 'image': upload},
+            format='multipart'
+        )
+
+    def assert_rejected(self, response, status=HTTPStatus.BAD_REQUEST):
+        assert response.status_code == status, (
+            'Проверьте, что загрузка недопустимого изображения возвращает '
+            f'ответ со статусом {status.value}.'
+        )
+        assert 'image' in response.json()
+        assert not Post.objects.exists(), (
+            'Проверьте, что при отклонённой загрузке пост не создаётся.'
+        )
+
+    def test_file_too_large(self, user_client, media_root, settings):
+        settings.IMAGE_UPLOAD_MAX_SIZE = 10 * 1024
+        noise = Image.frombytes('RGB', (200, 200), os.urandom(200 * 200 * 3))
+        buffer = io.BytesIO()
+        noise.save(buffer, 'PNG')
+        upload = SimpleUploadedFile('noise.png', buffer.getvalue())
+        self.assert_rejected(
+            self.upload(user_client, upload),
+            HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+        )
+
+    def test_too_many_pixels_without_decoding(self, user_client, media_root,
+                                              settings, monkeypatch):
+        settings.IMAGE_UPLOAD_MAX_PIXELS = 1_000_000
+        upload = make_upload(size=(4000, 4000))
+
+        def fail(*args, **kwargs):
+            raise AssertionError('pixel data decoded')
+
+        monkeypatch.setattr('PIL.ImageFile.ImageFile.load', fail)
+        self.assert_rejected(self.upload(user_client, upload))
+
+    def test_pillow_decompression_bomb(self, user_client, media_root,
+                                       monkeypatch):
+        monkeypatch.setattr(Image, 'MAX_IMAGE_PIXELS', 1000)
+        self.assert_rejected(
+            self.upload(user_client, make_upload(size=(100, 100)))
+        )
+
+    def test_dimension_limit(self, user_client, media_root, settings):
+        settings.IMAGE_UPLOAD_MAX_DIMENSION = 1000
+        self.assert_rejected(
+            self.upload(user_client, make_upload(size=(1500, 10)))
+        )
+
+    def test_not_an_image(self, user_client, media_root):
+        upload = SimpleUploadedFile('text.png', b'not an image' * 100)
+        self.assert_rejected(self.upload(user_client, upload))
+
+    def test_format_not_allowed(self, user_client, media_root):
+        upload = make_upload(size=(10, 10), fmt='BMP', name='image.bmp')
+        self.assert_rejected(self.upload(user_client, upload))
+
+    def test_valid_upload_is_stored(self, user_client, media_root):
+        response = self.upload(user_client, make_upload(size=(300, 200)))
+        assert response.status_code == HTTPStatus.CREATED
+        post = Post.objects.get()
+        with Image.open(post.image.path) as image:
+            assert image.size == (300, 200), (
+                'Проверьте, что допустимое изображение сохраняется целиком.'
+            )
@@ -0,0 +1,141 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+
+from posts import importer
+from posts.models import Comment, Follow, Group, Post, UserStats
+
+
+def write_jsonl(path, records):
+    path.write_text(
+        '\n'.join(json.dumps(record, ensure_ascii=False)
+                  for record in records),
+        encoding='utf-8'
+    )
+    return str(path)
+
+
+def run_import(*args, **options):
+    stderr = io.StringIO()
+    call_command('import_data', *args, stdout=io.StringIO(), stderr=stderr,
+                 **options)
+    return stderr.getvalue()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestImportData:
+
+    def test_import_groups_and_posts(self, tmp_path, user, another_user):
+        groups = write_jsonl(tmp_path / 'groups.jsonl', [
+            {'title': 'Кошки', 'slug': 'cats', 'description': 'Про кошек'},
+            {'title': 'Собаки', 'slug': 'dogs'},
+        ])
+        run_import('groups', groups)
+        assert set(Group.objects.values_list('slug', flat=True)) == {
+            'cats', 'dogs'
+        }
+
+        posts = write_jsonl(tmp_path / 'posts.jsonl', [
+            {'id': 100, 'text': 'Старый пост', 'author': user.username,
+             'group': 'cats', 'pub_date': '2015-03-01T10:00:00'},
+            {'text': 'Пост без группы', 'author': another_user.username},
+            {'text': 'Неизвестный автор', 'author': 'nobody'},
+            {'text': 'Неизвестная группа', 'author': user.username,
+             'group': 'birds'},
+            {'author': user.username},
+            {'text': 'Дата числом', 'author': user.username, 'pub_date': 5},
+        ])
+        errors = run_import('posts', posts, batch_size=2)
+
+        assert Post.objects.count() == 2, (
+            'Проверьте, что `import_data` импортирует корректные посты и '
+            'пропускает некорректные.'
+        )
+        assert len(errors.splitlines()) == 4, (
+            'Проверьте, что `import_data` сообщает о пропущенных записях.'
+        )
+        assert 'invalid date 5' in errors, (
+            'Проверьте, что дата не строкой пропускается как некорректная.'
+        )
+        old = Post.objects.get(pk=100)
+        assert old.group.slug == 'cats' and old.pub_date.year == 2015, (
+            'Проверьте, что `import_data` сохраняет id, группу и дату '
+            'публикации из файла.'
+        )
+        assert UserStats.objects.get(user=user).posts_count == 1, (
+            'Проверьте, что после импорта пересчитываются счётчики.'
+        )
+
+    def test_import_comments_csv(self, tmp_path, user, post):
+        path = tmp_path / 'comments.csv'
+        path.write_text(
+            'post,author,text,created\n'
+            f'{post.id},{user.username},Первый,2020-01-01T00:00:00Z\n'
+            f'{post.id},{user.username},Второй,\n'
+            f'9999,{user.username},К несуществующему посту,\n',
+            encoding='utf-8'
+        )
+        run_import('comments', str(path))
+        assert list(
+            Comment.objects.order_by('created').values_list('text', flat=True)
+        ) == ['Первый', 'Второй']
+        post.refresh_from_db()
+        assert post.comments_count == 2
+
+    def test_import_follows_skips_duplicates(self, tmp_path, user, user_2,
+                                             another_user):
+        Follow.objects.create(user=user, following=user_2)
+        path = write_jsonl(tmp_path / 'follows.jsonl', [
+            {'user': user.username, 'following': user_2.username},
+            {'user': user.username, 'following': another_user.username},
+            {'user': user.username, 'following': another_user.username},
+            {'user': user.username, 'following': user.username},
+        ])
+        run_import('follows', path)
+        assert Follow.objects.filter(user=user).count() == 2, (
+            'Проверьте, что `import_data` пропускает повторные подписки и '
+            'подписки на себя.'
+        )
+        imported = Follow.objects.get(user=user, following=another_user)
+        assert imported.following_name == 'testuseranother', (
+            'Проверьте, что `import_data` заполняет `following_name` '
+            'подписок.'
+        )
+
+    def test_resume_after_crash(self, tmp_path, user, monkeypatch):
+        path = write_jsonl(tmp_path / 'posts.jsonl', [
+            {'text': f'Пост {i}', 'author': user.username} for i in range(5)
+        ])
+        insert = importer.PostImporter.insert
+        calls = []
+
+        def crash_on_second_batch(self, rows):
+            calls.append(len(rows))
+            if len(calls) == 2:
+                raise RuntimeError('crash')
+            insert(self, rows)
+
+        monkeypatch.setattr(
+            importer.PostImporter, 'insert', crash_on_second_batch
+        )
+        with pytest.raises(RuntimeError):
+            run_import('posts', path, batch_size=2, no_rebuild=True)
+        assert Post.objects.count() == 2
+        monkeypatch.setattr(importer.PostImporter, 'insert', insert)
+
+        run_import('posts', path, batch_size=2, no_rebuild=True)
+        assert sorted(Post.objects.values_list('text', flat=True)) == [
+            f'Пост {i}' for i in range(5)
+        ], (
+            'Проверьте, что прерванный импорт продолжается с последней '
+            'сохранённой пачки без повторов.'
+        )
+        run_import('posts', path, no_rebuild=True)
+        assert Post.objects.count() == 5
+
+        run_import('posts', path, no_rebuild=True, restart=True)
+        assert Post.objects.count() == 10, (
+            'Проверьте, что `--restart` импортирует файл заново.'
+        )
@@ -0,0 +1,123 @@
+import json
+import re
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+
+from api.metrics import Registry, registry
+
+
+def sample(text, name, **labels):
+    """Return the value of one sample in Prometheus text, or ``None``."""
+    for line in text.splitlines():
+        match = re.fullmatch(r'(\w+)(?:\{(.*)\})? (\S+)', line)
+        if not match or match.group(1) != name:
+            continue
+        found = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"',
+                                match.group(2) or ''))
+        if found == labels:
+            return float(match.group(3))
+    return None
+
+
+@pytest.fixture(autouse=True)
+def clean_registry(monkeypatch):
+    monkeypatch.setattr(registry, 'directory', None)
+    registry.reset()
+    yield
+    registry.reset()
+
+
+@pytest.fixture
+def admin_client(admin_user):
+    client = APIClient()
+    client.force_authenticate(admin_user)
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class TestMetricsEndpoint:
+
+    url = '/api/v1/metrics/'
+
+    def test_admin_only(self, client, user_client, admin_client):
+        assert client.get(self.url).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(self.url).status_code == HTTPStatus.FORBIDDEN
+        response = admin_client.get(self.url)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что метрики доступны администратору.'
+        )
+        assert response['Content-Type'].startswith('text/plain'), (
+            'Проверьте, что метрики отдаются в текстовом формате Prometheus.'
+        )
+
+    def test_request_metrics(self, client, admin_client, post):
+        for _ in range(2):
+            assert client.get('/api/v1/posts/').status_code == HTTPStatus.OK
+        client.get('/api/v1/posts/0/')
+        text = admin_client.get(self.url).content.decode()
+        labels = {'view': 'PostViewSet', 'action': 'list', 'status': '200'}
+        assert sample(text, 'api_requests_total', **labels) == 2, (
+            'Проверьте, что запросы считаются по представлению, действию '
+            'и статусу.'
+        )
+        assert sample(text, 'api_requests_total', view='PostViewSet',
+                      action='retrieve', status='404') == 1
+        assert sample(
+            text, 'api_request_duration_seconds_count', **labels
+        ) == 2
+        assert sample(
+            text, 'api_request_duration_seconds_bucket', le='+Inf', **labels
+        ) == 2
+        assert sample(text, 'api_request_queries_sum', **labels) >= 1, (
+            'Проверьте, что считается число SQL-запросов.'
+        )
+        assert sample(text, 'api_response_size_bytes_sum', **labels) > 0
+        for result in ('hit', 'miss'):
+            assert sample(
+                text, 'api_response_cache_total', view='PostViewSet',
+                action='list', result=result
+            ) == 1, 'Проверьте, что считаются попадания в кэш ответов.'
+
+    def test_processes_are_summed(self, tmp_path, monkeypatch, client,
+                                  admin_client, post):
+        monkeypatch.setattr(registry, 'directory', str(tmp_path))
+        labels = ['PostViewSet', 'list', '200']
+        (tmp_path / 'other.json').write_text(json.dumps({
+            'api_requests_total': [[labels, 5]],
+            'api_request_queries': [[labels, [0, 0, 3] + [0] * 7 + [6, 3]]],
+        }))
+        client.get('/api/v1/posts/')
+        text = admin_client.get(self.url).content.decode()
+        labels = dict(zip(('view', 'action', 'status'), labels))
+        assert sample(text, 'api_requests_total', **labels) == 6, (
+            'Проверьте, что метрики всех процессов суммируются.'
+        )
+        assert sample(text, 'api_request_queries_count', **labels) == 4
+        assert len(list(tmp_path.glob('*.json'))) == 2, (
+            'Проверьте, что процесс сохраняет снимок своих метрик.'
+        )
+
+
+class TestRegistry:
+
+    def test_histogram_format(self):
+        metrics = Registry()
+        metrics.histogram('latency', 'Latency.', (0.1, 1), ('view',))
+        metrics.counter('hits', 'Hits.', ('view',))
+        for value in (0.05, 0.5, 0.7, 5):
+            metrics.record('latency', ('a"b',), value)
+        metrics.record('hits', ('x',), 3)
+        assert metrics.render().splitlines() == [
+            '# HELP latency Latency.',
+            '# TYPE latency histogram',
+            'latency_bucket{view="a\\"b",le="0.1"} 1',
+            'latency_bucket{view="a\\"b",le="1"} 3',
+            'latency_bucket{view="a\\"b",le="+Inf"} 4',
+            'latency_sum{view="a\\"b"} 6.25',
+            'latency_count{view="a\\"b"} 4',
+            '# HELP hits Hits.',
+            '# TYPE hits counter',
+            'hits{view="x"} 3',
+        ], 'Проверьте формат гистограмм и счётчиков Prometheus.'
@@ -0,0 +1,149 @@
+import json
+from base64 import urlsafe_b64encode
+from http import HTTPStatus
+
+import pytest
+
+from posts.models import Comment, Post
+
+
+def make_cursor(position):
+    return urlsafe_b64encode(json.dumps({'p': position}).encode()).decode()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPostCursorPagination:
+
+    post_list_url = '/api/v1/posts/'
+
+    @pytest.fixture
+    def many_posts(self, user, group_1):
+        return [
+            Post.objects.create(text=f'Пост {i}', author=user, group=group_1)
+            for i in range(7)
+        ]
+
+    def collect_pages(self, client, url):
+        ids = []
+        pages = 0
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что GET-запрос к `{url}` с курсором '
+                'возвращает ответ со статусом 200.'
+            )
+            data = response.json()
+            ids.extend(item['id'] for item in data['results'])
+            url = data['next']
+            pages += 1
+        return ids, pages
+
+    def test_cursor_walks_all_posts_in_order(self, client, many_posts):
+        ids, pages = self.collect_pages(
+            client, f'{self.post_list_url}?page_size=3'
+        )
+        assert ids == [post.id for post in many_posts], (
+            'Проверьте, что курсорная пагинация отдаёт все посты ровно один '
+            'раз в порядке `(pub_date, id)`.'
+        )
+        assert pages == 3, (
+            'Проверьте, что при `page_size=3` семь постов разбиваются на три '
+            'страницы.'
+        )
+
+    def test_cursor_previous_link(self, client, many_posts):
+        first = client.get(f'{self.post_list_url}?page_size=3').json()
+        assert first['previous'] is None, (
+            'Проверьте, что у первой страницы нет ссылки `previous`.'
+        )
+        second = client.get(first['next']).json()
+        back = client.get(second['previous']).json()
+        assert back['results'] == first['results'], (
+            'Проверьте, что ссылка `previous` возвращает предыдущую '
+            'страницу.'
+        )
+
+    def test_cursor_stable_when_posts_added(self, client, user, many_posts):
+        first = client.get(f'{self.post_list_url}?page_size=3').json()
+        Post.objects.create(text='Новый пост', author=user)
+        second = client.get(first['next']).json()
+        assert second['results'][0]['id'] == many_posts[3].id, (
+            'Проверьте, что новые посты не сдвигают уже выданные страницы.'
+        )
+
+    def test_invalid_cursor(self, client, many_posts):
+        response = client.get(f'{self.post_list_url}?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что некорректный курсор возвращает ответ со '
+            'статусом 404.'
+        )
+
+    @pytest.mark.parametrize('url, position', [
+        ('/api/v1/posts/', ['notadate', 1]),
+        ('/api/v1/posts/', ['2020-01-01T00:00:00', 10 ** 30]),
+        ('/api/v1/posts/', ['2020-01-01T00:00:00', 'zz']),
+        ('/api/v1/posts/?search=пост', ['inf', 'zz']),
+        ('/api/v1/posts/?search=пост', ['inf', 1]),
+        ('/api/v1/posts/?search=пост', [1.5, 10 ** 30]),
+        ('/api/v1/feed/', ['notadate', 1]),
+        ('/api/v1/feed/', ['2020-01-01T00:00:00', -10 ** 30]),
+        ('/api/v1/posts/{post_id}/comments/', ['notadate', 1]),
+        ('/api/v1/posts/{post_id}/comments/', ['2020-01-01', 10 ** 30]),
+    ])
+    def test_tampered_cursor(self, user_client, many_posts, url, position):
+        url = url.format(post_id=many_posts[0].id)
+        separator = '&' if '?' in url else '?'
+        response = user_client.get(
+            f'{url}{separator}cursor={make_cursor(position)}'
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что курсор с некорректными значениями возвращает '
+            f'ответ со статусом 404: `{url}`, {position}.'
+        )
+
+    def test_limit_offset_still_supported(self, client, many_posts):
+        response = client.get(f'{self.post_list_url}?limit=2&offset=4')
+        data = response.json()
+        assert data['count'] == len(many_posts), (
+            'Проверьте, что пагинация `limit`/`offset` по-прежнему '
+            'возвращает поле `count`.'
+        )
+        assert [item['id'] for item in data['results']] == [
+            post.id for post in many_posts[4:6]
+        ], (
+            'Проверьте, что пагинация `limit`/`offset` использует тот же '
+            'порядок `(pub_date, id)`.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCommentCursorPagination:
+
+    comments_url = '/api/v1/posts/{post_id}/comments/'
+
+    def test_cursor_walks_comments_of_post(self, client, user, post,
+                                           another_post):
+        comments = [
+            Comment.objects.create(author=user, post=post, text=f'{i}')
+            for i in range(5)
+        ]
+        Comment.objects.create(author=user, post=another_post, text='Чужой')
+        url = f'{self.comments_url.format(post_id=post.id)}?page_size=2'
+        ids = []
+        while url:
+            data = client.get(url).json()
+            ids.extend(item['id'] for item in data['results'])
+            url = data['next']
+        assert ids == [comment.id for comment in comments], (
+            'Проверьте, что курсорная пагинация комментариев отдаёт все '
+            'комментарии поста в порядке `(created, id)`.'
+        )
+
+    def test_missing_post(self, client):
+        response = client.get(
+            f'{self.comments_url.format(post_id=12345)}?page_size=2'
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что запрос комментариев несуществующего поста '
+            'возвращает ответ со статусом 404.'
+        )
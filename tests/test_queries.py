@@ -0,0 +1,111 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from posts.models import Comment, Follow, Group, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestQueryBudget:
+    """The number of queries must not grow with the number of rows."""
+
+    def make_authors(self, django_user_model, count, prefix):
+        return [
+            django_user_model.objects.create_user(
+                username=f'{prefix}{i}', password='1234567'
+            )
+            for i in range(count)
+        ]
+
+    def add_posts(self, authors, group):
+        return [
+            Post.objects.create(text='Пост', author=author, group=group)
+            for author in authors
+        ]
+
+    def add_comments(self, authors, post):
+        return [
+            Comment.objects.create(text='Коммент', author=author, post=post)
+            for author in authors
+        ]
+
+    def assert_budget(self, small, large, url):
+        assert small == large, (
+            f'Проверьте, что число SQL-запросов GET-запроса к `{url}` не '
+            f'зависит от размера выдачи: {small} запросов на малой выборке '
+            f'и {large} на большой.'
+        )
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/posts/',
+        '/api/v1/posts/?limit=100',
+        '/api/v1/posts/?page_size=100',
+    ])
+    def test_post_list(self, user_client, django_user_model, group_1,
+                       count_queries, url):
+        self.add_posts(self.make_authors(django_user_model, 2, 'a'), group_1)
+        small = count_queries(user_client, url)
+        self.add_posts(self.make_authors(django_user_model, 20, 'b'), group_1)
+        self.assert_budget(small, count_queries(user_client, url), url)
+
+    def test_comment_list(self, user_client, django_user_model, post,
+                          count_queries):
+        url = f'/api/v1/posts/{post.id}/comments/'
+        self.add_comments(self.make_authors(django_user_model, 2, 'a'), post)
+        small = count_queries(user_client, url)
+        self.add_comments(self.make_authors(django_user_model, 20, 'b'), post)
+        self.assert_budget(small, count_queries(user_client, url), url)
+
+    def test_group_list(self, user_client, count_queries):
+        url = '/api/v1/groups/'
+        Group.objects.create(title='Группа', slug='g')
+        small = count_queries(user_client, url)
+        for i in range(20):
+            Group.objects.create(title='Группа', slug=f'g{i}')
+        self.assert_budget(small, count_queries(user_client, url), url)
+
+    def test_follow_list(self, user_client, user, django_user_model,
+                         count_queries):
+        url = '/api/v1/follow/'
+        for author in self.make_authors(django_user_model, 2, 'a'):
+            Follow.objects.create(user=user, following=author)
+        small = count_queries(user_client, url)
+        for author in self.make_authors(django_user_model, 20, 'b'):
+            Follow.objects.create(user=user, following=author)
+        self.assert_budget(small, count_queries(user_client, url), url)
+
+    def test_detail_endpoints(self, user_client, post, comment_1_post,
+                              count_queries):
+        post_url = f'/api/v1/posts/{post.id}/'
+        comment_url = (
+            f'/api/v1/posts/{post.id}/comments/{comment_1_post.id}/'
+        )
+        assert count_queries(user_client, post_url) <= 2, (
+            f'Проверьте, что GET-запрос к `{post_url}` получает пост и '
+            'автора одним запросом.'
+        )
+        assert count_queries(user_client, comment_url) <= 3, (
+            f'Проверьте, что GET-запрос к `{comment_url}` получает '
+            'комментарий и автора одним запросом.'
+        )
+
+    def post_lookups(self, context):
+        return sum(
+            'FROM "posts_post"' in query['sql']
+            for query in context.captured_queries
+        )
+
+    def test_comments_touch_post_once(self, user_client, post,
+                                      comment_1_post):
+        url = f'/api/v1/posts/{post.id}/comments/'
+        for request in (
+            lambda: user_client.get(url),
+            lambda: user_client.get(f'{url}?page_size=10'),
+            lambda: user_client.post(url, data={'text': 'Коммент'}),
+        ):
+            with CaptureQueriesContext(connection) as context:
+                request()
+            assert self.post_lookups(context) <= 1, (
+                f'Проверьте, что запросы к `{url}` читают пост из базы не '
+                'больше одного раза.'
+            )
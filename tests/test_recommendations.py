@@ -0,0 +1,128 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from posts.models import Follow, Recommendation
+from posts.recommendations import refresh_recommendations
+
+
+def rebuild(*args):
+    out = StringIO()
+    call_command('rebuild_recommendations', *args, stdout=out)
+    return out.getvalue()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestRecommendations:
+
+    url = '/api/v1/recommendations/'
+
+    @pytest.fixture
+    def graph(self, user, django_user_model):
+        """``user`` follows a and b, both follow c; f follows ``user``."""
+        users = {
+            name: django_user_model.objects.create_user(username=name)
+            for name in 'abcdef'
+        }
+        users['me'] = user
+        edges = 'me a, me b, a c, b c, a d, a b, f me, f e'
+        for source, target in map(str.split, edges.split(', ')):
+            Follow.objects.create(
+                user=users[source], following=users[target]
+            )
+        return users
+
+    def recommended(self, client):
+        response = client.get(self.url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос авторизованного пользователя к '
+            f'`{self.url}` возвращает ответ со статусом 200.'
+        )
+        return [
+            (item['candidate'], item['score'], item['mutual'],
+             item['co_followers'])
+            for item in response.json()
+        ]
+
+    def test_scores_and_order(self, user_client, graph):
+        assert 'for 7 users' in rebuild()
+        assert self.recommended(user_client) == [
+            ('c', 4, 2, 0), ('d', 2, 1, 0), ('e', 1, 0, 1)
+        ], (
+            'Проверьте, что рекомендации учитывают общих подписчиков и '
+            'подписки подписчиков, не содержат уже отслеживаемых авторов '
+            'и отсортированы по убыванию оценки.'
+        )
+
+    def test_neighbours_capped(self, user_client, graph, settings):
+        settings.RECOMMENDATIONS_NEIGHBOURS = 1
+        rebuild()
+        # Only the latest follow of each account is walked: me -> b -> c
+        # and f -> e; a stays excluded although it is not among them.
+        assert self.recommended(user_client) == [
+            ('c', 2, 1, 0), ('e', 1, 0, 1)
+        ], (
+            'Проверьте, что для каждого соседа учитываются только его '
+            '`RECOMMENDATIONS_NEIGHBOURS` последних подписок.'
+        )
+
+    def test_anonymous(self, client):
+        response = client.get(self.url)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            f'Проверьте, что GET-запрос анонимного пользователя к '
+            f'`{self.url}` возвращает ответ со статусом 401.'
+        )
+
+    def test_limit(self, user_client, graph, settings):
+        settings.RECOMMENDATIONS_LIMIT = 1
+        rebuild()
+        assert self.recommended(user_client) == [('c', 4, 2, 0)], (
+            'Проверьте, что для пользователя хранится не больше '
+            '`RECOMMENDATIONS_LIMIT` рекомендаций.'
+        )
+
+    def test_follow_drops_recommendation(self, user_client, graph):
+        rebuild()
+        response = user_client.post('/api/v1/follow/', {'following': 'c'})
+        assert response.status_code == HTTPStatus.CREATED
+        assert [
+            item[0] for item in self.recommended(user_client)
+        ] == ['d', 'e'], (
+            'Проверьте, что после подписки автор пропадает из рекомендаций.'
+        )
+
+    def test_incremental(self, user_client, graph, django_user_model):
+        rebuild()
+        x = django_user_model.objects.create_user(username='x')
+        Follow.objects.create(user=graph['a'], following=x)
+        # a, x, the follower of a (user) and the accounts a follows (b, c,
+        # d, x); e and f are not recomputed.
+        assert refresh_recommendations() == 6, (
+            'Проверьте, что `rebuild_recommendations` пересчитывает только '
+            'пользователей, которых касаются новые подписки.'
+        )
+        assert ('x', 2, 1, 0) in self.recommended(user_client)
+        assert refresh_recommendations() == 0
+        assert 'for 8 users' in rebuild('--full')
+
+    def test_read_is_one_query(self, user_client, graph, count_queries):
+        rebuild()
+        assert count_queries(user_client, self.url) == 2, (
+            'Проверьте, что рекомендации читаются одним запросом, не '
+            'считая проверки токена.'
+        )
+
+    def test_read_uses_index(self, user, graph):
+        rebuild()
+        queryset = Recommendation.objects.filter(user=user)
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        assert 'recommendation_user_score_idx' in plan, plan
+        assert 'TEMP B-TREE' not in plan, (
+            f'Проверьте, что рекомендации не сортируются при чтении: {plan}'
+        )
@@ -0,0 +1,105 @@
+import datetime
+import decimal
+from collections import OrderedDict
+from http import HTTPStatus
+
+import msgpack
+import pytest
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import MessagePackRenderer, ORJSONRenderer
+from posts.models import Post
+
+
+class TestORJSONRenderer:
+
+    data = OrderedDict([
+        ('id', 1),
+        ('text', 'Текст\u2028с разделителем строк и — тире'),
+        ('pub_date', datetime.datetime(
+            2026, 10, 18, 12, 30, 5, 123456, tzinfo=datetime.timezone.utc
+        )),
+        ('created', datetime.datetime(
+            2026, 10, 18, 12, 30, tzinfo=datetime.timezone.utc
+        )),
+        ('errors', [ErrorDetail('Обязательное поле.', code='required')]),
+        ('lazy', gettext_lazy('Ошибка')),
+        ('decimal', decimal.Decimal('1.5')),
+        ('nested', {'none': None, 'flag': True, 'list': [1, 2.5]}),
+    ])
+
+    def test_same_output_as_json_renderer(self):
+        assert ORJSONRenderer().render(self.data) == (
+            JSONRenderer().render(self.data)
+        ), (
+            'Проверьте, что ORJSONRenderer отдаёт тот же JSON, что и '
+            'стандартный JSONRenderer.'
+        )
+
+    def test_indent_falls_back(self):
+        media_type = 'application/json; indent=4'
+        assert ORJSONRenderer().render(self.data, media_type) == (
+            JSONRenderer().render(self.data, media_type)
+        )
+
+    def test_none(self):
+        assert ORJSONRenderer().render(None) == b''
+        assert MessagePackRenderer().render(None) == b''
+
+
+@pytest.mark.django_db(transaction=True)
+class TestContentNegotiation:
+
+    post_list_url = '/api/v1/posts/'
+
+    def test_json_datetime(self, client, post):
+        response = client.get(f'{self.post_list_url}{post.id}/')
+        pub_date = timezone.localtime(post.pub_date, timezone.utc)
+        assert response.json()['pub_date'] == (
+            pub_date.isoformat().replace('+00:00', 'Z')
+        ), (
+            'Проверьте, что дата публикации отдаётся в формате ISO 8601.'
+        )
+
+    def test_msgpack_response(self, client, post):
+        response = client.get(
+            self.post_list_url, HTTP_ACCEPT='application/msgpack'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'] == 'application/msgpack', (
+            'Проверьте, что по заголовку `Accept: application/msgpack` '
+            'ответ отдаётся в MessagePack.'
+        )
+        data = msgpack.unpackb(response.content, timestamp=3)
+        assert data[0]['text'] == post.text
+        assert data[0]['pub_date'] == post.pub_date, (
+            'Проверьте, что даты передаются в MessagePack как timestamp.'
+        )
+
+    def test_msgpack_request(self, user_client, user):
+        response = user_client.post(
+            self.post_list_url,
+            msgpack.packb({'text': 'Пост в MessagePack'}),
+            content_type='application/msgpack'
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что POST-запрос с телом в MessagePack создаёт пост.'
+        )
+        assert Post.objects.get().text == 'Пост в MessagePack'
+
+    @pytest.mark.parametrize('content_type,body', [
+        ('application/json', b'{"text": '),
+        ('application/msgpack', b'\x81\xa4text'),
+    ])
+    def test_malformed_body(self, user_client, content_type, body):
+        response = user_client.post(
+            self.post_list_url, body, content_type=content_type
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что некорректное тело запроса возвращает ответ со '
+            'статусом 400.'
+        )
+        assert not Post.objects.exists()
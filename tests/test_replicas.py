@@ -0,0 +1,157 @@
+import io
+import sqlite3
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.replicas import ReplicaRouter, refresh_replica
+from posts.models import Post
+
+
+def add_database(alias, path):
+    connections.databases[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(path),
+    }
+
+
+def remove_database(alias):
+    connections[alias].close()
+    del connections[alias]
+    del connections.databases[alias]
+
+
+@pytest.fixture
+def replica(tmp_path, settings):
+    add_database('replica', tmp_path / 'replica.sqlite3')
+    settings.DATABASE_REPLICAS = ['replica']
+    settings.RESPONSE_CACHE_TIMEOUT = 0
+    yield 'replica'
+    remove_database('replica')
+
+
+def texts(client):
+    response = client.get('/api/v1/posts/')
+    assert response.status_code == HTTPStatus.OK
+    return {post['text'] for post in response.json()}
+
+
+@pytest.mark.django_db
+def test_refresh_copies_primary_file(tmp_path):
+    add_database('file_primary', tmp_path / 'primary.sqlite3')
+    add_database('file_replica', tmp_path / 'replica.sqlite3')
+    try:
+        with connections['file_primary'].cursor() as cursor:
+            cursor.execute('CREATE TABLE item (name TEXT)')
+            cursor.execute("INSERT INTO item VALUES ('первый')")
+        refresh_replica('file_replica', source_alias='file_primary')
+        with connections['file_replica'].cursor() as cursor:
+            cursor.execute('SELECT name FROM item')
+            assert cursor.fetchall() == [('первый',)]
+
+        with connections['file_primary'].cursor() as cursor:
+            cursor.execute("INSERT INTO item VALUES ('второй')")
+        refresh_replica('file_replica', source_alias='file_primary')
+        with connections['file_replica'].cursor() as cursor:
+            cursor.execute('SELECT count(*) FROM item')
+            assert cursor.fetchone() == (2,), (
+                'Проверьте, что открытое соединение с репликой видит '
+                'данные после обновления.'
+            )
+    finally:
+        remove_database('file_primary')
+        remove_database('file_replica')
+    copy = sqlite3.connect(tmp_path / 'replica.sqlite3')
+    assert copy.execute('SELECT count(*) FROM item').fetchone() == (2,)
+    copy.close()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestReplicaRouting:
+
+    def test_anonymous_reads_from_replica(self, replica, client, user):
+        Post.objects.create(text='Старый пост', author=user)
+        call_command('refresh_replicas', stdout=io.StringIO())
+        # Written without signals: the replica is behind, but the cache
+        # namespace of posts does not know it.
+        Post.objects.bulk_create([Post(text='Новый пост', author=user)])
+        assert texts(client) == {'Старый пост'}, (
+            'Проверьте, что анонимные GET-запросы читают из реплики.'
+        )
+        refresh_replica(replica)
+        assert texts(client) == {'Старый пост', 'Новый пост'}, (
+            'Проверьте, что после обновления реплика видит новые данные.'
+        )
+
+    def test_lagging_replica_is_not_cached(self, replica, settings, client,
+                                           user):
+        settings.RESPONSE_CACHE_TIMEOUT = 60
+        Post.objects.create(text='Старый пост', author=user)
+        refresh_replica(replica)
+        Post.objects.create(text='Новый пост', author=user)
+        response = client.get('/api/v1/posts/')
+        etag = response['ETag']
+        assert {post['text'] for post in response.json()} == {
+            'Старый пост', 'Новый пост'
+        }, (
+            'Проверьте, что после записи, которой ещё нет в реплике, '
+            'чтения идут в основную базу и не попадают в кэш устаревшими.'
+        )
+        refresh_replica(replica)
+        response = client.get('/api/v1/posts/')
+        assert response['X-Cache'] == 'HIT'
+        assert response['ETag'] == etag
+        assert len(response.json()) == 2
+
+    def test_writer_sticks_to_primary(self, replica, settings, client,
+                                      user_client, user, user_2,
+                                      another_user):
+        Post.objects.create(text='Старый пост', author=user)
+        refresh_replica(replica)
+        response = user_client.post(
+            '/api/v1/follow/', {'following': user_2.username}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        Post.objects.bulk_create([Post(text='Мой пост', author=user)])
+        assert texts(user_client) == {'Старый пост', 'Мой пост'}, (
+            'Проверьте, что после записи клиент читает с основной базы.'
+        )
+        assert texts(client) == {'Старый пост'}, (
+            'Проверьте, что другие клиенты читают из реплики.'
+        )
+        settings.DATABASE_STICKY_SECONDS = 0
+        user_client.post(
+            '/api/v1/follow/', {'following': another_user.username}
+        )
+        assert texts(user_client) == {'Старый пост'}, (
+            'Проверьте, что привязка к основной базе истекает через '
+            '`DATABASE_STICKY_SECONDS`.'
+        )
+
+    def test_new_user_authenticates_on_primary(self, replica,
+                                               django_user_model):
+        refresh_replica(replica)
+        user = django_user_model.objects.create_user(
+            username='NewUser', password='1234567'
+        )
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        )
+        assert client.get('/api/v1/follow/').status_code == HTTPStatus.OK, (
+            'Проверьте, что пользователи читаются с основной базы.'
+        )
+
+    def test_writes_go_to_primary(self, replica, user):
+        post = Post.objects.create(text='Пост', author=user)
+        refresh_replica(replica)
+        copy = Post.objects.using(replica).get(pk=post.pk)
+        copy.text = 'Изменённый пост'
+        copy.save()
+        assert Post.objects.using('default').get(pk=post.pk).text == (
+            'Изменённый пост'
+        ), 'Проверьте, что запись всегда идёт в основную базу.'
+        assert ReplicaRouter().db_for_write(Post) == 'default'
@@ -0,0 +1,142 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from posts import search
+from posts.models import Post
+from posts.search import FTS_TABLE
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPostSearch:
+
+    post_list_url = '/api/v1/posts/'
+
+    def clear_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+
+    @pytest.fixture(autouse=True)
+    def empty_index(self):
+        """The FTS table is not a model, so test flushes leave rows in it."""
+        self.clear_index()
+
+    @pytest.fixture
+    def posts(self, user):
+        texts = [
+            'Котики и собаки',
+            'Про котиков: котики, котики, котики',
+            'Рецепт борща',
+            'Котики в космосе',
+        ]
+        return [Post.objects.create(text=text, author=user) for text in texts]
+
+    def search_ids(self, client, url, **params):
+        response = client.get(url, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        data = response.json()
+        return [item['id'] for item in data['results']], data
+
+    def test_search_ranked(self, client, posts):
+        ids, _ = self.search_ids(client, self.post_list_url, search='котики')
+        assert set(ids) == {posts[0].id, posts[1].id, posts[3].id}, (
+            'Проверьте, что параметр `search` возвращает только посты, '
+            'содержащие слово.'
+        )
+        assert ids[0] == posts[1].id, (
+            'Проверьте, что результаты поиска отсортированы по '
+            'релевантности.'
+        )
+
+    def test_search_cursor_pages(self, client, posts):
+        first, data = self.search_ids(
+            client, self.post_list_url, search='котики', page_size=2
+        )
+        second, data = self.search_ids(client, data['next'])
+        assert len(first) == 2 and len(second) == 1, (
+            'Проверьте, что результаты поиска листаются курсором.'
+        )
+        assert data['next'] is None
+        assert not set(first) & set(second)
+
+    def test_index_follows_writes(self, user_client, client, post):
+        url = f'/api/v1/posts/{post.id}/'
+        user_client.patch(url, data={'text': 'Жирафы'})
+        ids, _ = self.search_ids(client, self.post_list_url, search='жирафы')
+        assert ids == [post.id], (
+            'Проверьте, что изменение поста обновляет поисковый индекс.'
+        )
+        user_client.delete(url)
+        ids, _ = self.search_ids(client, self.post_list_url, search='жирафы')
+        assert ids == [], (
+            'Проверьте, что удаление поста удаляет его из поискового индекса.'
+        )
+
+    def test_bulk_created_posts_indexed(self, user_client, client):
+        user_client.post(
+            f'{self.post_list_url}bulk/',
+            [{'text': 'Слоны'}, {'text': 'Ещё слоны'}], format='json'
+        )
+        ids, _ = self.search_ids(client, self.post_list_url, search='слоны')
+        assert len(ids) == 2, (
+            'Проверьте, что посты, созданные пачкой, попадают в индекс.'
+        )
+
+    def test_search_syntax_is_escaped(self, client, posts):
+        ids, _ = self.search_ids(
+            client, self.post_list_url, search='"котики (*'
+        )
+        assert len(ids) == 3
+
+    def test_rebuild_search_index(self, client, posts):
+        self.clear_index()
+        call_command('rebuild_search_index', batch_size=2, stdout=None)
+        ids, _ = self.search_ids(client, self.post_list_url, search='борща')
+        assert ids == [posts[2].id], (
+            'Проверьте, что команда `rebuild_search_index` заново строит '
+            'индекс.'
+        )
+
+    def test_rebuild_keeps_index_live(self, client, posts, user,
+                                      monkeypatch):
+        copy_batch = search.copy_batch
+        calls = []
+        deleted = posts[1].id
+
+        def copy_and_write(cursor, table, rows):
+            copy_batch(cursor, table, rows)
+            calls.append(table)
+            if len(calls) == 1:
+                ids, _ = self.search_ids(
+                    client, self.post_list_url, search='котики'
+                )
+                assert len(ids) == 3, (
+                    'Проверьте, что во время перестроения поиск работает '
+                    'по прежнему индексу.'
+                )
+                posts[0].text = 'Теперь про жирафов'
+                posts[0].save()
+                posts[1].delete()
+                Post.objects.create(text='Жирафы и котики', author=user)
+
+        monkeypatch.setattr(search, 'copy_batch', copy_and_write)
+        assert search.rebuild_index(batch_size=1) == 4
+        assert calls and set(calls) == {search.SHADOW_TABLE}
+        ids, _ = self.search_ids(
+            client, self.post_list_url, search='жирафов'
+        )
+        assert ids == [posts[0].id], (
+            'Проверьте, что изменения постов во время перестроения '
+            'попадают в новый индекс.'
+        )
+        ids, _ = self.search_ids(client, self.post_list_url, search='котики')
+        new = Post.objects.get(text='Жирафы и котики')
+        assert set(ids) == {posts[3].id, new.id} and deleted not in ids, (
+            'Проверьте, что удалённые и новые посты во время перестроения '
+            'учитываются в новом индексе.'
+        )
@@ -0,0 +1,120 @@
+import io
+import statistics
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Count, F
+
+from posts.models import Comment, Follow, Group, Post, UserStats
+
+User = get_user_model()
+
+
+def snapshot():
+    return (
+        list(User.objects.order_by('pk').values_list('username')),
+        list(Group.objects.order_by('pk').values_list(
+            'slug', 'description'
+        )),
+        list(Post.objects.order_by('pk').values_list(
+            'text', 'pub_date', 'author__username', 'group__slug'
+        )),
+        list(Comment.objects.order_by('pk').values_list(
+            'text', 'created', 'post__pub_date', 'author__username'
+        )),
+        list(Follow.objects.order_by('pk').values_list(
+            'user__username', 'following__username'
+        )),
+    )
+
+
+def clear():
+    Group.objects.all().delete()
+    User.objects.all().delete()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSeedData:
+
+    def test_counts_and_shape(self, synthetic_data):
+        counts = synthetic_data()
+        assert counts == {
+            'users': 50, 'groups': 5, 'posts': 500, 'comments': 2000,
+            'follows': 300,
+        }, 'Проверьте, что создаётся запрошенное число строк.'
+        assert User.objects.count() == 50
+        assert Post.objects.count() == 500
+        assert Comment.objects.count() == 2000
+        assert 270 <= Follow.objects.count() <= 300, (
+            'Проверьте, что повторные подписки отбрасываются, но их немного.'
+        )
+        assert not Follow.objects.filter(user=F('following')).exists(), (
+            'Проверьте, что пользователи не подписываются на себя.'
+        )
+        assert not Comment.objects.filter(
+            created__lt=F('post__pub_date')
+        ).exists(), 'Проверьте, что комментарии не старше постов.'
+
+        per_post = list(
+            Comment.objects.order_by().values('post').annotate(n=Count('id'))
+            .values_list('n', flat=True)
+        )
+        assert max(per_post) > 20 * statistics.median(per_post), (
+            'Проверьте, что комментарии распределены по постам неравномерно.'
+        )
+        followers = sorted(
+            Follow.objects.order_by().values('following')
+            .annotate(n=Count('id'))
+            .values_list('n', flat=True),
+            reverse=True
+        )
+        assert sum(followers[:5]) > 0.3 * sum(followers), (
+            'Проверьте, что у немногих пользователей большинство подписчиков.'
+        )
+
+    def test_deterministic_for_seed(self, synthetic_data):
+        synthetic_data(seed=7)
+        first = snapshot()
+        clear()
+        synthetic_data(seed=7)
+        assert snapshot() == first, (
+            'Проверьте, что один и тот же seed даёт одни и те же данные.'
+        )
+        clear()
+        synthetic_data(seed=8)
+        assert snapshot()[2] != first[2], (
+            'Проверьте, что другой seed даёт другие данные.'
+        )
+
+    def test_appends_to_existing_data(self, synthetic_data, user, post):
+        synthetic_data(users=10, posts=20, comments=30, follows=10)
+        assert Post.objects.count() == 21
+        assert Post.objects.get(pk=post.pk).text == post.text, (
+            'Проверьте, что существующие строки не перезаписываются.'
+        )
+
+    def test_same_seed_twice(self, synthetic_data):
+        synthetic_data(seed=3, users=10, groups=2, posts=20, comments=30,
+                       follows=10)
+        synthetic_data(seed=3, users=10, groups=2, posts=20, comments=30,
+                       follows=10)
+        assert User.objects.count() == 20 and Group.objects.count() == 4, (
+            'Проверьте, что повторный запуск `seed_data` с тем же seed '
+            'добавляет новые данные, а не падает на занятых именах.'
+        )
+
+    def test_command_rebuilds_counters(self):
+        output = io.StringIO()
+        call_command(
+            'seed_data', users=20, groups=2, posts=100, comments=200,
+            follows=50, stdout=output
+        )
+        assert 'Inserted 100 posts' in output.getvalue()
+        for stats in UserStats.objects.all():
+            assert stats.posts_count == Post.objects.filter(
+                author_id=stats.user_id
+            ).count(), 'Проверьте, что счётчики пересчитываются.'
+            assert stats.followers_count == Follow.objects.filter(
+                following_id=stats.user_id
+            ).count()
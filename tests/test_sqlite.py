@@ -0,0 +1,150 @@
+import sqlite3
+import threading
+
+import pytest
+from django.db import OperationalError, connections, transaction
+
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -2048,
+    'mmap_size': 1024 * 1024,
+}
+
+
+def add_database(alias, path, **options):
+    connections.databases[alias] = {
+        'ENGINE': 'api.backends.sqlite3', 'NAME': str(path),
+        'OPTIONS': options,
+    }
+
+
+def remove_database(alias):
+    connections[alias].close()
+    del connections[alias]
+    del connections.databases[alias]
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Return a function adding a file database alias with the backend."""
+    aliases = []
+
+    def add(**options):
+        alias = f'sqlite_{len(aliases)}'
+        add_database(alias, tmp_path / 'db.sqlite3', **options)
+        aliases.append(alias)
+        with connections[alias].cursor() as cursor:
+            cursor.execute(
+                'CREATE TABLE IF NOT EXISTS item '
+                '(id INTEGER PRIMARY KEY, number INTEGER)'
+            )
+        return alias
+
+    yield add
+    for alias in aliases:
+        remove_database(alias)
+
+
+@pytest.fixture
+def blocker(tmp_path):
+    """A plain connection that holds the write lock until released."""
+    connection = sqlite3.connect(
+        tmp_path / 'db.sqlite3', timeout=0, isolation_level=None,
+        check_same_thread=False
+    )
+    yield connection
+    if connection.in_transaction:
+        connection.execute('ROLLBACK')
+    connection.close()
+
+
+def pragma(alias, name):
+    with connections[alias].cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db
+class TestSQLiteBackend:
+
+    def test_connection_runs_pragmas(self, database):
+        alias = database(pragmas=PRAGMAS)
+        assert pragma(alias, 'journal_mode') == 'wal', (
+            'Проверьте, что новое соединение включает WAL.'
+        )
+        assert pragma(alias, 'synchronous') == 1
+        assert pragma(alias, 'cache_size') == -2048
+        assert pragma(alias, 'mmap_size') == 1024 * 1024
+
+    def test_transaction_takes_write_lock(self, database, blocker):
+        alias = database()
+        with transaction.atomic(using=alias):
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT count(*) FROM item')
+            with pytest.raises(sqlite3.OperationalError):
+                blocker.execute('BEGIN IMMEDIATE')
+        assert not blocker.in_transaction, (
+            'Проверьте, что транзакция начинается с BEGIN IMMEDIATE.'
+        )
+
+    def test_locked_write_is_retried(self, database, blocker):
+        alias = database(timeout=0.01, lock_retries=5, lock_backoff=0.05)
+        blocker.execute('BEGIN IMMEDIATE')
+        release = threading.Timer(0.15, blocker.execute, ['ROLLBACK'])
+        release.start()
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('INSERT INTO item (number) VALUES (1)')
+        finally:
+            release.join()
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT count(*) FROM item')
+            assert cursor.fetchone() == (1,), (
+                'Проверьте, что запись повторяется, пока база заблокирована.'
+            )
+
+    def test_retries_are_bounded(self, database, blocker):
+        alias = database(timeout=0.01, lock_retries=2, lock_backoff=0.01)
+        blocker.execute('BEGIN IMMEDIATE')
+        with pytest.raises(OperationalError, match='database is locked'):
+            with connections[alias].cursor() as cursor:
+                cursor.execute('INSERT INTO item (number) VALUES (1)')
+
+    def test_concurrent_writes_do_not_fail(self, database):
+        alias = database(pragmas=PRAGMAS, timeout=5)
+        threads, writes = 8, 50
+        errors = []
+
+        def write():
+            try:
+                for _ in range(writes):
+                    # Read, then write: fails at once with deferred
+                    # transactions when another thread wrote in between.
+                    with transaction.atomic(using=alias):
+                        with connections[alias].cursor() as cursor:
+                            cursor.execute('SELECT count(*) FROM item')
+                            count = cursor.fetchone()[0]
+                            cursor.execute(
+                                'INSERT INTO item (number) VALUES (%s)',
+                                [count]
+                            )
+            except OperationalError as error:
+                errors.append(error)
+            finally:
+                connections[alias].close()
+
+        workers = [threading.Thread(target=write) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert errors == [], (
+            'Проверьте, что одновременная запись из нескольких потоков не '
+            'падает с "database is locked".'
+        )
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT count(*), count(DISTINCT number) FROM item')
+            assert cursor.fetchone() == (threads * writes, threads * writes), (
+                'Проверьте, что транзакции записи выполняются по очереди.'
+            )
@@ -0,0 +1,91 @@
+import logging
+import re
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.authentication import token_user_cache
+
+METRIC = re.compile(r'(\w+);dur=([\d.]+)(?:;desc="(\d+) queries")?')
+
+
+def parse_header(value):
+    return {
+        name: (float(duration), queries and int(queries))
+        for name, duration, queries in METRIC.findall(value)
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class TestServerTiming:
+
+    @pytest.fixture(autouse=True)
+    def sample_all(self, settings):
+        settings.SERVER_TIMING_SAMPLE_RATE = 1.0
+
+    def test_header_has_phases_and_queries(self, user_client, post):
+        token_user_cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get('/api/v1/posts/?limit=5')
+        assert response.status_code == HTTPStatus.OK
+        assert 'Server-Timing' in response, (
+            'Проверьте, что ответ содержит заголовок `Server-Timing`.'
+        )
+        metrics = parse_header(response['Server-Timing'])
+        assert list(metrics) == [
+            'auth', 'serialize', 'render', 'db', 'total'
+        ], 'Проверьте набор и порядок метрик в `Server-Timing`.'
+        assert metrics['db'][1] == len(context.captured_queries), (
+            'Проверьте, что в `Server-Timing` учтены все SQL-запросы.'
+        )
+        phases = sum(metrics[name][0] for name in (
+            'auth', 'serialize', 'render', 'db'
+        ))
+        assert phases <= metrics['total'][0], (
+            'Проверьте, что фазы не пересекаются и не превышают `total`.'
+        )
+
+    def test_log_line(self, client, post, caplog):
+        with caplog.at_level(logging.INFO, logger='api.timing'):
+            response = client.get(f'/api/v1/posts/{post.id}/')
+        assert response.status_code == HTTPStatus.OK
+        records = [
+            record for record in caplog.records if record.name == 'api.timing'
+        ]
+        assert len(records) == 1, (
+            'Проверьте, что на каждый запрос пишется одна строка лога.'
+        )
+        timing = records[0].timing
+        assert timing['view'] == 'post-detail'
+        assert timing['status'] == HTTPStatus.OK
+        assert timing['method'] == 'GET'
+        assert timing['queries'] >= 1
+        assert f'path=/api/v1/posts/{post.id}/' in records[0].getMessage()
+
+    def test_failed_authentication_timed(self, client):
+        response = client.post(
+            '/api/v1/posts/', {'text': 'Пост'},
+            HTTP_AUTHORIZATION='Bearer broken'
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        metrics = parse_header(response['Server-Timing'])
+        assert 'auth' in metrics and 'serialize' not in metrics, (
+            'Проверьте, что при ошибке аутентификации замеряется только '
+            'фаза `auth`.'
+        )
+
+    def test_streaming_response(self, user_client, post):
+        response = user_client.get('/api/v1/export/posts/')
+        assert response.status_code == HTTPStatus.OK
+        metrics = parse_header(response['Server-Timing'])
+        assert 'render' not in metrics and 'total' in metrics
+
+    def test_not_sampled(self, settings, client, post):
+        settings.SERVER_TIMING_SAMPLE_RATE = 0
+        response = client.get('/api/v1/posts/')
+        assert response.status_code == HTTPStatus.OK
+        assert 'Server-Timing' not in response, (
+            'Проверьте, что запросы вне выборки не замеряются.'
+        )
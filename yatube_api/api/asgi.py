@@ -0,0 +1,125 @@
+"""ASGI handler serving the hot read endpoints from a database thread pool.
+
+Under ASGI, Django 3.2 runs sync views in one shared thread, so
+concurrent requests queue behind each other, and every method of every
+``MiddlewareMixin`` middleware is another trip to that thread. There is
+no async ORM either. ``PooledASGIHandler`` keeps the HTTP side on the
+event loop and answers GET, HEAD and OPTIONS requests to the post list
+and detail, the comment list and the group list with a single call into
+a pool of ``ASYNC_DB_THREADS`` threads, each with its own database
+connection. That call runs the synchronous middleware and the unchanged
+DRF view, so permissions, caches and JSON are those of the WSGI
+application. Every other request takes Django's stock async path.
+
+Streaming responses, such as the export, query the database while they
+are iterated, so their content is produced in one pool thread and only
+the sending stays on the event loop.
+"""
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.base import BaseHandler
+from django.db import close_old_connections
+from django.urls import Resolver404, get_resolver
+
+POOLED_VIEWS = ('post-list', 'post-detail', 'comments-list', 'group-list')
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+db_executor = ThreadPoolExecutor(
+    settings.ASYNC_DB_THREADS, thread_name_prefix='db'
+)
+
+
+def call_in_db_thread(func, *args, **kwargs):
+    # What the request_started and request_finished signals do for the
+    # threads of a WSGI server: drop expired or broken connections.
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_in_db_thread(func, *args, **kwargs):
+    """Run ``func`` in the database thread pool, in the current context."""
+    context = contextvars.copy_context()
+    call = functools.partial(
+        context.run, call_in_db_thread, func, *args, **kwargs
+    )
+    return await asyncio.get_running_loop().run_in_executor(
+        db_executor, call
+    )
+
+
+class PooledASGIHandler(ASGIHandler):
+    """``ASGIHandler`` running the views of ``pooled_views`` in the pool."""
+    pooled_views = POOLED_VIEWS
+
+    def __init__(self):
+        super().__init__()
+        self.sync_handler = BaseHandler()
+        self.sync_handler.load_middleware(is_async=False)
+
+    def is_pooled(self, request):
+        if request.method not in SAFE_METHODS:
+            return False
+        resolver = get_resolver(getattr(request, 'urlconf', None))
+        try:
+            match = resolver.resolve(request.path_info)
+        except Resolver404:
+            return False
+        return match.url_name in self.pooled_views
+
+    async def get_response_async(self, request):
+        if self.is_pooled(request):
+            return await run_in_db_thread(
+                self.sync_handler.get_response, request
+            )
+        return await super().get_response_async(request)
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+        headers = [
+            (
+                header.encode('ascii') if isinstance(header, str) else header,
+                value.encode('latin1') if isinstance(value, str) else value,
+            )
+            for header, value in response.items()
+        ]
+        for cookie in response.cookies.values():
+            headers.append((
+                b'Set-Cookie',
+                cookie.output(header='').encode('ascii').strip()
+            ))
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': headers,
+        })
+        await run_in_db_thread(
+            self.stream_content, response, send, asyncio.get_running_loop()
+        )
+
+    def stream_content(self, response, send, loop):
+        """Iterate ``response`` in this thread, one connection for all of
+        its queries, and wait for ``send`` on ``loop`` after every chunk,
+        so a slow client holds the thread instead of buffering the
+        content.
+        """
+        def send_body(**message):
+            asyncio.run_coroutine_threadsafe(
+                send({'type': 'http.response.body', **message}), loop
+            ).result()
+
+        try:
+            for part in response:
+                for chunk, _ in self.chunk_bytes(part):
+                    send_body(body=chunk, more_body=True)
+            send_body()
+        finally:
+            response.close()
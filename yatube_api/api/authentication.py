@@ -0,0 +1,132 @@
+"""JWT authentication with an in-process cache of resolved users.
+
+The stock ``JWTAuthentication`` verifies the token signature and loads the
+user on every request. ``CachedJWTAuthentication`` keeps the result for a
+token in a bounded LRU keyed by the SHA-256 digest of the raw token, so a
+token that was already accepted costs one dictionary lookup.
+
+Entries live for at most ``JWT_USER_CACHE_TIMEOUT`` seconds and never past
+the token's own expiry. Every entry also remembers the version of its user
+in the shared Django cache, read before the user was loaded. Saving or
+deleting a user (deactivation, password change) bumps that version and
+drops the entries of the user in this process; other worker processes
+compare the version on every hit, one cache read and no SQL, so they stop
+accepting the cached user at once, provided the Django cache is shared
+between them. Inside a transaction the version is bumped again once the
+save commits, so a user loaded by another request before the commit is
+not kept.
+"""
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import bump_generation, get_generation
+
+
+def get_user_version(user_id):
+    return get_generation(f'user:{user_id}')
+
+
+def bump_user_version(user_id):
+    bump_generation(f'user:{user_id}')
+
+
+class TokenUserCache:
+    """Thread-safe LRU of token digests with per-entry expiry."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.user_keys = defaultdict(set)
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, user, validated_token, version = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self.entries.move_to_end(key)
+            return user, validated_token, version
+
+    def set(self, key, user, validated_token, timeout, version=None):
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (
+                time.monotonic() + timeout, user, validated_token, version
+            )
+            self.user_keys[user.pk].add(key)
+            while len(self.entries) > self.max_size:
+                self._remove(next(iter(self.entries)))
+
+    def invalidate_user(self, user_id):
+        with self.lock:
+            for key in list(self.user_keys.get(user_id, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.user_keys.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _remove(self, key):
+        _, user, _, _ = self.entries.pop(key)
+        keys = self.user_keys[user.pk]
+        keys.discard(key)
+        if not keys:
+            del self.user_keys[user.pk]
+
+
+token_user_cache = TokenUserCache(settings.JWT_USER_CACHE_SIZE)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` that reuses users of already verified tokens."""
+
+    cache = token_user_cache
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        key = hashlib.sha256(raw_token).digest()
+        cached = self.cache.get(key)
+        if cached is not None:
+            user, validated_token, version = cached
+            if version == get_user_version(user.pk):
+                # Each request gets its own copy, so related objects cached
+                # on the instance by one request never leak into another.
+                return copy.copy(user), validated_token
+
+        validated_token = self.get_validated_token(raw_token)
+        # Read before the user: a change saved in between bumps it again.
+        version = get_user_version(
+            validated_token[api_settings.USER_ID_CLAIM]
+        )
+        user = self.get_user(validated_token)
+        timeout = min(
+            settings.JWT_USER_CACHE_TIMEOUT,
+            validated_token['exp'] - time.time()
+        )
+        if timeout > 0:
+            self.cache.set(
+                key, copy.copy(user), validated_token, timeout, version
+            )
+        return user, validated_token
@@ -0,0 +1,85 @@
+"""SQLite backend for serving concurrent requests.
+
+On top of Django's backend:
+
+* every new connection runs the ``PRAGMA`` statements in
+  ``OPTIONS['pragmas']``, e.g. WAL so readers do not block the writer;
+* transactions start with ``BEGIN IMMEDIATE``. A deferred transaction
+  that reads before it writes fails with "database is locked" at once,
+  without waiting, when another connection wrote after its read; taking
+  the write lock up front makes it wait for the lock instead;
+* a statement that fails with "database is locked" outside a transaction
+  is retried up to ``OPTIONS['lock_retries']`` times, sleeping
+  ``OPTIONS['lock_backoff']`` seconds, doubled on every retry and with
+  jitter. That covers autocommit writes and ``BEGIN IMMEDIATE`` itself;
+  inside a transaction the error is raised, since one statement of it
+  cannot be retried on its own.
+
+``OPTIONS['timeout']`` is how long SQLite waits for a lock before a
+statement fails, before any retry.
+"""
+import random
+import time
+
+from django.db.backends.sqlite3 import base
+
+Database = base.Database
+
+LOCK_RETRIES = 3
+LOCK_BACKOFF = 0.05
+LOCK_BACKOFF_MAX = 1.0
+
+
+def is_locked(error):
+    return 'database is locked' in str(error)
+
+
+class LockRetryCursorWrapper(base.SQLiteCursorWrapper):
+    lock_retries = LOCK_RETRIES
+    lock_backoff = LOCK_BACKOFF
+
+    def execute(self, query, params=None):
+        return self.retry(super().execute, query, params)
+
+    def executemany(self, query, param_list):
+        if not self.connection.in_transaction:
+            # A retry needs the rows again.
+            param_list = list(param_list)
+        return self.retry(super().executemany, query, param_list)
+
+    def retry(self, method, *args):
+        delay = self.lock_backoff
+        for attempt in range(self.lock_retries + 1):
+            try:
+                return method(*args)
+            except Database.OperationalError as error:
+                if (attempt == self.lock_retries or not is_locked(error)
+                        or self.connection.in_transaction):
+                    raise
+            time.sleep(delay * random.uniform(0.5, 1))
+            delay = min(delay * 2, LOCK_BACKOFF_MAX)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = params.pop('pragmas', {})
+        self.lock_retries = params.pop('lock_retries', LOCK_RETRIES)
+        self.lock_backoff = params.pop('lock_backoff', LOCK_BACKOFF)
+        return params
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            connection.execute(f'PRAGMA {name} = {value}')
+        return connection
+
+    def create_cursor(self, name=None):
+        cursor = self.connection.cursor(factory=LockRetryCursorWrapper)
+        cursor.lock_retries = self.lock_retries
+        cursor.lock_backoff = self.lock_backoff
+        return cursor
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
@@ -0,0 +1,190 @@
+"""Versioned response cache for anonymous reads.
+
+Every cache key embeds the current generation of its namespace. Writes
+bump the generation of the namespaces they touch (see ``api.signals``),
+which orphans the stale entries without scanning or clearing the cache.
+A write inside a transaction bumps again once it commits: until then other
+connections read the old rows and may cache them under the first bump.
+Reads of a namespace written to after the last refresh of the request's
+read replica go to the primary (``CachedResponseMixin.initial``).
+"""
+import hashlib
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from rest_framework.response import Response
+
+from .replicas import get_read_replica, get_refreshed_at, read_from_primary
+
+SAFE_CACHE_METHODS = ('GET', 'HEAD')
+
+
+def _generation_key(namespace):
+    return f'generation:{namespace}'
+
+
+def _changed_key(namespace):
+    return f'changed:{namespace}'
+
+
+def get_generation(namespace):
+    key = _generation_key(namespace)
+    generation = cache.get(key)
+    if generation is None:
+        # Start from the clock so a counter evicted from the cache never
+        # comes back at a value that older entries were stored under.
+        cache.add(key, time.time_ns(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def get_changed_at(namespace):
+    """Return the time of the last write to the namespace.
+
+    An unknown time (never written, or evicted) is reported as now.
+    """
+    key = _changed_key(namespace)
+    changed_at = cache.get(key)
+    if changed_at is None:
+        cache.add(key, time.time(), None)
+        changed_at = cache.get(key)
+    return changed_at
+
+
+def bump_generation(*namespaces):
+    _bump(namespaces)
+    if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        transaction.on_commit(lambda: _bump(namespaces))
+
+
+def _bump(namespaces):
+    for namespace in namespaces:
+        try:
+            cache.incr(_generation_key(namespace))
+        except ValueError:
+            get_generation(namespace)
+        cache.set(_changed_key(namespace), time.time(), None)
+
+
+class CacheStats:
+    """Per-endpoint hit/miss counters and latency totals."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = defaultdict(
+            lambda: {'hits': 0, 'misses': 0, 'hit_ms': 0.0, 'miss_ms': 0.0}
+        )
+
+    def record(self, endpoint, hit, elapsed_ms):
+        with self.lock:
+            stats = self.endpoints[endpoint]
+            if hit:
+                stats['hits'] += 1
+                stats['hit_ms'] += elapsed_ms
+            else:
+                stats['misses'] += 1
+                stats['miss_ms'] += elapsed_ms
+
+    def snapshot(self):
+        with self.lock:
+            result = {}
+            for endpoint, stats in sorted(self.endpoints.items()):
+                total = stats['hits'] + stats['misses']
+                result[endpoint] = {
+                    'hits': stats['hits'],
+                    'misses': stats['misses'],
+                    'hit_ratio': stats['hits'] / total if total else 0.0,
+                    'avg_hit_ms': (
+                        stats['hit_ms'] / stats['hits']
+                        if stats['hits'] else None
+                    ),
+                    'avg_miss_ms': (
+                        stats['miss_ms'] / stats['misses']
+                        if stats['misses'] else None
+                    ),
+                }
+            return result
+
+    def reset(self):
+        with self.lock:
+            self.endpoints.clear()
+
+
+cache_stats = CacheStats()
+
+
+class CachedResponseMixin:
+    """Serve list and retrieve responses for anonymous users from cache.
+
+    Views set ``cache_namespace`` or override ``get_cache_namespace``.
+    """
+    cache_namespace = None
+
+    def get_cache_namespace(self):
+        return self.cache_namespace
+
+    def get_cache_key(self, request):
+        namespace = self.get_cache_namespace()
+        url = hashlib.md5(
+            request.build_absolute_uri().encode()
+        ).hexdigest()
+        return (
+            f'response:{namespace}:{get_generation(namespace)}:'
+            f'{self.action}:{url}'
+        )
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        alias = get_read_replica()
+        if alias is None:
+            return
+        refreshed_at = get_refreshed_at(alias)
+        if (
+            refreshed_at is None
+            or refreshed_at < get_changed_at(self.get_cache_namespace())
+        ):
+            # The replica misses the write that started the current
+            # generation: cached entries and validators of the generation
+            # must not be built from it.
+            read_from_primary()
+
+    def get_cache_endpoint(self):
+        return f'{self.basename}-{self.action}'
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        timeout = settings.RESPONSE_CACHE_TIMEOUT
+        if (
+            not timeout
+            or request.method not in SAFE_CACHE_METHODS
+            or request.user.is_authenticated
+        ):
+            return handler(request, *args, **kwargs)
+
+        started = time.perf_counter()
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        hit = data is not None
+        if hit:
+            response = Response(data)
+        else:
+            response = handler(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, timeout)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        cache_stats.record(
+            self.get_cache_endpoint(), hit,
+            (time.perf_counter() - started) * 1000
+        )
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
@@ -0,0 +1,97 @@
+"""Conditional requests (ETag / Last-Modified) for the API viewsets.
+
+List validators come from the write generation of the view's cache
+namespace (see ``api.cache``), so a ``304 Not Modified`` list costs two
+cache reads and no SQL. Detail validators come from the object itself,
+loaded once and shared with the view, so writes to other objects of the
+namespace do not invalidate a client's ``If-Match``.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .cache import get_changed_at, get_generation
+
+
+class ConditionalMixin:
+    """Answer conditional GET/HEAD and If-Match PUT/PATCH requests.
+
+    Uses ``get_cache_namespace`` of ``CachedResponseMixin`` as the change
+    counter of lists.
+    """
+
+    def make_etag(self, *parts):
+        digest = hashlib.md5(
+            ':'.join(str(part) for part in parts).encode()
+        ).hexdigest()
+        return quote_etag(digest)
+
+    def get_object(self):
+        # The detail validators and the handler share one load.
+        if not hasattr(self, '_conditional_object'):
+            self._conditional_object = super().get_object()
+        return self._conditional_object
+
+    def get_object_state(self, obj):
+        """Return the column values the representation of ``obj`` is
+        built from, with those of the related rows loaded with it.
+        """
+        state = [getattr(obj, field.attname)
+                 for field in obj._meta.concrete_fields]
+        for field in obj._meta.concrete_fields:
+            if field.is_relation and field.is_cached(obj):
+                related = field.get_cached_value(obj)
+                if related is not None:
+                    state.extend(self.get_object_state(related))
+        return state
+
+    def get_list_validators(self, request):
+        """Return ``(etag, last_modified)`` of the filtered list."""
+        namespace = self.get_cache_namespace()
+        etag = self.make_etag(
+            namespace, get_generation(namespace),
+            request.get_full_path(), request.accepted_renderer.format
+        )
+        return etag, get_changed_at(namespace)
+
+    def get_detail_validators(self, request):
+        """Return ``(etag, last_modified)`` of the object in the URL."""
+        obj = self.get_object()
+        etag = self.make_etag(
+            type(obj).__name__, *self.get_object_state(obj),
+            request.accepted_renderer.format
+        )
+        return etag, get_changed_at(self.get_cache_namespace())
+
+    def conditional_response(self, handler, validators, request,
+                             *args, **kwargs):
+        etag, last_modified = validators(request)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=int(last_modified)
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if request.method not in ('GET', 'HEAD'):
+                etag, last_modified = validators(request)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, self.get_list_validators, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, self.get_detail_validators,
+            request, *args, **kwargs
+        )
+
+    def update(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().update, self.get_detail_validators,
+            request, *args, **kwargs
+        )
@@ -0,0 +1,181 @@
+"""Streaming NDJSON export of posts.
+
+The export walks the posts in ``(pub_date, id)`` keyset batches of
+``EXPORT_BATCH_SIZE`` rows and writes one JSON object per line while the
+response is being sent, so memory use depends on the batch size only.
+
+With ``comments=true`` the posts of a batch are split by their
+``comments_count`` into runs of at most ``EXPORT_COMMENT_BATCH_SIZE``
+comments, read with one query per run. A post with more comments than
+that, or a run that has more after all, is written piece by piece while
+its comments are read in ``(created, id)`` keyset chunks of
+``comment_post_created_id_idx``.
+"""
+import orjson
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework import serializers
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+
+from posts.models import Comment, Post
+from .fast_serializers import CommentValuesSerializer, PostValuesSerializer
+from .pagination import CommentCursorPagination, PostCursorPagination
+from .renderers import ORJSON_OPTIONS, encode_default
+from .timing import ServerTimingMixin
+
+
+class PostExportFilterSerializer(serializers.Serializer):
+    """Query parameters of the export."""
+    author = serializers.CharField(required=False)
+    group = serializers.IntegerField(required=False)
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+    comments = serializers.BooleanField(required=False, default=False)
+
+    def get_filters(self):
+        data = self.validated_data
+        filters = {}
+        if 'author' in data:
+            filters['author__username'] = data['author']
+        if 'group' in data:
+            filters['group_id'] = data['group']
+        if 'since' in data:
+            filters['pub_date__gte'] = data['since']
+        if 'until' in data:
+            filters['pub_date__lt'] = data['until']
+        return filters
+
+
+def dump(item):
+    return orjson.dumps(item, default=encode_default, option=ORJSON_OPTIONS)
+
+
+def dump_line(item):
+    return dump(item) + b'\n'
+
+
+def iter_keyset_batches(queryset, pagination, batch_size):
+    """Yield lists of ``values()`` rows in the ordering of ``pagination``."""
+    position = None
+    while True:
+        batch = pagination.get_page_items(
+            queryset, position, False, batch_size
+        )
+        if not batch:
+            return
+        yield batch
+        position = pagination.get_position(batch[-1])
+
+
+def split_by_comments(batch, limit):
+    """Split post rows, in order, into runs with at most ``limit``
+    comments in total; a post with more comments is a run of its own.
+    """
+    run, count = [], 0
+    for row in batch:
+        if run and count + row['comments_count'] > limit:
+            yield run
+            run, count = [], 0
+        run.append(row)
+        count += row['comments_count']
+    if run:
+        yield run
+
+
+def iter_run(run, post_serializer, comment_serializer, limit):
+    """Yield the lines of a run of posts, its comments read at once.
+
+    ``comments_count`` is only a hint: if the run has more than ``limit``
+    comments after all, its posts are written one by one.
+    """
+    rows = list(comment_serializer.get_rows(
+        Comment.objects.filter(post_id__in=[row['id'] for row in run])
+        .order_by('post_id', 'created', 'id')[:limit + 1]
+    ))
+    if len(rows) > limit:
+        for row in run:
+            yield from iter_long_post(
+                row, post_serializer, comment_serializer, limit
+            )
+        return
+    comments = {row['id']: [] for row in run}
+    for row in rows:
+        comments[row['post']].append(
+            comment_serializer.to_representation(row)
+        )
+    for row in run:
+        item = post_serializer.to_representation(row)
+        item['comments'] = comments[row['id']]
+        yield dump_line(item)
+
+
+def iter_long_post(row, post_serializer, comment_serializer, chunk_size):
+    """Yield the line of one post in pieces, its comments read in keyset
+    chunks of ``chunk_size``.
+    """
+    # Reopen the object to append the ``comments`` list.
+    yield dump(post_serializer.to_representation(row))[:-1]
+    opening = separator = b',"comments":['
+    batches = iter_keyset_batches(
+        comment_serializer.get_rows(
+            Comment.objects.filter(post_id=row['id'])
+        ),
+        CommentCursorPagination(), chunk_size
+    )
+    for batch in batches:
+        yield separator + b','.join(
+            dump(comment_serializer.to_representation(comment))
+            for comment in batch
+        )
+        separator = b','
+    # Without comments no chunk has opened the list.
+    yield (opening if separator is opening else b'') + b']}\n'
+
+
+def iter_export(context, filters, with_comments):
+    post_serializer = PostValuesSerializer(context=context)
+    comment_serializer = CommentValuesSerializer(context=context)
+    posts = post_serializer.get_rows(Post.objects.filter(**filters))
+    limit = settings.EXPORT_COMMENT_BATCH_SIZE
+    for batch in iter_keyset_batches(
+        posts, PostCursorPagination(), settings.EXPORT_BATCH_SIZE
+    ):
+        if not with_comments:
+            for row in batch:
+                yield dump_line(post_serializer.to_representation(row))
+            continue
+        for run in split_by_comments(batch, limit):
+            if run[0]['comments_count'] > limit:
+                yield from iter_long_post(
+                    run[0], post_serializer, comment_serializer, limit
+                )
+            else:
+                yield from iter_run(
+                    run, post_serializer, comment_serializer, limit
+                )
+
+
+class PostExportView(ServerTimingMixin, APIView):
+    """Stream posts as NDJSON, optionally with their comments.
+
+    Filters: ``author`` (username), ``group`` (id), ``since`` and
+    ``until`` (``pub_date`` range, ``until`` excluded); ``comments=true``
+    adds a ``comments`` list to every post.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        params = PostExportFilterSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        response = StreamingHttpResponse(
+            iter_export(
+                {'request': request},
+                params.get_filters(),
+                params.validated_data['comments']
+            ),
+            content_type='application/x-ndjson'
+        )
+        # Let proxies pass the lines on as they are produced.
+        response['X-Accel-Buffering'] = 'no'
+        return response
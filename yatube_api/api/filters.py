@@ -0,0 +1,48 @@
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+
+from posts.models import search_name
+
+# Greater than any character, so ``prefix + LAST_CHAR`` bounds the strings
+# starting with ``prefix``.
+LAST_CHAR = '\U0010ffff'
+
+
+def prefix_lookup(field, prefix):
+    """Return lookups matching values of ``field`` starting with ``prefix``.
+
+    A range instead of ``__startswith``: SQLite's ``LIKE`` ignores case and
+    so cannot use an index of a case-sensitive column.
+    """
+    return {f'{field}__gte': prefix, f'{field}__lt': prefix + LAST_CHAR}
+
+
+class PrefixSearchFilter(filters.SearchFilter):
+    """Match the search terms against the start of ``search_prefix_field``.
+
+    The field stores ``search_name`` of the searched value, so matching
+    ignores case and an index on it answers the search. With
+    ``?match=contains`` the terms match anywhere in ``search_fields``, as
+    with ``SearchFilter``, which scans every row.
+    """
+    match_param = 'match'
+    match_modes = ('prefix', 'contains')
+
+    def get_match_mode(self, request):
+        mode = request.query_params.get(self.match_param, 'prefix')
+        if mode not in self.match_modes:
+            raise ValidationError({
+                self.match_param: 'Ожидается одно из значений: {}.'.format(
+                    ', '.join(self.match_modes)
+                )
+            })
+        return mode
+
+    def filter_queryset(self, request, queryset, view):
+        if self.get_match_mode(request) == 'contains':
+            return super().filter_queryset(request, queryset, view)
+        for term in self.get_search_terms(request):
+            queryset = queryset.filter(**prefix_lookup(
+                view.search_prefix_field, search_name(term)
+            ))
+        return queryset
@@ -0,0 +1,40 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.replicas import refresh_replica
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy the primary database into the read replicas of '
+        'DATABASE_REPLICAS with the SQLite online backup API.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Repeat every this many seconds; 0 copies once. Keep it '
+                 'below DATABASE_STICKY_SECONDS.'
+        )
+        parser.add_argument(
+            '--pages', type=int, default=-1,
+            help='Pages copied per step; -1 copies the database in one step.'
+        )
+
+    def handle(self, *args, **options):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas:
+            raise CommandError('DATABASE_REPLICAS is empty.')
+        while True:
+            for alias in replicas:
+                started = time.perf_counter()
+                refresh_replica(alias, pages=options['pages'])
+                self.stdout.write(
+                    f'Refreshed {alias} in '
+                    f'{time.perf_counter() - started:.2f}s.'
+                )
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
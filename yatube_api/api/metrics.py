@@ -0,0 +1,348 @@
+"""In-process request metrics exposed in the Prometheus text format.
+
+``MetricsMiddleware`` records every request answered by a DRF view:
+latency, SQL query count and response size histograms and a response
+cache hit counter, labeled by view class, action and status.
+
+Each worker process keeps its own ``Registry``. With ``METRICS_DIR`` set,
+processes write snapshots of it to that directory (at most every
+``METRICS_FLUSH_INTERVAL`` seconds and at exit) and a scrape sums the
+snapshots of all processes, including those that have exited, so counters
+never go backwards. Without it only the scraped process is reported.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import nullcontext
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+
+from .timing import ServerTimingMixin, get_timer, query_hook
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LABELS = ('view', 'action', 'status')
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+SIZE_BUCKETS = tuple(256 * 4 ** power for power in range(8))
+
+
+def escape(value):
+    return (
+        str(value).replace('\\', r'\\').replace('\n', r'\n')
+        .replace('"', r'\"')
+    )
+
+
+def format_labels(names, values, extra=''):
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    def empty(self):
+        return 0
+
+    def add(self, current, amount):
+        return current + amount
+
+    def merge(self, first, second):
+        return first + second
+
+    def samples(self, labels, value):
+        yield self.name, format_labels(self.labelnames, labels), value
+
+
+class Histogram:
+    """Values are ``[bucket counts..., sum, count]``, counts per bucket."""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+
+    def empty(self):
+        return [0] * (len(self.buckets) + 2)
+
+    def add(self, current, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                current[index] += 1
+                break
+        current[-2] += value
+        current[-1] += 1
+        return current
+
+    def merge(self, first, second):
+        return [a + b for a, b in zip(first, second)]
+
+    def samples(self, labels, value):
+        cumulative = 0
+        for bound, count in zip(self.buckets, value):
+            cumulative += count
+            yield (
+                f'{self.name}_bucket',
+                format_labels(self.labelnames, labels,
+                              f'le="{format_number(bound)}"'),
+                cumulative
+            )
+        yield (
+            f'{self.name}_bucket',
+            format_labels(self.labelnames, labels, 'le="+Inf"'), value[-1]
+        )
+        plain = format_labels(self.labelnames, labels)
+        yield f'{self.name}_sum', plain, value[-2]
+        yield f'{self.name}_count', plain, value[-1]
+
+
+class Registry:
+    """Thread-safe metric values of one process."""
+
+    def __init__(self, directory=None, flush_interval=5):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.metrics = {}
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget all values, e.g. in a process forked from a parent."""
+        self.values = {name: {} for name in self.metrics}
+        self.pid = os.getpid()
+        # Unique per process lifetime, so a restarted worker that gets a
+        # recycled pid does not overwrite the totals of the old one.
+        self.snapshot_name = f'{self.pid}-{uuid.uuid4().hex[:8]}.json'
+        self.flushed_at = time.monotonic()
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        self.values[metric.name] = {}
+        return metric
+
+    def counter(self, name, documentation, labelnames=LABELS):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, buckets, labelnames=LABELS):
+        return self.register(
+            Histogram(name, documentation, labelnames, buckets)
+        )
+
+    def record(self, name, labels, value=1):
+        metric = self.metrics[name]
+        with self.lock:
+            if os.getpid() != self.pid:
+                self.reset()
+            values = self.values[name]
+            current = values.get(labels)
+            if current is None:
+                current = metric.empty()
+            values[labels] = metric.add(current, value)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                name: [
+                    [list(labels),
+                     list(value) if isinstance(value, list) else value]
+                    for labels, value in values.items()
+                ]
+                for name, values in self.values.items()
+            }
+
+    def maybe_flush(self):
+        if (self.directory
+                and time.monotonic() - self.flushed_at >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write this process's snapshot to ``directory``."""
+        if not self.directory:
+            return
+        self.flushed_at = time.monotonic()
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, self.snapshot_name)
+        temporary = f'{path}.{threading.get_ident()}.tmp'
+        with open(temporary, 'w') as target:
+            json.dump(self.snapshot(), target)
+        os.replace(temporary, path)
+
+    def collect(self):
+        """Return the snapshots of all processes, this one up to date."""
+        if not self.directory:
+            return [self.snapshot()]
+        self.flush()
+        snapshots = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith('.json'):
+                continue
+            try:
+                with open(entry.path) as source:
+                    snapshots.append(json.load(source))
+            except (OSError, ValueError):
+                # Removed or replaced while listing; the next scrape has it.
+                continue
+        return snapshots
+
+    def merge(self, snapshots):
+        merged = {name: {} for name in self.metrics}
+        for snapshot in snapshots:
+            for name, samples in snapshot.items():
+                metric = self.metrics.get(name)
+                if metric is None:
+                    continue
+                values = merged[name]
+                for labels, value in samples:
+                    labels = tuple(labels)
+                    if labels in values:
+                        value = metric.merge(values[labels], value)
+                    values[labels] = value
+        return merged
+
+    def render(self):
+        """Return all processes' metrics in the Prometheus text format."""
+        lines = []
+        for name, values in self.merge(self.collect()).items():
+            metric = self.metrics[name]
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for labels in sorted(values):
+                for sample, label_text, value in metric.samples(
+                    labels, values[labels]
+                ):
+                    lines.append(
+                        f'{sample}{label_text} {format_number(value)}'
+                    )
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry(settings.METRICS_DIR, settings.METRICS_FLUSH_INTERVAL)
+registry.counter(
+    'api_requests_total', 'Requests answered by API views.'
+)
+registry.histogram(
+    'api_request_duration_seconds', 'Time to build the response.',
+    LATENCY_BUCKETS
+)
+registry.histogram(
+    'api_request_queries', 'SQL queries run per request.', QUERY_BUCKETS
+)
+registry.histogram(
+    'api_response_size_bytes', 'Size of non-streaming response bodies.',
+    SIZE_BUCKETS
+)
+registry.counter(
+    'api_response_cache_total',
+    'Anonymous response cache lookups by result (hit or miss).',
+    ('view', 'action', 'result')
+)
+atexit.register(registry.flush)
+
+
+class QueryCounter:
+    """``execute_wrapper`` hook counting queries."""
+
+    def __init__(self):
+        self.queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+
+def get_view_labels(request):
+    """Return ``(view, action)`` of a request routed to a DRF view."""
+    match = request.resolver_match
+    view_class = getattr(match.func, 'cls', None) if match else None
+    if view_class is None or not issubclass(view_class, APIView):
+        return None
+    method = request.method.lower()
+    actions = getattr(match.func, 'actions', None)
+    action = actions.get(method, method) if actions else method
+    return view_class.__name__, action
+
+
+class MetricsMiddleware:
+    """Record metrics of API requests; place it after the timing one."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        counter = self.get_counter(request)
+        with query_hook(counter) if counter else nullcontext():
+            response = self.get_response(request)
+        return self.record(request, response, started, counter)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        counter = self.get_counter(request)
+        with query_hook(counter) if counter else nullcontext():
+            response = await self.get_response(request)
+        return self.record(request, response, started, counter)
+
+    def get_counter(self, request):
+        # Sampled requests already count their queries.
+        return QueryCounter() if get_timer(request) is None else None
+
+    def record(self, request, response, started, counter):
+        elapsed = time.perf_counter() - started
+        view = get_view_labels(request)
+        if view is not None:
+            labels = view + (str(response.status_code),)
+            queries = (counter or get_timer(request)).queries
+            registry.record('api_requests_total', labels)
+            registry.record('api_request_duration_seconds', labels, elapsed)
+            registry.record('api_request_queries', labels, queries)
+            if not response.streaming:
+                registry.record(
+                    'api_response_size_bytes', labels, len(response.content)
+                )
+            cache_result = response.get('X-Cache')
+            if cache_result:
+                registry.record(
+                    'api_response_cache_total',
+                    view + (cache_result.lower(),)
+                )
+        registry.maybe_flush()
+        return response
+
+
+class MetricsView(ServerTimingMixin, APIView):
+    """Metrics of all worker processes in the Prometheus text format."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,59 @@
+from django.conf import settings
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+
+class BulkCreateMixin:
+    """Create a JSON array of objects with ``POST .../bulk/``.
+
+    Items are validated by the view's serializer in ``many=True`` mode;
+    if any item is invalid nothing is created and the response lists the
+    errors of every item in request order.
+    """
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            raise ValidationError(
+                {'detail': 'Ожидается список объектов.'}
+            )
+        limit = settings.BULK_CREATE_MAX_ITEMS
+        if len(request.data) > limit:
+            raise ValidationError(
+                {'detail': f'Не больше {limit} объектов за один запрос.'}
+            )
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        self.perform_bulk_create(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def perform_bulk_create(self, serializer):
+        serializer.save()
+
+
+class ValuesListMixin:
+    """Serve the list action from ``values()`` rows.
+
+    ``values_serializer_class`` renders the same JSON as the view's
+    ``serializer_class`` without building model instances; set
+    ``FAST_LIST_SERIALIZATION = False`` to list through the model
+    serializer instead.
+    """
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if (
+            self.values_serializer_class is None
+            or not settings.FAST_LIST_SERIALIZATION
+        ):
+            return super().list(request, *args, **kwargs)
+        serializer = self.values_serializer_class(
+            context=self.get_serializer_context()
+        )
+        rows = serializer.get_rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(rows))
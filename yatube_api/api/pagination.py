@@ -0,0 +1,319 @@
+import json
+import math
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    LimitOffsetPagination,
+    _positive_int
+)
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from posts import search
+from posts.timeline import get_feed_sources
+
+# Integers SQLite can bind; larger cursor values fail in the query.
+SQLITE_INTEGERS = range(-2 ** 63, 2 ** 63)
+
+
+class KeysetPagination(BasePagination):
+    """Opaque cursor pagination over a unique two-column ordering.
+
+    The ordering is ``(field, 'id')``, both columns sorted in the same
+    direction. Each page is fetched with ``WHERE (field, id) > cursor
+    LIMIT n`` so the cost does not depend on how deep the page is.
+    """
+    cursor_query_param = 'cursor'
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('pub_date', 'id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+        self.position, self.reverse = self.decode_cursor(request)
+
+        items = self.get_page_items(
+            queryset, self.position, self.reverse, self.page_size + 1
+        )
+        has_more = len(items) > self.page_size
+        page = items[:self.page_size]
+        if self.reverse:
+            page.reverse()
+
+        if self.reverse:
+            self.has_next = self.position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+        self.page = page
+        return page
+
+    def get_page_items(self, queryset, position, reverse, limit):
+        """Return up to ``limit`` items past ``position``."""
+        if position is not None:
+            queryset = queryset.filter(
+                self.get_position_filter(position, reverse)
+            )
+        return list(queryset.order_by(*self.get_ordering(reverse))[:limit])
+
+    def get_fields(self):
+        return [name.lstrip('-') for name in self.ordering]
+
+    def get_ordering(self, reverse=False, fields=None):
+        descending = self.ordering[0].startswith('-')
+        if reverse:
+            descending = not descending
+        prefix = '-' if descending else ''
+        return [prefix + name for name in fields or self.get_fields()]
+
+    def get_position_filter(self, position, reverse=False, fields=None):
+        """Build the ``(field, id)`` row comparison as a Q object.
+
+        The redundant ``field >= value`` term lets SQLite seek the
+        composite index instead of scanning it from the start.
+        """
+        field, pk = fields or self.get_fields()
+        descending = self.ordering[0].startswith('-') != reverse
+        lookup = 'lt' if descending else 'gt'
+        value, pk_value = position
+        return Q(**{f'{field}__{lookup}e': value}) & (
+            Q(**{f'{field}__{lookup}': value})
+            | Q(**{f'{pk}__{lookup}': pk_value})
+        )
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_position(self, item):
+        names = self.get_fields()
+        if isinstance(item, Mapping):
+            return tuple(item[name] for name in names)
+        return tuple(getattr(item, name) for name in names)
+
+    def fetch_by_ids(self, queryset, ids):
+        """Return ``{id: item}``; items may be models or ``values()`` rows."""
+        return {
+            item['id'] if isinstance(item, Mapping) else item.pk: item
+            for item in queryset.filter(pk__in=ids).order_by()
+        }
+
+    def decode_cursor(self, request):
+        """Return ``(position, reverse)`` from the cursor query param."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padding = '=' * (-len(encoded) % 4)
+            data = json.loads(urlsafe_b64decode(encoded + padding))
+            names = self.get_fields()
+            position = tuple(
+                self.parse_position_value(name, value)
+                for name, value in zip(names, data['p'])
+            )
+            if len(position) != len(names) or None in position:
+                raise ValueError
+            return position, bool(data.get('r'))
+        except (TypeError, ValueError, KeyError, AttributeError,
+                OverflowError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def parse_position_value(self, name, value):
+        value = self.model._meta.get_field(name).to_python(value)
+        if isinstance(value, int) and value not in SQLITE_INTEGERS:
+            raise ValueError(value)
+        return value
+
+    def encode_cursor(self, position, reverse=False):
+        values = [
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in position
+        ]
+        data = {'p': values}
+        if reverse:
+            data['r'] = 1
+        encoded = urlsafe_b64encode(
+            json.dumps(data, separators=(',', ':')).encode()
+        ).decode().rstrip('=')
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(
+            self.get_position(self.page[0]), reverse=True
+        )
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+
+class PostCursorPagination(KeysetPagination):
+    """Cursor pagination for posts ordered by publication date."""
+    ordering = ('pub_date', 'id')
+
+
+class CommentCursorPagination(KeysetPagination):
+    """Cursor pagination for comments of a post, oldest first."""
+    ordering = ('created', 'id')
+
+
+class FeedPagination(KeysetPagination):
+    """Cursor pagination for the follow feed, newest posts first.
+
+    A page is merged from the requesting user's timeline and the posts of
+    followed authors that are not fanned out; each source is read with a
+    bounded keyset query, so the cost depends on the page size only.
+    """
+    ordering = ('-pub_date', '-id')
+
+    def get_page_items(self, queryset, position, reverse, limit):
+        entries, pulled = get_feed_sources(self.request.user)
+        sources = [(entries, ('pub_date', 'post_id'))]
+        if pulled is not None:
+            sources.append((pulled, ('pub_date', 'id')))
+
+        keys = set()
+        for source, fields in sources:
+            if position is not None:
+                source = source.filter(
+                    self.get_position_filter(position, reverse, fields)
+                )
+            keys.update(
+                source.order_by(*self.get_ordering(reverse, fields))
+                .values_list(*fields)[:limit]
+            )
+        descending = self.get_ordering(reverse)[0].startswith('-')
+        ids = [pk for _, pk in sorted(keys, reverse=descending)[:limit]]
+        posts = self.fetch_by_ids(queryset, ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+
+class SearchPagination(KeysetPagination):
+    """Cursor pagination of full-text search results, best match first.
+
+    Pages are read from the FTS5 index ordered by ``(bm25 rank, id)`` and
+    the posts of a page are then fetched by primary key.
+    """
+    ordering = ('search_rank', 'id')
+    search_query_param = 'search'
+
+    def get_page_items(self, queryset, position, reverse, limit):
+        query = self.request.query_params.get(self.search_query_param, '')
+        matches = search.search(query, position, reverse, limit)
+        posts = self.fetch_by_ids(queryset, [pk for _, pk in matches])
+        page = []
+        for rank, pk in matches:
+            if pk in posts:
+                post = posts[pk]
+                if isinstance(post, Mapping):
+                    post['search_rank'] = rank
+                else:
+                    post.search_rank = rank
+                page.append(post)
+        return page
+
+    def parse_position_value(self, name, value):
+        if name == 'search_rank':
+            value = float(value)
+            if not math.isfinite(value):
+                raise ValueError(value)
+            return value
+        return super().parse_position_value(name, value)
+
+
+class CursorOrLimitOffsetPagination(LimitOffsetPagination):
+    """Limit/offset pagination with opt-in keyset cursor and search modes.
+
+    Requests carrying ``cursor`` or ``page_size`` are paginated by
+    ``cursor_class``, requests carrying ``search`` by ``search_class``
+    when it is set; everything else keeps the limit/offset behaviour
+    existing clients rely on.
+    """
+    cursor_class = PostCursorPagination
+    search_class = None
+
+    def get_cursor_class(self, request):
+        params = request.query_params
+        search_class = self.search_class
+        if (
+            search_class is not None
+            and search.is_available()
+            and params.get(search_class.search_query_param)
+        ):
+            return search_class
+        cursor_class = self.cursor_class
+        if (
+            cursor_class.cursor_query_param in params
+            or cursor_class.page_size_query_param in params
+        ):
+            return cursor_class
+        return None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        cursor_class = self.get_cursor_class(request)
+        if cursor_class is not None:
+            self.cursor_paginator = cursor_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class CommentPagination(CursorOrLimitOffsetPagination):
+    """Opt-in cursor or limit/offset pagination for comments."""
+    cursor_class = CommentCursorPagination
+
+
+class PostPagination(CursorOrLimitOffsetPagination):
+    """Pagination for posts, ranked by relevance when searching."""
+    search_class = SearchPagination
@@ -0,0 +1,52 @@
+"""Fast JSON and MessagePack renderers.
+
+``ORJSONRenderer`` produces the same compact JSON as DRF's
+``JSONRenderer``, with ``orjson`` doing the encoding; datetimes left
+unformatted by the serializers (``DATETIME_FORMAT = None``) are encoded
+natively in the same ISO 8601 form. ``MessagePackRenderer`` answers
+``Accept: application/msgpack`` and encodes datetimes as MessagePack
+timestamps.
+"""
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+# Types orjson and msgpack do not know (lazy strings, decimals, querysets)
+# are converted the way DRF's JSON encoder converts them.
+encode_default = JSONEncoder().default
+
+
+class ORJSONRenderer(JSONRenderer):
+    """Drop-in ``JSONRenderer`` backed by orjson."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None:
+            # Indented output (browsable API, ``indent=`` in Accept) is rare
+            # and orjson only indents by two spaces.
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = orjson.dumps(data, default=encode_default, option=ORJSON_OPTIONS)
+        # Keep the output a strict JavaScript subset, like JSONRenderer.
+        if b'\xe2\x80' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+                b'\xe2\x80\xa9', b'\\u2029'
+            )
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Render responses as MessagePack for ``application/msgpack``."""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encode_default, datetime=True)
@@ -0,0 +1,164 @@
+"""Read replicas of the SQLite database.
+
+A replica is a separate SQLite file copied from the primary with the
+online backup API (``refresh_replica``, run periodically by the
+``refresh_replicas`` command). ``ReplicaMiddleware`` lets GET, HEAD and
+OPTIONS requests read from a randomly chosen replica, and
+``ReplicaRouter`` sends those reads there for the models of
+``DATABASE_REPLICA_APPS``. Everything else uses the primary:
+
+* writes, and reads inside a transaction on the primary;
+* reads of other apps, so users that just registered can log in;
+* every request of a client that sent a write in the last
+  ``DATABASE_STICKY_SECONDS``, so it sees its own changes. Clients are
+  told apart by their ``Authorization`` header or session cookie;
+* the rest of a request whose view finds that the replica was last
+  refreshed before a write it must show (see ``get_refreshed_at``), so
+  the response cache and the validators of the new generation are not
+  filled with stale rows.
+
+Streaming responses are produced after the middleware returns and read
+from the primary.
+"""
+import hashlib
+import random
+import sqlite3
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def _refreshed_key(alias):
+    return f'replica-refreshed:{alias}'
+
+
+def get_read_replica():
+    """Return the replica the reads of this request go to, or None."""
+    return _read_alias.get()
+
+
+def read_from_primary():
+    """Send the remaining reads of this request to the primary."""
+    _read_alias.set(None)
+
+
+def get_refreshed_at(alias):
+    """Return when the last refresh of ``alias`` started, or None.
+
+    The replica holds every write committed before that time.
+    """
+    return cache.get(_refreshed_key(alias))
+
+
+def get_client_key(request):
+    credential = (
+        request.META.get('HTTP_AUTHORIZATION')
+        or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    )
+    if not credential:
+        return None
+    digest = hashlib.sha256(credential.encode()).hexdigest()
+    return f'db-sticky:{digest}'
+
+
+class ReplicaMiddleware:
+    """Choose the database that the reads of a request go to."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        token = _read_alias.set(self.choose_alias(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+        self.mark_sticky(request)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+        token = _read_alias.set(self.choose_alias(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+        self.mark_sticky(request)
+        return response
+
+    def choose_alias(self, request):
+        if request.method not in SAFE_METHODS:
+            return None
+        key = get_client_key(request)
+        if key and cache.get(key):
+            return None
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def mark_sticky(self, request):
+        key = get_client_key(request)
+        if request.method not in SAFE_METHODS and key:
+            cache.set(key, True, settings.DATABASE_STICKY_SECONDS)
+
+
+class ReplicaRouter:
+    """Route reads chosen by ``ReplicaMiddleware`` to a replica."""
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if (
+            alias is None
+            or model._meta.app_label not in settings.DATABASE_REPLICA_APPS
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        # Explicit, or saving an instance read from a replica would write
+        # to the replica.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Replicas get the schema with the data.
+        return db not in settings.DATABASE_REPLICAS
+
+
+def refresh_replica(alias, source_alias=DEFAULT_DB_ALIAS, pages=-1):
+    """Copy the primary into the replica file of ``alias``.
+
+    Uses a separate connection to the replica file; Django's connections
+    to it see the new data with their next query. ``pages`` per step, -1
+    copies everything in one step. A copy restarts when the primary is
+    written to, so it is at least as new as the time it started.
+    """
+    source = connections[source_alias]
+    source.ensure_connection()
+    started = time.time()
+    target = sqlite3.connect(str(connections.databases[alias]['NAME']))
+    try:
+        source.connection.backup(target, pages=pages)
+    finally:
+        target.close()
+    cache.set(_refreshed_key(alias), started, None)
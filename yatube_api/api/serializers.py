@@ -1,7 +1,51 @@
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import Max
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 
-from posts.models import Group, Post, Comment, Follow, User
+from posts.models import (
+    Group,
+    Post,
+    Comment,
+    Follow,
+    Recommendation,
+    User
+)
+
+
+def image_variant_urls(variants, request=None):
+    if not variants:
+        return None
+    urls = {}
+    for variant, names in variants.items():
+        urls[variant] = {}
+        for fmt, name in names.items():
+            url = default_storage.url(name)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            urls[variant][fmt] = url
+    return urls
+
+
+class BulkCreateListSerializer(serializers.ListSerializer):
+    """Create all validated items with a single bulk_create."""
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        objs = [model(**attrs) for attrs in validated_data]
+        with transaction.atomic():
+            if connection.features.can_return_rows_from_bulk_insert:
+                return model.objects.bulk_create(objs)
+            # The backend cannot return primary keys from a bulk insert, so
+            # read the rows back: they are the newest ones of this author.
+            last_pk = model.objects.aggregate(last=Max('pk'))['last'] or 0
+            model.objects.bulk_create(objs)
+            author = validated_data[0]['author'] if validated_data else None
+            return list(
+                model.objects.filter(pk__gt=last_pk, author=author)
+                .select_related('author').order_by('pk')[:len(objs)]
+            )
 
 
 class GroupSerializer(serializers.ModelSerializer):
@@ -17,11 +61,19 @@ class PostSerializer(serializers.ModelSerializer):
         slug_field='username',
         read_only=True
     )
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Post
         fields = '__all__'
-        read_only_fields = ('author',)
+        read_only_fields = ('author', 'comments_count')
+        list_serializer_class = BulkCreateListSerializer
+
+    def get_image_variants(self, obj):
+        """URLs of the resized images, or None until they are ready"""
+        return image_variant_urls(
+            obj.image_variants, self.context.get('request')
+        )
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -35,6 +87,27 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
         fields = '__all__'
         read_only_fields = ('author', 'post',)
+        list_serializer_class = BulkCreateListSerializer
+
+
+class ProfileSerializer(serializers.ModelSerializer):
+    """Serializer for a user profile with activity counters."""
+    posts_count = serializers.IntegerField(
+        source='stats.posts_count', read_only=True
+    )
+    followers_count = serializers.IntegerField(
+        source='stats.followers_count', read_only=True
+    )
+    following_count = serializers.IntegerField(
+        source='stats.following_count', read_only=True
+    )
+
+    class Meta:
+        model = User
+        fields = (
+            'id', 'username', 'posts_count',
+            'followers_count', 'following_count'
+        )
 
 
 class FollowSerializer(serializers.ModelSerializer):
@@ -67,3 +140,14 @@ class FollowSerializer(serializers.ModelSerializer):
                 {'detail': 'Вы не можете быть подписаны на самого себя!'}
             )
         return value
+
+
+class RecommendationSerializer(serializers.ModelSerializer):
+    """Serializer for Recommendation model."""
+    candidate = serializers.SlugRelatedField(
+        read_only=True, slug_field='username'
+    )
+
+    class Meta:
+        model = Recommendation
+        fields = ('candidate', 'score', 'mutual', 'co_followers')
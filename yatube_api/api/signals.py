@@ -0,0 +1,63 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from posts.models import Comment, Group, Post, User
+from .authentication import bump_user_version, token_user_cache
+from .cache import bump_generation
+
+
+@receiver([post_save, post_delete], sender=Post)
+def post_changed(sender, instance, signal, **kwargs):
+    """Invalidate cached posts and, on delete, the post's comments."""
+    bump_generation('posts')
+    if signal is post_delete:
+        bump_generation(f'comments:{instance.pk}')
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    """Invalidate cached comments of the commented post.
+
+    Posts are invalidated too, since they render ``comments_count``.
+    """
+    bump_generation(f'comments:{instance.post_id}', 'posts')
+
+
+@receiver([post_save, post_delete], sender=Group)
+def group_changed(sender, instance, signal, **kwargs):
+    """Invalidate cached groups; deleting a group also updates posts."""
+    bump_generation('groups')
+    if signal is post_delete:
+        bump_generation('posts')
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, update_fields=None, **kwargs):
+    """Keep the stored username of a user about to be saved."""
+    if instance.pk is None or (
+        update_fields is not None and 'username' not in update_fields
+    ):
+        return
+    instance._stored_username = User.objects.filter(
+        pk=instance.pk
+    ).values_list('username', flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, signal, **kwargs):
+    """Forget cached JWT users, e.g. after deactivation or a new password.
+
+    The version bump reaches the caches of other worker processes. Posts
+    and comments show their author's username, so a rename invalidates
+    the posts and the comments of every post the user commented on.
+    """
+    bump_user_version(instance.pk)
+    token_user_cache.invalidate_user(instance.pk)
+    stored = instance.__dict__.pop('_stored_username', None)
+    if signal is post_save and stored not in (None, instance.username):
+        bump_generation('posts')
+        post_ids = Comment.objects.filter(author=instance).values_list(
+            'post_id', flat=True
+        ).distinct()
+        for post_id in post_ids.iterator():
+            bump_generation(f'comments:{post_id}')
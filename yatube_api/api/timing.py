@@ -0,0 +1,213 @@
+"""Per-request timing of the API: ``Server-Timing`` header and a log line.
+
+``ServerTimingMiddleware`` picks a ``SERVER_TIMING_SAMPLE_RATE`` share of
+requests. For those it counts and times every SQL query through
+``connection.execute_wrapper`` and ``ServerTimingMixin`` splits the view
+into phases:
+
+* ``auth``: authentication, permissions and throttling;
+* ``serialize``: the handler, i.e. querysets, serializers and pagination;
+* ``render``: the renderer turning ``response.data`` into bytes;
+* ``db``: all SQL, which the other phases do not include.
+
+Requests that are not sampled cost one random number.
+
+Query hooks are kept in a context variable rather than installed on the
+connections of the current thread, so they also see the queries of views
+run in other threads under ASGI.
+"""
+import functools
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.template.response import SimpleTemplateResponse
+
+logger = logging.getLogger(__name__)
+
+PHASES = ('auth', 'serialize', 'render')
+
+_query_hooks = ContextVar('query_hooks', default=())
+
+
+def run_query_hooks(execute, sql, params, many, context):
+    """``execute_wrapper`` of every connection, see ``install_query_hooks``."""
+    for hook in reversed(_query_hooks.get()):
+        execute = functools.partial(hook, execute)
+    return execute(sql, params, many, context)
+
+
+def install_query_hooks(sender, connection, **kwargs):
+    """``connection_created`` receiver adding ``run_query_hooks``."""
+    if run_query_hooks not in connection.execute_wrappers:
+        connection.execute_wrappers.append(run_query_hooks)
+
+
+@contextmanager
+def query_hook(hook):
+    """Call ``hook`` like an ``execute_wrapper`` for queries in the block.
+
+    Applies to the current context and to the threads it is copied to,
+    e.g. by ``sync_to_async``.
+    """
+    token = _query_hooks.set(_query_hooks.get() + (hook,))
+    try:
+        yield
+    finally:
+        _query_hooks.reset(token)
+
+
+class RequestTimer:
+    """Phase and SQL timings of one request, in seconds."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = None
+        self.phases = {}
+        self.queries = 0
+        self.db_time = 0.0
+        self.running = None
+
+    def __call__(self, execute, sql, params, many, context):
+        """``execute_wrapper`` hook: time one query."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+    def start(self, name):
+        self.running = (name, time.perf_counter(), self.db_time)
+
+    def stop(self):
+        if self.running is None:
+            return
+        name, started, db_time = self.running
+        self.running = None
+        # Phases exclude the SQL they ran; that is reported as ``db``.
+        elapsed = time.perf_counter() - started - (self.db_time - db_time)
+        self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    @contextmanager
+    def phase(self, name):
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop()
+
+    def finish(self):
+        self.stop()
+        self.total = time.perf_counter() - self.started
+
+    def header(self):
+        metrics = [
+            f'{name};dur={self.phases[name] * 1000:.3f}'
+            for name in PHASES if name in self.phases
+        ]
+        metrics.append(
+            f'db;dur={self.db_time * 1000:.3f};desc="{self.queries} queries"'
+        )
+        metrics.append(f'total;dur={self.total * 1000:.3f}')
+        return ', '.join(metrics)
+
+    def record(self, request, response):
+        match = request.resolver_match
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'total_ms': round(self.total * 1000, 3),
+            'db_ms': round(self.db_time * 1000, 3),
+            'queries': self.queries,
+        }
+        for name in PHASES:
+            if name in self.phases:
+                record[f'{name}_ms'] = round(self.phases[name] * 1000, 3)
+        return record
+
+
+def get_timer(request):
+    """Return the ``RequestTimer`` of a sampled request, else ``None``."""
+    return getattr(request, 'server_timing', None)
+
+
+class ServerTimingMiddleware:
+    """Time sampled requests; keep it first in ``MIDDLEWARE``."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        timer = self.sample(request)
+        if timer is None:
+            return self.get_response(request)
+        with query_hook(timer):
+            response = self.get_response(request)
+        return self.report(request, response, timer)
+
+    async def __acall__(self, request):
+        timer = self.sample(request)
+        if timer is None:
+            return await self.get_response(request)
+        with query_hook(timer):
+            response = await self.get_response(request)
+        return self.report(request, response, timer)
+
+    def sample(self, request):
+        """Return the ``RequestTimer`` of a sampled request, else ``None``."""
+        rate = settings.SERVER_TIMING_SAMPLE_RATE
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            return None
+        request.server_timing = RequestTimer()
+        return request.server_timing
+
+    def report(self, request, response, timer):
+        timer.finish()
+        response['Server-Timing'] = timer.header()
+        record = timer.record(request, response)
+        logger.info(
+            ' '.join(f'{key}={value}' for key, value in record.items()),
+            extra={'timing': record}
+        )
+        return response
+
+
+class ServerTimingMixin:
+    """Report the ``auth``, ``serialize`` and ``render`` phases of a view."""
+
+    def initial(self, request, *args, **kwargs):
+        timer = get_timer(request)
+        if timer is None:
+            return super().initial(request, *args, **kwargs)
+        with timer.phase('auth'):
+            super().initial(request, *args, **kwargs)
+        timer.start('serialize')
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        timer = get_timer(request)
+        if timer is not None:
+            timer.stop()
+            # Rendering would otherwise happen later in the handler, where
+            # it cannot be told apart from the rest of the request.
+            if (isinstance(response, SimpleTemplateResponse)
+                    and not response.is_rendered):
+                with timer.phase('render'):
+                    response.render()
+        return response
@@ -0,0 +1,94 @@
+"""Streaming, size-limited handling of uploaded images.
+
+``ImageUploadHandler`` writes every chunk of an uploaded file straight to
+a temporary file, which ``FileSystemStorage`` later moves into
+``MEDIA_ROOT`` without reading it again. The size limit is checked as the
+chunks arrive, and format and dimensions are read from the first bytes of
+the file, so oversized files and decompression bombs are refused before
+the rest is received and before any pixel data is allocated.
+"""
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from PIL import Image
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from posts.imaging import read_header
+
+TOO_MANY_PIXELS = 'Изображение содержит слишком много пикселей.'
+
+
+class FileTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Файл слишком большой.'
+    default_code = 'file_too_large'
+
+
+class ImageUploadHandler(TemporaryFileUploadHandler):
+    """Stream uploads to disk, refusing anything that is not a sane image."""
+
+    # The longest prefix inspected for the image header; JPEG dimensions
+    # may follow large EXIF blocks.
+    header_size = 256 * 1024
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.received = 0
+        self.header = bytearray()
+        self.checked = False
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        limit = settings.IMAGE_UPLOAD_MAX_SIZE
+        if self.received > limit:
+            self.reject(
+                f'Размер файла не должен превышать {limit} байт.', FileTooLarge
+            )
+        if not self.checked:
+            self.header += raw_data[:self.header_size - len(self.header)]
+            self.checked = self.check_header(
+                final=len(self.header) >= self.header_size
+            )
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        if not self.checked:
+            self.check_header(final=True)
+        return super().file_complete(file_size)
+
+    def check_header(self, final):
+        """Validate the header; return False if more bytes are needed."""
+        try:
+            header = read_header(bytes(self.header))
+        except Image.DecompressionBombError:
+            self.reject(TOO_MANY_PIXELS)
+        if header is None:
+            if final:
+                self.reject('Загрузите корректное изображение.')
+            return False
+        image_format, (width, height) = header
+        if image_format not in settings.IMAGE_UPLOAD_FORMATS:
+            formats = ', '.join(settings.IMAGE_UPLOAD_FORMATS)
+            self.reject(f'Поддерживаются только форматы: {formats}.')
+        max_dimension = settings.IMAGE_UPLOAD_MAX_DIMENSION
+        if width > max_dimension or height > max_dimension:
+            self.reject(
+                f'Ширина и высота изображения не должны превышать '
+                f'{max_dimension} пикселей.'
+            )
+        if width * height > settings.IMAGE_UPLOAD_MAX_PIXELS:
+            self.reject(TOO_MANY_PIXELS)
+        self.header = bytearray()
+        return True
+
+    def reject(self, message, exception_class=ValidationError):
+        self.upload_interrupted()
+        raise exception_class({self.field_name: [message]})
+
+
+class StreamingUploadMixin:
+    """Parse multipart bodies of the view with ``ImageUploadHandler``."""
+
+    def initialize_request(self, request, *args, **kwargs):
+        request.upload_handlers = [ImageUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
@@ -2,7 +2,18 @@ from django.urls import path, include
 
 from rest_framework import routers
 
-from api.views import GroupViewSet, PostViewSet, CommentViewSet, FollowViewSet
+from api.export import PostExportView
+from api.metrics import MetricsView
+from api.views import (
+    CacheStatsView,
+    GroupViewSet,
+    PostViewSet,
+    CommentViewSet,
+    FeedViewSet,
+    FollowViewSet,
+    ProfileViewSet,
+    RecommendationViewSet
+)
 
 router_v1 = routers.DefaultRouter()
 router_v1.register('posts', PostViewSet, basename='post')
@@ -13,9 +24,19 @@ router_v1.register(
     basename='comments'
 )
 router_v1.register('follow', FollowViewSet, basename='follow')
+router_v1.register('feed', FeedViewSet, basename='feed')
+router_v1.register('profiles', ProfileViewSet, basename='profile')
+router_v1.register(
+    'recommendations', RecommendationViewSet, basename='recommendation'
+)
 
 urlpatterns = [
     path('v1/', include('djoser.urls')),
     path('v1/', include('djoser.urls.jwt')),
     path('v1/', include(router_v1.urls)),
+    path('v1/cache-stats/', CacheStatsView.as_view(), name='cache-stats'),
+    path('v1/metrics/', MetricsView.as_view(), name='metrics'),
+    path(
+        'v1/export/posts/', PostExportView.as_view(), name='post-export'
+    ),
 ]
@@ -1,70 +1,235 @@
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from rest_framework import mixins, viewsets
 from rest_framework.permissions import (
+    IsAdminUser,
     IsAuthenticated,
     IsAuthenticatedOrReadOnly,
     AllowAny
 )
-from rest_framework.pagination import LimitOffsetPagination
-from rest_framework import filters
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from posts.models import Group, Post
+from posts import search
+from posts.counters import (
+    change_comments_count,
+    change_user_stats,
+    get_user_stats
+)
+from posts.images import delete_variants, schedule_variants
+from posts.models import Comment, Group, Post, User
+from posts.timeline import backfill_timeline, fan_out_post, fan_out_posts
+from .cache import CachedResponseMixin, bump_generation, cache_stats
+from .conditional import ConditionalMixin
+from .fast_serializers import (
+    CommentValuesSerializer,
+    FollowValuesSerializer,
+    GroupValuesSerializer,
+    PostValuesSerializer
+)
+from .filters import PrefixSearchFilter
+from .mixins import BulkCreateMixin, ValuesListMixin
+from .pagination import CommentPagination, FeedPagination, PostPagination
 from .permissions import IsAuthorOrReadOnly
 from .serializers import (
     GroupSerializer,
     PostSerializer,
     CommentSerializer,
-    FollowSerializer
+    FollowSerializer,
+    ProfileSerializer,
+    RecommendationSerializer
 )
+from .timing import ServerTimingMixin
+from .uploads import StreamingUploadMixin
 
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(ServerTimingMixin, ConditionalMixin, CachedResponseMixin,
+                  BulkCreateMixin, StreamingUploadMixin, ValuesListMixin,
+                  viewsets.ModelViewSet):
     """ViewSet for Post"""
-    queryset = Post.objects.all()
+    cache_namespace = 'posts'
+    queryset = Post.objects.select_related('author')
     serializer_class = PostSerializer
+    values_serializer_class = PostValuesSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
-    pagination_class = LimitOffsetPagination
+    pagination_class = PostPagination
+
+    def get_queryset(self):
+        """Filter by text when the full-text index is unavailable"""
+        queryset = super().get_queryset()
+        query = self.request.query_params.get('search')
+        if query and not search.is_available():
+            queryset = queryset.filter(text__icontains=query)
+        return queryset
 
     def perform_create(self, serializer):
-        """Save serialized data"""
-        serializer.save(author=self.request.user)
+        """Save serialized data and deliver the post to followers"""
+        with transaction.atomic():
+            post = serializer.save(author=self.request.user)
+            change_user_stats(post.author_id, posts_count=1)
+            schedule_variants(post)
+        fan_out_post(post)
+
+    def perform_update(self, serializer):
+        """Save the post and re-render its variants if the image changed"""
+        if 'image' not in serializer.validated_data:
+            serializer.save()
+            return
+        superseded = serializer.instance.image_variants
+        with transaction.atomic():
+            schedule_variants(serializer.save(image_variants={}))
+            delete_variants(superseded)
+
+    def perform_bulk_create(self, serializer):
+        """Save a batch of posts in one transaction and fan them out"""
+        author = self.request.user
+        with transaction.atomic():
+            posts = serializer.save(author=author)
+            change_user_stats(author.pk, posts_count=len(posts))
+            search.index_posts(posts)
+            for post in posts:
+                schedule_variants(post)
+        bump_generation('posts')
+        fan_out_posts(author.pk, posts)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            change_user_stats(instance.author_id, posts_count=-1)
 
 
-class GroupViewSet(viewsets.ReadOnlyModelViewSet):
+class GroupViewSet(ServerTimingMixin, ConditionalMixin, CachedResponseMixin,
+                   ValuesListMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for Group"""
+    cache_namespace = 'groups'
     queryset = Group.objects.all()
     serializer_class = GroupSerializer
+    values_serializer_class = GroupValuesSerializer
     permission_classes = [AllowAny]
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ServerTimingMixin, ConditionalMixin,
+                     CachedResponseMixin, BulkCreateMixin, ValuesListMixin,
+                     viewsets.ModelViewSet):
     """ViewSet for Comment"""
     serializer_class = CommentSerializer
+    values_serializer_class = CommentValuesSerializer
+    pagination_class = CommentPagination
     permission_classes = [IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
 
+    def get_cache_namespace(self):
+        return f'comments:{self.kwargs.get("post_id")}'
+
+    def get_post(self):
+        """Get the commented post, looked up once per request"""
+        if not hasattr(self, '_post'):
+            self._post = get_object_or_404(
+                Post, id=self.kwargs.get('post_id', None)
+            )
+        return self._post
+
     def get_queryset(self):
-        """Get comments with post id"""
-        post = get_object_or_404(Post, id=self.kwargs.get('post_id', None))
-        return post.comments.all()
+        """Get comments with post id
+
+        Only the list checks that the post exists: a comment lookup on a
+        missing post is a 404 without fetching the post row.
+        """
+        if self.action == 'list':
+            self.get_post()
+        return Comment.objects.filter(
+            post_id=self.kwargs.get('post_id', None)
+        ).select_related('author')
 
     def perform_create(self, serializer):
         """Save post if user is author"""
-        post = get_object_or_404(Post, id=self.kwargs.get('post_id', None))
-        serializer.save(author=self.request.user, post=post)
+        with transaction.atomic():
+            comment = serializer.save(
+                author=self.request.user, post=self.get_post()
+            )
+            change_comments_count(comment.post_id, 1)
+
+    def perform_bulk_create(self, serializer):
+        """Save a batch of comments to the post in one transaction"""
+        post = self.get_post()
+        with transaction.atomic():
+            comments = serializer.save(author=self.request.user, post=post)
+            change_comments_count(post.pk, len(comments))
+        bump_generation(f'comments:{post.pk}', 'posts')
 
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            change_comments_count(instance.post_id, -1)
 
-class FollowViewSet(mixins.CreateModelMixin,
+
+class FollowViewSet(ServerTimingMixin,
+                    ValuesListMixin,
+                    mixins.CreateModelMixin,
                     mixins.ListModelMixin,
                     viewsets.GenericViewSet):
     """ViewSet for Follow model."""
     serializer_class = FollowSerializer
+    values_serializer_class = FollowValuesSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter]
+    filter_backends = [PrefixSearchFilter]
     search_fields = ['following__username']
+    search_prefix_field = 'following_name'
 
     def get_queryset(self):
         """Get all follows for the requesting user."""
-        return self.request.user.following.all()
+        return self.request.user.following.select_related(
+            'user', 'following'
+        )
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        with transaction.atomic():
+            follow = serializer.save(user=self.request.user)
+            change_user_stats(follow.user_id, following_count=1)
+            change_user_stats(follow.following_id, followers_count=1)
+        backfill_timeline(follow.user_id, follow.following_id)
+
+
+class RecommendationViewSet(ServerTimingMixin, mixins.ListModelMixin,
+                            viewsets.GenericViewSet):
+    """ViewSet for accounts recommended to the requesting user."""
+    serializer_class = RecommendationSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        """Read the stored top recommendations in index order."""
+        return self.request.user.recommendations.select_related(
+            'candidate'
+        )
+
+
+class FeedViewSet(ServerTimingMixin, mixins.ListModelMixin,
+                  viewsets.GenericViewSet):
+    """ViewSet for the feed of posts by followed authors."""
+    queryset = Post.objects.select_related('author')
+    serializer_class = PostSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = FeedPagination
+
+
+class ProfileViewSet(ServerTimingMixin, mixins.RetrieveModelMixin,
+                     viewsets.GenericViewSet):
+    """ViewSet for user profiles with activity counters."""
+    queryset = User.objects.select_related('stats')
+    serializer_class = ProfileSerializer
+    permission_classes = [AllowAny]
+    lookup_field = 'username'
+    lookup_value_regex = '[^/]+'
+
+    def get_object(self):
+        user = super().get_object()
+        if not hasattr(user, 'stats'):
+            user.stats = get_user_stats(user.pk)
+        return user
+
+
+class CacheStatsView(ServerTimingMixin, APIView):
+    """Response cache hit ratio and latency per endpoint."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(cache_stats.snapshot())
@@ -0,0 +1,89 @@
+"""Denormalized activity counters.
+
+Counters are changed with atomic ``F()`` updates from the write paths, so
+concurrent requests never overwrite each other's increments. Decrements
+stop at zero. Rows that drift (writes outside the API, cascades, crashes)
+are repaired by ``rebuild_counters``.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Comment, Follow, Post, UserStats
+
+USER_STATS_SOURCES = {
+    'posts_count': (Post, 'author'),
+    'followers_count': (Follow, 'following'),
+    'following_count': (Follow, 'user'),
+}
+
+
+def count_subquery(model, field, outer='pk'):
+    """Return ``COUNT(*)`` of ``model`` rows pointing at the outer row."""
+    counts = model.objects.filter(
+        **{field: OuterRef(outer)}
+    ).order_by().values(field).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def recount_user_stats(user_id):
+    return {
+        name: model.objects.filter(**{f'{field}_id': user_id}).count()
+        for name, (model, field) in USER_STATS_SOURCES.items()
+    }
+
+
+def get_user_stats(user_id):
+    """Return the stats row of a user, counting it if it is missing."""
+    stats = UserStats.objects.filter(user_id=user_id).first()
+    if stats is None:
+        try:
+            with transaction.atomic():
+                stats = UserStats.objects.create(
+                    user_id=user_id, **recount_user_stats(user_id)
+                )
+        except IntegrityError:
+            stats = UserStats.objects.get(user_id=user_id)
+    return stats
+
+
+def shifted(name, delta):
+    return Greatest(F(name) + delta, 0)
+
+
+def change_user_stats(user_id, **deltas):
+    """Atomically add ``deltas`` to the counters of a user.
+
+    A missing row is created from a full recount, which already includes
+    the change that triggered the call.
+    """
+    updated = UserStats.objects.filter(user_id=user_id).update(**{
+        name: shifted(name, delta) for name, delta in deltas.items()
+    })
+    if not updated:
+        get_user_stats(user_id)
+
+
+def change_comments_count(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comments_count=shifted('comments_count', delta)
+    )
+
+
+def rebuild_post_counters(start, stop):
+    """Recount ``comments_count`` of posts with ``start <= id < stop``."""
+    return Post.objects.filter(pk__gte=start, pk__lt=stop).update(
+        comments_count=count_subquery(Comment, 'post')
+    )
+
+
+def rebuild_user_stats(user_ids):
+    """Create missing stats rows and recount the given users."""
+    UserStats.objects.bulk_create(
+        [UserStats(user_id=user_id) for user_id in user_ids],
+        ignore_conflicts=True
+    )
+    return UserStats.objects.filter(user_id__in=user_ids).update(**{
+        name: count_subquery(model, field, outer='user_id')
+        for name, (model, field) in USER_STATS_SOURCES.items()
+    })
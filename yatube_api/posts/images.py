@@ -0,0 +1,101 @@
+"""Background generation of post image variants.
+
+Uploads are resized in a process pool after the request has been
+answered; the variant names are recorded on ``Post.image_variants`` once
+they are written. With ``IMAGE_VARIANT_WORKERS = 0`` variants are made
+inline, which is meant for tests and development.
+
+Every job writes to a directory of its own, so a job for a replaced
+image never overwrites the variants of the current one; its files are
+removed when its result is dropped. Recorded variants are removed with
+``delete_variants`` when the image changes or the post is deleted.
+"""
+import logging
+import multiprocessing
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .imaging import remove_variants, render_variants
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the shared process pool, or ``None`` to work inline."""
+    global _executor
+    workers = settings.IMAGE_VARIANT_WORKERS
+    if not workers:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            # Workers are spawned rather than forked, so they never inherit
+            # open database connections or server threads.
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+    return _executor
+
+
+def delete_variants(variants):
+    """Remove the files of recorded ``variants`` after the commit."""
+    if variants:
+        transaction.on_commit(
+            lambda: remove_variants(str(settings.MEDIA_ROOT), variants)
+        )
+
+
+def store_variants(post_id, image_name, variants):
+    """Record ``variants`` unless the post or its image has changed since;
+    otherwise delete their files.
+    """
+    post = Post.objects.filter(pk=post_id, image=image_name).first()
+    if post is None:
+        remove_variants(str(settings.MEDIA_ROOT), variants)
+        return
+    post.image_variants = variants
+    post.save(update_fields=['image_variants'])
+
+
+def _variants_done(post_id, image_name, future):
+    try:
+        store_variants(post_id, image_name, future.result())
+    except Exception:
+        logger.exception('Image variants of post %s failed', post_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_variants(post):
+    """Generate the variants of the post's image after the commit."""
+    if not post.image:
+        return
+    post_id, image_name = post.pk, post.image.name
+    args = (
+        post.image.path,
+        str(settings.MEDIA_ROOT),
+        f'{settings.IMAGE_VARIANTS_DIR}/{post_id}/{uuid.uuid4().hex}',
+        settings.IMAGE_VARIANT_SIZES,
+        settings.IMAGE_VARIANT_FORMATS,
+        settings.IMAGE_VARIANT_QUALITY,
+    )
+
+    def submit():
+        executor = get_executor()
+        if executor is None:
+            store_variants(post_id, image_name, render_variants(*args))
+            return
+        future = executor.submit(render_variants, *args)
+        future.add_done_callback(
+            lambda done: _variants_done(post_id, image_name, done)
+        )
+
+    transaction.on_commit(submit)
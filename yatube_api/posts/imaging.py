@@ -0,0 +1,79 @@
+"""Pillow work for post image variants.
+
+This module must not import Django: ``render_variants`` runs in worker
+processes that never configure it.
+"""
+import io
+import os
+
+from PIL import Image, ImageOps
+
+FORMATS = {
+    'webp': ('WEBP', 'webp'),
+    'jpeg': ('JPEG', 'jpg'),
+}
+
+
+def read_header(data):
+    """Return ``(format, (width, height))`` of a possibly truncated image.
+
+    Only the header is parsed; no pixel data is decoded. Returns ``None``
+    when ``data`` is not (yet) recognisable as an image and lets Pillow's
+    ``DecompressionBombError`` propagate.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            return image.format, image.size
+    except Image.DecompressionBombError:
+        raise
+    except Exception:
+        return None
+
+
+def render_variants(source, media_root, prefix, sizes, formats, quality):
+    """Write resized copies of ``source`` and return their storage names.
+
+    ``sizes`` maps a variant name to its bounding ``(width, height)``; the
+    result maps the variant name to ``{format: name}`` relative to
+    ``media_root``.
+    """
+    result = {}
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+        for variant, size in sizes.items():
+            resized = image.copy()
+            resized.thumbnail(tuple(size), Image.LANCZOS)
+            result[variant] = {}
+            for fmt in formats:
+                pil_format, extension = FORMATS[fmt]
+                name = f'{prefix}/{variant}.{extension}'
+                path = os.path.join(media_root, name)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                output = resized
+                if pil_format == 'JPEG' and output.mode != 'RGB':
+                    output = output.convert('RGB')
+                output.save(path, pil_format, quality=quality)
+                result[variant][fmt] = name
+    return result
+
+
+def remove_variants(media_root, variants):
+    """Delete the files named in a ``render_variants`` result and the
+    directories left empty by it.
+    """
+    directories = set()
+    for names in variants.values():
+        for name in names.values():
+            path = os.path.join(media_root, name)
+            directories.add(os.path.dirname(path))
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    for directory in directories:
+        try:
+            os.rmdir(directory)
+        except OSError:
+            pass
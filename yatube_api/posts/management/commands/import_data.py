@@ -0,0 +1,63 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.importer import IMPORTERS, READERS, get_checkpoint, import_records
+
+# Commands that recompute data derived from each kind of record.
+REBUILDS = {
+    'groups': (),
+    'posts': ('rebuild_counters', 'rebuild_search_index', 'rebuild_timelines'),
+    'comments': ('rebuild_counters',),
+    'follows': ('rebuild_counters', 'rebuild_timelines'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Import groups, posts, comments or follows from a JSONL or CSV '
+        'file with bulk inserts. An interrupted import resumes after the '
+        'last committed batch.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(IMPORTERS))
+        parser.add_argument('path')
+        parser.add_argument(
+            '--format', choices=sorted(READERS), dest='file_format',
+            help='File format; detected from the extension by default.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Number of records inserted per transaction.'
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Ignore the checkpoint and import the file from the start.'
+        )
+        parser.add_argument(
+            '--no-rebuild', action='store_true',
+            help='Do not recompute counters, search index and timelines; '
+                 'useful when several files are imported in a row.'
+        )
+
+    def handle(self, *args, **options):
+        kind, path = options['kind'], options['path']
+        if options['restart']:
+            get_checkpoint(kind, path).delete()
+
+        def report(position, message):
+            self.stderr.write(f'{path}:{position}: skipped, {message}')
+
+        try:
+            imported, skipped = import_records(
+                kind, path, options['file_format'], options['batch_size'],
+                on_error=report
+            )
+        except (OSError, KeyError) as exc:
+            raise CommandError(f'Cannot import {path}: {exc}')
+        self.stdout.write(
+            f'Imported {imported} {kind}, skipped {skipped} records.'
+        )
+        if not options['no_rebuild'] and imported:
+            for command in REBUILDS[kind]:
+                call_command(command, stdout=self.stdout)
@@ -0,0 +1,46 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+
+from posts.counters import rebuild_post_counters, rebuild_user_stats
+from posts.models import Post
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Recount denormalized comment, post and follow counters. Every '
+        'batch runs in its own short transaction.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of posts or users recounted per transaction.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        last_id = Post.objects.aggregate(last=Max('pk'))['last'] or 0
+        posts = 0
+        for start in range(0, last_id + 1, batch_size):
+            with transaction.atomic():
+                posts += rebuild_post_counters(start, start + batch_size)
+
+        users = 0
+        user_ids = User.objects.order_by('pk').values_list('pk', flat=True)
+        after = 0
+        while True:
+            batch = list(user_ids.filter(pk__gt=after)[:batch_size])
+            if not batch:
+                break
+            with transaction.atomic():
+                users += rebuild_user_stats(batch)
+            after = batch[-1]
+
+        self.stdout.write(
+            f'Recounted {posts} posts and {users} users.'
+        )
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from posts.recommendations import refresh_recommendations
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute who-to-follow recommendations of users whose follow '
+        'graph neighbourhood changed since the previous run. Run it '
+        'periodically; every batch runs in its own short transaction.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Recompute every user, also dropping removed follows.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Number of users recomputed per statement.'
+        )
+
+    def handle(self, *args, **options):
+        count = refresh_recommendations(
+            full=options['full'], batch_size=options['batch_size']
+        )
+        self.stdout.write(f'Rebuilt recommendations for {count} users.')
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.search import is_available, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index of posts from scratch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of posts indexed per transaction.'
+        )
+
+    def handle(self, *args, **options):
+        if not is_available():
+            raise CommandError(
+                'Full-text search needs the SQLite FTS5 extension.'
+            )
+        indexed = rebuild_index(options['batch_size'])
+        self.stdout.write(f'Indexed {indexed} posts.')
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Follow, TimelineEntry
+from posts.timeline import backfill_timeline
+
+
+class Command(BaseCommand):
+    help = 'Rebuild follow feed timelines from existing follows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--clear', action='store_true',
+            help='Delete all timeline entries before rebuilding.'
+        )
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            TimelineEntry.objects.all().delete()
+        follows = Follow.objects.values_list('user_id', 'following_id')
+        count = 0
+        for user_id, author_id in follows.iterator(chunk_size=1000):
+            backfill_timeline(user_id, author_id)
+            count += 1
+        self.stdout.write(f'Rebuilt timelines for {count} follows.')
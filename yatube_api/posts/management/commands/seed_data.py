@@ -0,0 +1,63 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.seeding import seed_data
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the database with a deterministic synthetic dataset: '
+        'power-law authors, comments and followers.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=100_000)
+        parser.add_argument('--comments', type=int, default=300_000)
+        parser.add_argument(
+            '--follows', type=int, default=20_000,
+            help='Follows to generate; duplicates are dropped, so slightly '
+                 'fewer may be stored.'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='The same seed and counts always give the same data. '
+                 'Rows are appended; names end with the row id, so the '
+                 'same seed can be run again.'
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='Posts are spread over this many days before 2024-01-01.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Number of rows inserted per transaction.'
+        )
+        parser.add_argument(
+            '--no-rebuild', action='store_true',
+            help='Do not recompute counters, search index and timelines.'
+        )
+
+    def handle(self, *args, **options):
+        def progress(kind, count, seconds):
+            rate = count / seconds if seconds else 0
+            self.stdout.write(
+                f'Inserted {count} {kind} in {seconds:.1f}s '
+                f'({rate:.0f} rows/s).'
+            )
+
+        try:
+            seed_data(
+                users=options['users'], groups=options['groups'],
+                posts=options['posts'], comments=options['comments'],
+                follows=options['follows'], seed=options['seed'],
+                batch_size=options['batch_size'], days=options['days'],
+                progress=progress
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        if not options['no_rebuild']:
+            for command in ('rebuild_counters', 'rebuild_search_index',
+                            'rebuild_timelines'):
+                call_command(command, stdout=self.stdout)
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.16 on 2026-10-18 16:10
+
+from django.db import migrations, models
+
+
+def fill_following_name(apps, schema_editor):
+    Follow = apps.get_model('posts', 'Follow')
+    User = Follow._meta.get_field('following').related_model
+    followed = User.objects.filter(followers__isnull=False).distinct()
+    for pk, username in followed.values_list('pk', 'username').iterator():
+        Follow.objects.filter(following_id=pk).update(
+            following_name=username.casefold()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_importcheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='follow',
+            name='following_name',
+            field=models.CharField(default='', editable=False, max_length=150),
+        ),
+        migrations.RunPython(fill_following_name, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['user', 'following_name'], name='follow_user_name_idx'),
+        ),
+    ]
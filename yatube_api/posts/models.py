@@ -5,6 +5,11 @@ from django.db.models.constraints import UniqueConstraint
 User = get_user_model()
 
 
+def search_name(username):
+    """Return the form of ``username`` stored for case-insensitive search."""
+    return username.casefold()
+
+
 class Group(models.Model):
     """Group model"""
     title = models.CharField(max_length=200)
@@ -27,6 +32,20 @@ class Post(models.Model):
         Group, on_delete=models.SET_NULL,
         related_name='posts', blank=True, null=True
     )
+    comments_count = models.PositiveIntegerField(
+        'Число комментариев', default=0
+    )
+    image_variants = models.JSONField(
+        'Варианты изображения', default=dict, blank=True
+    )
+
+    class Meta:
+        ordering = ('pub_date', 'id')
+        indexes = [
+            models.Index(
+                fields=['pub_date', 'id'], name='post_pub_date_id_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text
@@ -45,6 +64,15 @@ class Comment(models.Model):
         'Дата добавления', auto_now_add=True, db_index=True
     )
 
+    class Meta:
+        ordering = ('created', 'id')
+        indexes = [
+            models.Index(
+                fields=['post', 'created', 'id'],
+                name='comment_post_created_id_idx'
+            ),
+        ]
+
 
 class Follow(models.Model):
     """Follow model"""
@@ -58,6 +86,11 @@ class Follow(models.Model):
         related_name='followers',
         on_delete=models.CASCADE,
     )
+    # ``search_name`` of the followed username, so a prefix search is a
+    # range scan of ``follow_user_name_idx``; kept in sync on rename.
+    following_name = models.CharField(
+        max_length=150, default='', editable=False
+    )
 
     class Meta:
         constraints = [
@@ -66,3 +99,89 @@ class Follow(models.Model):
                 name='unique_follow'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['user', 'following_name'],
+                name='follow_user_name_idx'
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.following_name = search_name(self.following.username)
+        super().save(*args, **kwargs)
+
+
+class UserStats(models.Model):
+    """Denormalized activity counters of a user"""
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE,
+        related_name='stats', primary_key=True
+    )
+    posts_count = models.PositiveIntegerField(default=0)
+    followers_count = models.PositiveIntegerField(default=0, db_index=True)
+    following_count = models.PositiveIntegerField(default=0)
+
+
+class TimelineEntry(models.Model):
+    """Post materialized into a follower's feed"""
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='timeline'
+    )
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name='timeline_entries'
+    )
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=['user', 'post'],
+                name='unique_timeline_entry'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', 'pub_date', 'post'],
+                name='timeline_user_pub_date_idx'
+            ),
+        ]
+
+
+class Recommendation(models.Model):
+    """Account suggested to a user by ``rebuild_recommendations``"""
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='recommendations'
+    )
+    candidate = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='+'
+    )
+    score = models.PositiveIntegerField()
+    # Followed accounts that follow the candidate.
+    mutual = models.PositiveIntegerField()
+    # Followers of the user that follow the candidate.
+    co_followers = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ('-score', 'candidate')
+        constraints = [
+            UniqueConstraint(
+                fields=['user', 'candidate'],
+                name='unique_recommendation'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-score', 'candidate'],
+                name='recommendation_user_score_idx'
+            ),
+        ]
+
+
+class ImportCheckpoint(models.Model):
+    """Position reached in a source processed in batches"""
+    source = models.CharField(max_length=500, unique=True)
+    position = models.PositiveBigIntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.source}: {self.position}'
@@ -0,0 +1,243 @@
+"""Who to follow, computed from the follow graph.
+
+A candidate gets points for every path of two follows from the user:
+
+* mutual: the user follows someone who follows the candidate;
+* co-follower: someone who follows the user follows the candidate.
+
+Accounts the user already follows are left out. Only the
+``RECOMMENDATIONS_NEIGHBOURS`` latest follows and followers of a user are
+walked, so a user with millions of followers costs as much as anyone.
+
+Users are scored in batches: the latest ``RECOMMENDATIONS_NEIGHBOURS``
+follows of all the accounts a batch walks through are read once, since
+popular accounts are shared by many users, counted in memory and only the
+best ``RECOMMENDATIONS_LIMIT`` candidates per user are stored. The complete
+follows of the batch's own users are read too, to leave them out. Memory
+is bounded by the batch size times ``RECOMMENDATIONS_NEIGHBOURS`` squared,
+plus the follows of the batch's users, not by the number of users or
+follows. After the first run only the users whose two-step
+neighbourhood gained follows are recomputed. Removed follows are not
+tracked: they disappear on the next ``full`` run.
+"""
+from collections import Counter, defaultdict
+from operator import itemgetter
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .importer import insert_rows
+from .models import Follow, ImportCheckpoint, Recommendation, User
+
+MUTUAL_WEIGHT = 2
+CO_FOLLOWER_WEIGHT = 1
+CHECKPOINT = 'recommendations:follows'
+STALE_TABLE = 'recommendation_stale_users'
+# Ids per ``IN (...)``: queries bind a chunk at most twice plus one more
+# parameter, within the 999 parameters of SQLite before 3.32.
+CHUNK_SIZE = (999 - 1) // 2
+COLUMNS = ('user_id', 'candidate_id', 'score', 'mutual', 'co_followers')
+
+
+def chunks(ids):
+    for start in range(0, len(ids), CHUNK_SIZE):
+        yield ids[start:start + CHUNK_SIZE]
+
+
+def latest_neighbours(user_ids):
+    """Return ``{user_id: [ids of followed users], ...}`` and the same for
+    followers, the latest ``RECOMMENDATIONS_NEIGHBOURS`` of each.
+    """
+    follow = Follow._meta.db_table
+    followed = defaultdict(list)
+    followers = defaultdict(list)
+    with connection.cursor() as cursor:
+        for chunk in chunks(user_ids):
+            batch = ', '.join(['%s'] * len(chunk))
+            cursor.execute(
+                f'SELECT source, neighbour, kind FROM ('
+                f'SELECT user_id AS source, following_id AS neighbour, '
+                f'1 AS kind, ROW_NUMBER() OVER ('
+                f'PARTITION BY user_id ORDER BY id DESC) AS position '
+                f'FROM {follow} WHERE user_id IN ({batch}) '
+                f'UNION ALL '
+                f'SELECT following_id, user_id, 2, ROW_NUMBER() OVER ('
+                f'PARTITION BY following_id ORDER BY id DESC) '
+                f'FROM {follow} WHERE following_id IN ({batch})'
+                f') AS neighbours WHERE position <= %s',
+                [*chunk, *chunk, settings.RECOMMENDATIONS_NEIGHBOURS]
+            )
+            for source, neighbour, kind in cursor.fetchall():
+                if kind == 1:
+                    followed[source].append(neighbour)
+                else:
+                    followers[source].append(neighbour)
+    return followed, followers
+
+
+def latest_following(user_ids):
+    """Return ``{user_id: [ids of followed users]}``, the latest
+    ``RECOMMENDATIONS_NEIGHBOURS`` of each.
+    """
+    follow = Follow._meta.db_table
+    following = defaultdict(list)
+    with connection.cursor() as cursor:
+        for chunk in chunks(sorted(user_ids)):
+            batch = ', '.join(['%s'] * len(chunk))
+            cursor.execute(
+                f'SELECT user_id, following_id FROM ('
+                f'SELECT user_id, following_id, ROW_NUMBER() OVER ('
+                f'PARTITION BY user_id ORDER BY id DESC) AS position '
+                f'FROM {follow} WHERE user_id IN ({batch})'
+                f') AS latest WHERE position <= %s',
+                [*chunk, settings.RECOMMENDATIONS_NEIGHBOURS]
+            )
+            for user_id, following_id in cursor.fetchall():
+                following[user_id].append(following_id)
+    return following
+
+
+def following_of(user_ids):
+    """Return ``{user_id: {ids of all users it follows}}``."""
+    following = defaultdict(set)
+    for chunk in chunks(sorted(user_ids)):
+        follows = Follow.objects.filter(user_id__in=chunk).values_list(
+            'user_id', 'following_id'
+        )
+        for user_id, following_id in follows:
+            following[user_id].add(following_id)
+    return following
+
+
+def best_candidates(user_id, followed, followers, following, known):
+    """Return the top ``(candidate, score, mutual, co_followers)`` rows.
+
+    ``following`` maps the neighbours to the users they follow lately,
+    ``known`` holds all the users ``user_id`` follows. The counting and
+    sorting stay in C: weights are integers and a path is counted as many
+    times as its weight.
+    """
+    mutual = Counter()
+    for neighbour in followed:
+        mutual.update(following[neighbour])
+    scores = Counter()
+    for neighbour in (followed * MUTUAL_WEIGHT
+                      + followers * CO_FOLLOWER_WEIGHT):
+        scores.update(following[neighbour])
+    # Best score first, then lowest id: sorts are stable.
+    ranked = sorted(scores.items())
+    ranked.sort(key=itemgetter(1), reverse=True)
+    rows = []
+    for candidate, score in ranked:
+        if len(rows) == settings.RECOMMENDATIONS_LIMIT:
+            break
+        if candidate != user_id and candidate not in known:
+            paths = mutual[candidate]
+            rows.append((
+                candidate, score, paths,
+                (score - paths * MUTUAL_WEIGHT) // CO_FOLLOWER_WEIGHT
+            ))
+    return rows
+
+
+def recommend(user_ids):
+    """Replace the stored recommendations of ``user_ids``."""
+    followed, followers = latest_neighbours(user_ids)
+    walked = set()
+    for neighbours in (followed, followers):
+        for ids in neighbours.values():
+            walked.update(ids)
+    following = latest_following(walked)
+    known = following_of(user_ids)
+    rows = [
+        (user_id, *row)
+        for user_id in user_ids
+        for row in best_candidates(
+            user_id, followed[user_id], followers[user_id], following,
+            known[user_id]
+        )
+    ]
+    with transaction.atomic():
+        Recommendation.objects.filter(user_id__in=user_ids).delete()
+        insert_rows(Recommendation, COLUMNS, rows)
+
+
+def all_users(batch_size):
+    """Yield lists of the ids of all users, ``batch_size`` at a time."""
+    users = User.objects.order_by('pk').values_list('pk', flat=True)
+    last = 0
+    while True:
+        batch = list(users.filter(pk__gt=last)[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last = batch[-1]
+
+
+def stale_users(since, until, batch_size):
+    """Yield ids of users affected by follows with ``since < id <= until``.
+
+    A new follow ``a -> b`` changes the recommendations of ``a``, ``b``,
+    the followers of ``a`` (``b`` is a mutual candidate for them) and the
+    accounts ``a`` follows (``b`` is a co-follower candidate for them).
+    The ids are collected in a temporary table, not in memory.
+    """
+    follow = Follow._meta.db_table
+    added = 'added.id > %s AND added.id <= %s'
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TEMPORARY TABLE {STALE_TABLE} '
+            f'(user_id bigint PRIMARY KEY)'
+        )
+        try:
+            cursor.execute(
+                f'INSERT INTO {STALE_TABLE} (user_id) '
+                f'SELECT user_id FROM {follow} AS added WHERE {added} '
+                f'UNION SELECT following_id FROM {follow} AS added '
+                f'WHERE {added} '
+                f'UNION SELECT f.user_id FROM {follow} AS added '
+                f'JOIN {follow} AS f ON f.following_id = added.user_id '
+                f'WHERE {added} '
+                f'UNION SELECT f.following_id FROM {follow} AS added '
+                f'JOIN {follow} AS f ON f.user_id = added.user_id '
+                f'WHERE {added}',
+                [since, until] * 4
+            )
+            last = 0
+            while True:
+                cursor.execute(
+                    f'SELECT user_id FROM {STALE_TABLE} WHERE user_id > %s '
+                    f'ORDER BY user_id LIMIT %s', [last, batch_size]
+                )
+                batch = [user_id for user_id, in cursor.fetchall()]
+                if not batch:
+                    return
+                yield batch
+                last = batch[-1]
+        finally:
+            cursor.execute(f'DROP TABLE {STALE_TABLE}')
+
+
+def refresh_recommendations(full=False, batch_size=None):
+    """Recompute stale recommendations, or all with ``full``.
+
+    Return the number of users recomputed. The first run is always full.
+    """
+    batch_size = batch_size or settings.RECOMMENDATIONS_BATCH_SIZE
+    checkpoint, created = ImportCheckpoint.objects.get_or_create(
+        source=CHECKPOINT
+    )
+    until = Follow.objects.order_by('-pk').values_list(
+        'pk', flat=True
+    ).first() or 0
+    if full or created:
+        batches = all_users(batch_size)
+    else:
+        batches = stale_users(checkpoint.position, until, batch_size)
+    count = 0
+    for batch in batches:
+        recommend(batch)
+        count += len(batch)
+    checkpoint.position = until
+    checkpoint.save(update_fields=['position', 'updated'])
+    return count
@@ -0,0 +1,136 @@
+"""Full-text search over ``Post.text`` with an SQLite FTS5 index.
+
+The index is a standalone FTS5 table keyed by the post id (its rowid).
+It is kept in sync by the signals in ``posts.signals`` and by the bulk
+write paths, and can be rebuilt with ``manage.py rebuild_search_index``.
+Matches are ranked by bm25; lower scores are better.
+"""
+import re
+
+from django.db import connection, transaction
+
+from .models import Post
+
+FTS_TABLE = 'posts_post_fts'
+SHADOW_TABLE = 'posts_post_fts_rebuild'
+TOKEN_RE = re.compile(r'\w+')
+
+
+def is_available():
+    return connection.vendor == 'sqlite'
+
+
+def build_match_query(text):
+    """Turn user input into an FTS5 query matching every word.
+
+    Each word is quoted, so FTS5 operators in the input are searched for
+    as plain words instead of raising a syntax error.
+    """
+    return ' '.join(f'"{token}"' for token in TOKEN_RE.findall(text))
+
+
+def index_posts(posts):
+    """Add or replace the index entries of the given posts."""
+    if not is_available():
+        return
+    rows = [(post.pk, post.text) for post in posts]
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+            [(pk,) for pk, _ in rows]
+        )
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, text) VALUES (%s, %s)', rows
+        )
+
+
+def unindex_posts(post_ids):
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+            [(pk,) for pk in post_ids]
+        )
+
+
+def search(query, position=None, reverse=False, limit=10):
+    """Return up to ``limit`` ``(rank, post_id)`` pairs matching ``query``.
+
+    Results are ordered by ``(rank, post_id)``; ``position`` is the last
+    pair of the previous page and ``reverse`` walks towards better ranks.
+    """
+    match = build_match_query(query)
+    if not match:
+        return []
+    comparison, direction = ('<', 'DESC') if reverse else ('>', 'ASC')
+    sql = (
+        f'SELECT rank, id FROM (SELECT bm25({FTS_TABLE}) AS rank, '
+        f'rowid AS id FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)'
+    )
+    params = [match]
+    if position is not None:
+        rank, pk = position
+        sql += (
+            f' WHERE rank {comparison} %s'
+            f' OR (rank = %s AND id {comparison} %s)'
+        )
+        params += [rank, rank, pk]
+    sql += f' ORDER BY rank {direction}, id {direction} LIMIT %s'
+    params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def copy_batch(cursor, table, rows):
+    cursor.executemany(
+        f'INSERT INTO {table} (rowid, text) VALUES (%s, %s)', rows
+    )
+
+
+def rebuild_index(batch_size=1000):
+    """Re-create the index from ``Post`` in batches; return the count.
+
+    The new index is built in a shadow table, each batch committed on its
+    own, so the rebuild never holds one long write transaction and the
+    live index keeps answering searches. One short transaction then
+    applies the writes made to posts meanwhile and swaps the tables.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {SHADOW_TABLE}')
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE {SHADOW_TABLE} USING fts5(text)'
+        )
+    after = 0
+    posts = Post.objects.order_by('pk').values_list('pk', 'text')
+    while True:
+        batch = list(posts.filter(pk__gt=after)[:batch_size])
+        if not batch:
+            break
+        with transaction.atomic(), connection.cursor() as cursor:
+            copy_batch(cursor, SHADOW_TABLE, batch)
+        after = batch[-1][0]
+    post = Post._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SHADOW_TABLE} WHERE rowid IN ('
+            f'SELECT s.rowid FROM {SHADOW_TABLE} AS s '
+            f'LEFT JOIN {post} AS p ON p.id = s.rowid '
+            f'WHERE p.id IS NULL OR p.text != s.text)'
+        )
+        cursor.execute(
+            f'INSERT INTO {SHADOW_TABLE} (rowid, text) '
+            f'SELECT p.id, p.text FROM {post} AS p '
+            f'LEFT JOIN {SHADOW_TABLE} AS s ON s.rowid = p.id '
+            f'WHERE s.rowid IS NULL'
+        )
+        cursor.execute(f'DROP TABLE {FTS_TABLE}')
+        cursor.execute(f'ALTER TABLE {SHADOW_TABLE} RENAME TO {FTS_TABLE}')
+        cursor.execute(f'SELECT count(*) FROM {FTS_TABLE}')
+        indexed, = cursor.fetchone()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')"
+        )
+    return indexed
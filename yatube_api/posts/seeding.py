@@ -0,0 +1,266 @@
+"""Deterministic synthetic data for performance work.
+
+``seed_data`` fills the database with users, groups, posts, comments and
+follows shaped like a real blogging site: a few authors write most posts,
+a few posts get most comments and a few users have most followers. The
+same ``seed`` and counts always produce the same rows.
+
+Rows are appended after the existing ones. Usernames and group slugs end
+with the row id, so seeding again, even with the same ``seed``, adds a new
+dataset instead of colliding with the previous one.
+
+Popularity follows a power law: ``int(n ** u) - 1`` for uniform ``u`` is
+a rank in ``[0, n)`` with density proportional to ``1 / rank``. Ranks are
+scattered over the ids so the popular rows are not all the oldest ones.
+"""
+import datetime
+import random
+import time
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .importer import column_defaults, insert_rows
+from .models import Comment, Follow, Group, Post, User, search_name
+
+UNTIL = datetime.datetime(2024, 1, 1, tzinfo=timezone.utc)
+WORDS = (
+    'блог пост утро вечер город море горы кофе книга фильм музыка код '
+    'python django сервер база запрос кэш индекс поиск лента друг работа '
+    'отпуск погода кот собака фото прогулка новости идея план проект '
+    'релиз ошибка тест скорость память диск сеть'
+).split()
+# A prime, so ``rank * STRIDE % n`` permutes the ranks unless ``n`` is a
+# multiple of it.
+STRIDE = 1_000_003
+
+
+def power_law(rng, n):
+    """Return a rank in ``[0, n)``, rank ``r`` with weight ``1 / (r + 1)``."""
+    return int(n ** rng.random()) - 1
+
+
+def scatter(rank, n):
+    return rank * STRIDE % n if n % STRIDE else rank
+
+
+class TextSource:
+    """Random texts sliced out of one long stream of random words.
+
+    Slicing and joining are a fraction of the cost of drawing each word.
+    """
+
+    def __init__(self, rng, size=1 << 16):
+        self.rng = rng
+        self.words = rng.choices(WORDS, k=size)
+
+    def __call__(self, low, high):
+        length = self.rng.randint(low, high)
+        start = self.rng.randrange(len(self.words) - length)
+        return ' '.join(self.words[start:start + length]).capitalize()
+
+
+def next_id(model):
+    last = model.objects.order_by('-pk').values_list('pk', flat=True).first()
+    return (last or 0) + 1
+
+
+class Table:
+    """Batched inserts of value tuples into ``model``.
+
+    ``columns`` are filled by the caller; every other column gets its
+    default, appended to each row.
+    """
+
+    def __init__(self, model, columns, batch_size, ignore_conflicts=False):
+        defaults = column_defaults(model)
+        for column in columns:
+            defaults.pop(column, None)
+        self.model = model
+        self.columns = list(columns) + list(defaults)
+        self.tail = tuple(defaults.values())
+        self.batch_size = batch_size
+        self.ignore_conflicts = ignore_conflicts
+        self.rows = []
+        self.count = 0
+
+    def add(self, *values):
+        self.rows.append(values + self.tail)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        with transaction.atomic():
+            insert_rows(
+                self.model, self.columns, self.rows, self.ignore_conflicts
+            )
+        self.count += len(self.rows)
+        self.rows = []
+
+
+class Seeder:
+    """Generate one dataset; each ``seed_*`` method fills one model."""
+
+    def __init__(self, seed=0, batch_size=10000, days=365, until=UNTIL):
+        self.seed = seed
+        self.batch_size = batch_size
+        self.until = until
+        self.span = datetime.timedelta(days=days)
+        self.adapt_datetime = connection.ops.adapt_datetimefield_value
+
+    def random(self, kind):
+        # One generator per model, so changing one count leaves the rows
+        # of the other models unchanged.
+        return random.Random(f'{self.seed}:{kind}')
+
+    def username(self, user):
+        return f'user{self.seed}_{self.first_user + user}'
+
+    def seed_users(self, count):
+        self.first_user = next_id(User)
+        self.users = count
+        table = Table(
+            User, ('id', 'username', 'password', 'date_joined'),
+            self.batch_size
+        )
+        joined = self.adapt_datetime(self.until - self.span)
+        for i in range(count):
+            table.add(
+                self.first_user + i, self.username(i), '!', joined
+            )
+        table.flush()
+        return table.count
+
+    def seed_groups(self, count):
+        self.first_group = next_id(Group)
+        self.groups = count
+        rng = self.random('groups')
+        make_text = TextSource(rng)
+        table = Table(
+            Group, ('id', 'title', 'slug', 'description'), self.batch_size
+        )
+        for i in range(count):
+            table.add(
+                self.first_group + i, f'Группа {i}',
+                f'group{self.seed}-{self.first_group + i}', make_text(5, 30)
+            )
+        table.flush()
+        return table.count
+
+    def post_date(self, index):
+        """Posts are spread evenly over the span, in id order."""
+        return self.until - self.span * (1 - (index + 0.5) / self.posts)
+
+    def seed_posts(self, count, grouped=0.7):
+        self.first_post = next_id(Post)
+        self.posts = count
+        rng = self.random('posts')
+        make_text = TextSource(rng)
+        table = Table(
+            Post, ('id', 'text', 'pub_date', 'author_id', 'group_id'),
+            self.batch_size
+        )
+        for i in range(count):
+            author = scatter(power_law(rng, self.users), self.users)
+            group = None
+            if self.groups and rng.random() < grouped:
+                group = self.first_group + power_law(rng, self.groups)
+            table.add(
+                self.first_post + i, make_text(5, 80),
+                self.adapt_datetime(self.post_date(i)),
+                self.first_user + author, group
+            )
+        table.flush()
+        return table.count
+
+    def seed_comments(self, count):
+        rng = self.random('comments')
+        make_text = TextSource(rng)
+        table = Table(
+            Comment, ('text', 'created', 'post_id', 'author_id'),
+            self.batch_size
+        )
+        for _ in range(count):
+            post = scatter(power_law(rng, self.posts), self.posts)
+            created = self.post_date(post) + datetime.timedelta(
+                hours=rng.expovariate(1 / 12)
+            )
+            table.add(
+                make_text(1, 30), self.adapt_datetime(created),
+                self.first_post + post,
+                self.first_user + rng.randrange(self.users)
+            )
+        table.flush()
+        return table.count
+
+    def seed_follows(self, count):
+        """Follow popular users; out-degrees are Pareto distributed.
+
+        Users are visited in turn until ``count`` follows are generated;
+        a follow drawn twice is dropped, so slightly fewer rows may be
+        stored.
+        """
+        rng = self.random('follows')
+        table = Table(
+            Follow, ('user_id', 'following_id', 'following_name'),
+            self.batch_size, ignore_conflicts=True
+        )
+        average = count / self.users if self.users > 1 else 0
+        remaining = count
+        user = 0
+        while remaining > 0 and average:
+            degree = min(
+                remaining, self.users - 1,
+                round(average / 2 * rng.paretovariate(2))
+            )
+            following = set()
+            for _ in range(degree):
+                target = scatter(power_law(rng, self.users), self.users)
+                if target != user:
+                    following.add(target)
+            for target in sorted(following):
+                table.add(
+                    self.first_user + user, self.first_user + target,
+                    search_name(self.username(target))
+                )
+            remaining -= len(following)
+            user = (user + 1) % self.users
+        table.flush()
+        return table.count
+
+
+def seed_data(users=1000, groups=50, posts=100_000, comments=300_000,
+              follows=20_000, seed=0, batch_size=10000, days=365,
+              progress=None):
+    """Generate the dataset; return ``{model: rows inserted}``.
+
+    ``progress(kind, count, seconds)`` is called after each model.
+    """
+    seeder = Seeder(seed, batch_size, days)
+    steps = (
+        ('users', seeder.seed_users, users),
+        ('groups', seeder.seed_groups, groups),
+        ('posts', seeder.seed_posts, posts),
+        ('comments', seeder.seed_comments, comments),
+        ('follows', seeder.seed_follows, follows),
+    )
+    if not users and (posts or comments or follows):
+        raise ValueError('posts, comments and follows need users')
+    if not posts and comments:
+        raise ValueError('comments need posts')
+    counts = {}
+    for kind, step, count in steps:
+        started = time.perf_counter()
+        counts[kind] = step(count)
+        if progress is not None:
+            progress(kind, counts[kind], time.perf_counter() - started)
+    # Users, groups and posts got explicit ids; move the sequences past
+    # them on backends that have sequences.
+    statements = connection.ops.sequence_reset_sql(
+        no_style(), [User, Group, Post]
+    )
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+    return counts
@@ -0,0 +1,43 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .images import delete_variants
+from .models import Follow, Post, Recommendation, User, search_name
+from .search import index_posts, unindex_posts
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    """Keep the full-text index in sync with the saved post."""
+    index_posts([instance])
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    unindex_posts([instance.pk])
+
+
+@receiver(post_delete, sender=Post)
+def delete_post_variants(sender, instance, **kwargs):
+    delete_variants(instance.image_variants)
+
+
+@receiver(post_save, sender=User)
+def rename_follows(sender, instance, created, update_fields=None, **kwargs):
+    """Store the new username in the follows of a renamed user."""
+    if created or (update_fields is not None
+                   and 'username' not in update_fields):
+        return
+    name = search_name(instance.username)
+    Follow.objects.filter(following=instance).exclude(
+        following_name=name
+    ).update(following_name=name)
+
+
+@receiver(post_save, sender=Follow)
+def drop_recommendation(sender, instance, created, **kwargs):
+    """Stop recommending an account once it is followed."""
+    if created:
+        Recommendation.objects.filter(
+            user_id=instance.user_id, candidate_id=instance.following_id
+        ).delete()
@@ -0,0 +1,134 @@
+"""Materialized follow feeds.
+
+New posts are copied into each follower's timeline when they are saved
+(fan-out on write), so reading a feed is a single indexed range scan.
+Authors with more than ``FEED_FANOUT_MAX_FOLLOWERS`` followers are not
+fanned out; their posts are merged into the feed at read time instead.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from .counters import get_user_stats
+from .models import Follow, Post, TimelineEntry, User, UserStats
+
+FANOUT_BATCH_SIZE = 1000
+
+
+def is_fanned_out(author_id):
+    """Return whether posts by this author are copied into timelines."""
+    followers = get_user_stats(author_id).followers_count
+    return followers <= settings.FEED_FANOUT_MAX_FOLLOWERS
+
+
+def celebrity_ids():
+    """Return ids of authors whose posts are merged at read time."""
+    limit = settings.FEED_FANOUT_MAX_FOLLOWERS
+    key = f'feed:celebrities:{limit}'
+    ids = cache.get(key)
+    if ids is None:
+        ids = frozenset(
+            UserStats.objects.filter(
+                followers_count__gt=limit
+            ).values_list('user_id', flat=True)
+        )
+        cache.set(key, ids, settings.FEED_CELEBRITY_CACHE_TIMEOUT)
+    return ids
+
+
+def forget_celebrities():
+    cache.delete(f'feed:celebrities:{settings.FEED_FANOUT_MAX_FOLLOWERS}')
+
+
+def trim_timelines(user_ids):
+    """Keep only the newest FEED_TIMELINE_LENGTH entries per timeline.
+
+    ``user_ids`` is a queryset of user ids and is inlined as a subquery,
+    so trimming every follower of an author is one statement.
+    """
+    users_sql, params = user_ids.query.sql_with_params()
+    table = TimelineEntry._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {table} WHERE id IN ('
+            f'SELECT id FROM (SELECT id, ROW_NUMBER() OVER ('
+            f'PARTITION BY user_id ORDER BY pub_date DESC, post_id DESC'
+            f') AS position FROM {table} WHERE user_id IN ({users_sql})'
+            f') AS ranked WHERE position > %s)',
+            [*params, settings.FEED_TIMELINE_LENGTH]
+        )
+
+
+def fan_out_post(post):
+    """Copy a new post into the timelines of its author's followers."""
+    fan_out_posts(post.author_id, [post])
+
+
+def fan_out_posts(author_id, posts):
+    """Copy new posts of one author into the timelines of the followers."""
+    if not posts:
+        return
+    if not is_fanned_out(author_id):
+        forget_celebrities()
+        return
+    followers = Follow.objects.filter(
+        following_id=author_id
+    ).values_list('user_id', flat=True)
+    with transaction.atomic():
+        batch = []
+        for user_id in followers.iterator(chunk_size=FANOUT_BATCH_SIZE):
+            batch.extend(
+                TimelineEntry(
+                    user_id=user_id, post_id=post.pk, pub_date=post.pub_date
+                )
+                for post in posts
+            )
+            if len(batch) >= FANOUT_BATCH_SIZE:
+                TimelineEntry.objects.bulk_create(batch)
+                batch = []
+        TimelineEntry.objects.bulk_create(batch)
+        # Trimming scans the followers' timelines, so it is amortized over
+        # FEED_TRIM_INTERVAL posts rather than run on every write.
+        interval = settings.FEED_TRIM_INTERVAL
+        if any(post.pk % interval == 0 for post in posts):
+            trim_timelines(followers)
+
+
+def backfill_timeline(user_id, author_id):
+    """Copy the recent posts of a newly followed author into a timeline."""
+    if not is_fanned_out(author_id):
+        forget_celebrities()
+        return
+    recent = Post.objects.filter(author_id=author_id).order_by(
+        '-pub_date', '-id'
+    ).values_list('id', 'pub_date')[:settings.FEED_TIMELINE_LENGTH]
+    with transaction.atomic():
+        TimelineEntry.objects.bulk_create(
+            (
+                TimelineEntry(user_id=user_id, post_id=pk, pub_date=pub_date)
+                for pk, pub_date in recent
+            ),
+            batch_size=FANOUT_BATCH_SIZE,
+            ignore_conflicts=True
+        )
+        trim_timelines(User.objects.filter(pk=user_id).values('pk'))
+
+
+def get_feed_sources(user):
+    """Return the querysets a user's feed is merged from.
+
+    The first yields ``TimelineEntry`` rows of the user, the second posts
+    of followed authors that are not fanned out, or ``None``.
+    """
+    entries = TimelineEntry.objects.filter(user=user)
+    celebrities = celebrity_ids()
+    if not celebrities:
+        return entries, None
+    pulled = list(
+        Follow.objects.filter(
+            user=user, following_id__in=celebrities
+        ).values_list('following_id', flat=True)
+    )
+    if not pulled:
+        return entries, None
+    return entries, Post.objects.filter(author_id__in=pulled)
@@ -1,7 +1,11 @@
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube_api.settings')
 
-application = get_asgi_application()
+django.setup(set_prefix=False)
+
+from api.asgi import PooledASGIHandler  # noqa: E402
+
+application = PooledASGIHandler()
@@ -24,6 +24,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.timing.ServerTimingMiddleware',
+    'api.metrics.MetricsMiddleware',
+    'api.replicas.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -55,11 +58,61 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'yatube_api.wsgi.application'
 
+# Under ASGI (yatube_api.asgi) reads of posts, comments and groups are
+# served from a pool of this many threads, each with its own database
+# connection (api.asgi); other requests take Django's stock async path.
+ASYNC_DB_THREADS = 8
 
+
+# SQLite tuned for concurrent requests (api.backends.sqlite3): WAL lets
+# reads run alongside the single writer, transactions take the write lock
+# when they begin, and a write that still finds the database locked after
+# `timeout` seconds is retried `lock_retries` times with exponential
+# backoff from `lock_backoff` seconds. With synchronous = NORMAL the last
+# transactions may be lost on power failure, never corrupted. Connections
+# are kept open by worker threads for CONN_MAX_AGE seconds (the threads of
+# runserver live for one request, so there it makes no difference).
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'api.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'OPTIONS': {
+            'timeout': 5,
+            'lock_retries': 3,
+            'lock_backoff': 0.05,
+            'pragmas': {
+                'journal_mode': 'WAL',
+                'synchronous': 'NORMAL',
+                # Negative: in KiB, i.e. 64 MiB of page cache.
+                'cache_size': -64 * 1024,
+                'mmap_size': 256 * 1024 * 1024,
+                'temp_store': 'MEMORY',
+            },
+        },
+    }
+}
+
+# Read replicas (api.replicas): SQLite files copied from the primary by
+# `python manage.py refresh_replicas --interval 2`. GET requests read the
+# models of DATABASE_REPLICA_APPS from a random replica, except for clients
+# that sent a write in the last DATABASE_STICKY_SECONDS; keep that above
+# the refresh interval. The sticky marks live in CACHES, so use a shared
+# backend with several worker processes. To enable:
+#
+# DATABASES['replica'] = {
+#     'ENGINE': 'django.db.backends.sqlite3',
+#     'NAME': BASE_DIR / 'db.replica.sqlite3',
+# }
+# DATABASE_REPLICAS = ['replica']
+DATABASE_REPLICAS = []
+DATABASE_REPLICA_APPS = ('posts',)
+DATABASE_STICKY_SECONDS = 10
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
@@ -91,14 +144,34 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 
+MEDIA_URL = '/media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
+    ],
+
+    # JSON is encoded with orjson; clients may ask for MessagePack with
+    # `Accept: application/msgpack`. The browsable API is served in DEBUG
+    # only.
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'api.renderers.MessagePackRenderer',
+    ] + (['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.ORJSONParser',
+        'api.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
+    # Serializers hand datetimes to the renderers, which encode them
+    # natively: ISO 8601 in JSON, timestamps in MessagePack.
+    'DATETIME_FORMAT': None,
 }
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -107,3 +180,87 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
+
+# Users resolved from JWT access tokens are cached per process for at most
+# this many seconds (0 disables the cache). Saving a user bumps its version
+# in CACHES['default'], which every process checks on a hit. Other worker
+# processes only see the bump through a backend shared between them
+# (memcached, Redis, the database); with the default LocMemCache they keep
+# accepting the old user until the timeout, so keep it short then.
+JWT_USER_CACHE_TIMEOUT = 60
+JWT_USER_CACHE_SIZE = 10000
+
+# Follow feed: posts are copied into followers' timelines on write, except
+# for authors with more than FEED_FANOUT_MAX_FOLLOWERS followers, whose
+# posts are merged into the feed at read time.
+FEED_TIMELINE_LENGTH = 1000
+FEED_FANOUT_MAX_FOLLOWERS = 10000
+FEED_TRIM_INTERVAL = 20
+FEED_CELEBRITY_CACHE_TIMEOUT = 60
+
+# Who to follow: rebuild_recommendations stores the best
+# RECOMMENDATIONS_LIMIT accounts per user, walking only the
+# RECOMMENDATIONS_NEIGHBOURS latest follows and followers of each user.
+RECOMMENDATIONS_LIMIT = 20
+RECOMMENDATIONS_NEIGHBOURS = 100
+RECOMMENDATIONS_BATCH_SIZE = 500
+
+# Anonymous GET responses of posts, groups and comments are cached for this
+# many seconds; 0 disables the cache. Use a shared backend in CACHES (Redis,
+# Memcached) when running several worker processes.
+RESPONSE_CACHE_TIMEOUT = 300
+
+# List actions of posts, comments, groups and follows serialize values()
+# rows instead of model instances; the JSON is the same either way.
+FAST_LIST_SERIALIZATION = True
+
+# Maximum number of objects accepted by the posts/comments bulk endpoints.
+BULK_CREATE_MAX_ITEMS = 1000
+
+# Posts read per query by the NDJSON export.
+EXPORT_BATCH_SIZE = 1000
+# Comments read per query, and held at most, by the export with comments.
+EXPORT_COMMENT_BATCH_SIZE = 1000
+
+# Resized copies of Post.image are written in a pool of this many worker
+# processes after the upload is saved; 0 renders them inline.
+IMAGE_VARIANT_WORKERS = 2
+IMAGE_VARIANTS_DIR = 'posts/variants'
+IMAGE_VARIANT_SIZES = {
+    'thumb': (150, 150),
+    'card': (600, 600),
+    'full': (1600, 1600),
+}
+IMAGE_VARIANT_FORMATS = ('webp', 'jpeg')
+IMAGE_VARIANT_QUALITY = 80
+
+# Uploaded images are streamed to disk and refused as soon as they exceed
+# the size limit or their header declares a format or dimensions outside
+# these limits.
+IMAGE_UPLOAD_MAX_SIZE = 10 * 1024 * 1024
+IMAGE_UPLOAD_MAX_DIMENSION = 10000
+IMAGE_UPLOAD_MAX_PIXELS = 40_000_000
+IMAGE_UPLOAD_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+
+# Share of requests timed by api.timing: those get a Server-Timing header
+# (auth, serialize, render, db, total) and an INFO line on the api.timing
+# logger. Unsampled requests cost one random number.
+SERVER_TIMING_SAMPLE_RATE = 1.0 if DEBUG else 0.01
+
+# Request metrics (api.metrics) served to admins at /api/v1/metrics/. Worker
+# processes share them through snapshot files in METRICS_DIR, written at
+# most every METRICS_FLUSH_INTERVAL seconds; empty the directory when
+# deploying. With METRICS_DIR = None each process reports only itself.
+METRICS_DIR = None
+METRICS_FLUSH_INTERVAL = 5
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.timing': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}